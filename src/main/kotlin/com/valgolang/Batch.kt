@@ -0,0 +1,189 @@
+package com.valgolang
+
+import com.valgolang.errorhandling.ErrorHandler
+import picocli.CommandLine.Command
+import picocli.CommandLine.Option
+import picocli.CommandLine.Parameters
+import java.io.ByteArrayOutputStream
+import java.io.File
+import java.io.PrintStream
+import java.nio.file.FileSystems
+import java.util.concurrent.Callable
+import java.util.concurrent.Executors
+import java.util.concurrent.Semaphore
+
+/**
+ * Program found by a batch compile
+ *
+ * @property file: the .val file
+ * @property stylesheet: stylesheet found next to it, if any
+ * @property name: path of the program relative to the searched directory, without its extension, used to name its output
+ * @constructor Create empty Batch program
+ */
+data class BatchProgram(val file: File, val stylesheet: File?, val name: String)
+
+/**
+ * Outcome of compiling a [BatchProgram]
+ *
+ * @property program
+ * @property exitCode: exit code the compile would have exited valgolang with
+ * @property seconds: wall clock time taken, including waiting for a manim process to become free
+ * @property output: everything the compile printed
+ * @constructor Create empty Batch result
+ */
+data class BatchResult(val program: BatchProgram, val exitCode: Int, val seconds: Double, val output: String)
+
+/**
+ * Finds the programs to compile, with their stylesheets, sorted by path.
+ *
+ * @param target: directory searched recursively for .val files, or a glob matching them
+ * @return programs found
+ */
+internal fun discoverPrograms(target: String): List<BatchProgram> {
+    val targetFile = File(target)
+    val root = if (targetFile.isDirectory) targetFile else globRoot(target)
+    val programs = if (targetFile.isDirectory) {
+        root.walkTopDown().filter { it.isFile && it.extension == "val" }
+    } else {
+        val matcher = FileSystems.getDefault().getPathMatcher("glob:$target")
+        root.walkTopDown().filter { it.isFile && matcher.matches(it.toPath().normalize()) }
+    }
+    return programs.sortedBy { it.path }.map {
+        BatchProgram(it, findStylesheet(it), it.relativeTo(root).path.removeSuffix(".val"))
+    }.toList()
+}
+
+// Longest leading directory of the glob without any special characters, which all matches are inside
+private fun globRoot(glob: String): File {
+    val fixed = glob.split("/").takeWhile { segment -> segment.none { it in "*?[{" } }.dropLast(1)
+    return when {
+        fixed.isEmpty() -> File(".")
+        fixed == listOf("") -> File("/")
+        else -> File(fixed.joinToString("/"))
+    }
+}
+
+// A stylesheet named after the program takes precedence over the style.json shared by its directory
+private fun findStylesheet(program: File): File? =
+    listOf(File(program.parentFile, "${program.nameWithoutExtension}.json"), File(program.parentFile, "style.json"))
+        .firstOrNull { it.isFile }
+
+/**
+ * Compiles every program in a directory, running the front end, virtual machine and code generation of several programs
+ * at once on a thread pool while limiting how many manim processes render at the same time.
+ *
+ * Each program compiles with its own error state and output, so one failing has no effect on the others.
+ * Once all have finished, a table of how long each took is printed, followed by the output of those that failed.
+ */
+@Command(
+    name = "batch",
+    mixinStandardHelpOptions = true,
+    description = ["Compile every .val program in a directory, or matching a glob, with its stylesheet."]
+)
+class BatchCommand : Callable<Int> {
+
+    @Parameters(index = "0", description = ["Directory to search for .val programs, or a glob matching them."])
+    var target: String = ""
+
+    @Option(names = ["-o", "--output_dir"], description = ["Directory to write the animations to (default: \${DEFAULT-VALUE})."])
+    var outputDir: String = "out"
+
+    @Option(names = ["--threads"], description = ["Number of programs to compile at once (default: number of processors)."])
+    var threads: Int = Runtime.getRuntime().availableProcessors()
+
+    @Option(names = ["--renders"], description = ["Number of manim processes to render animations with at once (default: \${DEFAULT-VALUE})."])
+    var renders: Int = 1
+
+    @Option(names = ["-p", "--python"], description = ["Output generated python & manim code (optional)."])
+    var python: Boolean = false
+
+    @Option(names = ["-m", "--manim"], description = ["Only output generated python & manim code (optional)."])
+    var manim: Boolean = false
+
+    @Option(
+        names = ["-q", "--quality"],
+        description = ["Quality of animation. [\${COMPLETION-CANDIDATES}] (default: \${DEFAULT-VALUE})."]
+    )
+    var quality: AnimationQuality = AnimationQuality.LOW
+
+    @Option(
+        names = ["--backend"],
+        description = ["Form of the generated python code. [\${COMPLETION-CANDIDATES}] (default: \${DEFAULT-VALUE})."]
+    )
+    var backend: Backend = Backend.SOURCE
+
+    @Option(names = ["-O", "--optimise"], description = ["Remove redundant animations, collapsing sped up regions, before generating code (optional)."])
+    var optimise: Boolean = false
+
+    override fun call(): Int {
+        val programs = discoverPrograms(target)
+        if (programs.isEmpty()) {
+            println("No .val programs found in $target")
+            return 1
+        }
+
+        val start = System.nanoTime()
+        val renderPermits = Semaphore(maxOf(renders, 1))
+        val executor = Executors.newFixedThreadPool(maxOf(threads, 1))
+        val results = try {
+            programs.map { program -> executor.submit(Callable { compileProgram(program, renderPermits) }) }.map { it.get() }
+        } finally {
+            executor.shutdown()
+        }
+        printReport(results, (System.nanoTime() - start) / 1e9)
+        return if (results.all { it.exitCode == 0 }) 0 else 1
+    }
+
+    private fun compileProgram(program: BatchProgram, renderPermits: Semaphore): BatchResult {
+        val captured = ByteArrayOutputStream()
+        val start = System.nanoTime()
+        val exitCode = PrintStream(captured, true, "UTF-8").use { stream ->
+            ErrorHandler.withOutput(stream) {
+                try {
+                    compile(
+                        program.file.path,
+                        "$outputDir/${program.name}.mp4",
+                        python || manim,
+                        manim,
+                        listOf(quality.manimArgument),
+                        program.stylesheet?.path,
+                        false,
+                        1,
+                        null,
+                        1024,
+                        backend,
+                        optimise,
+                        renderPermits
+                    )
+                } catch (e: Exception) {
+                    stream.println("Compilation failed unexpectedly: $e")
+                    1
+                } catch (e: StackOverflowError) {
+                    stream.println("Compilation failed unexpectedly: $e")
+                    1
+                }
+            }
+        }
+        return BatchResult(program, exitCode, (System.nanoTime() - start) / 1e9, captured.toString("UTF-8"))
+    }
+
+    private fun printReport(results: List<BatchResult>, seconds: Double) {
+        val nameWidth = maxOf("Program".length, results.map { it.program.name.length }.maxOrNull() ?: 0)
+        val styleWidth = maxOf("Stylesheet".length, results.map { it.program.stylesheet?.name?.length ?: 1 }.maxOrNull() ?: 0)
+        val row = "%-${nameWidth}s  %-${styleWidth}s  %-6s  %9s"
+        println(row.format("Program", "Stylesheet", "Result", "Time (s)"))
+        results.forEach {
+            val result = if (it.exitCode == 0) "ok" else "failed"
+            println(row.format(it.program.name, it.program.stylesheet?.name ?: "-", result, "%.2f".format(it.seconds)))
+        }
+
+        val failed = results.filter { it.exitCode != 0 }
+        println()
+        println("Compiled ${results.size - failed.size} of ${results.size} programs in ${"%.2f".format(seconds)}s")
+        failed.forEach {
+            println()
+            println("${it.program.name} failed:")
+            print(it.output)
+        }
+    }
+}
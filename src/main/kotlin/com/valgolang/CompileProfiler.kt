@@ -0,0 +1,276 @@
+package com.valgolang
+
+import com.google.gson.GsonBuilder
+import com.google.gson.JsonArray
+import com.google.gson.JsonNull
+import com.google.gson.JsonObject
+import com.google.gson.JsonPrimitive
+import com.valgolang.frontend.ast.ASTNode
+import com.valgolang.linearrepresentation.ManimInstr
+import java.io.File
+import java.lang.management.ManagementFactory
+import java.util.concurrent.TimeUnit
+import java.util.concurrent.locks.LockSupport
+import kotlin.concurrent.thread
+
+/**
+ * Profile of a single compile: the wall time and memory allocated by each stage of the pipeline, along with counts of
+ * what the program did, written as JSON and printed as a table once the compile is done.
+ *
+ * Stages run on the compiling thread and may be nested, such as the layout within execution. Allocations are only
+ * those of the compiling thread, so the manim processes run while rendering are not counted.
+ *
+ * @param sampleNodes: whether to sample the type of the AST node the virtual machine is executing, see [NodeSampler]
+ * @constructor Creates a new compile profiler
+ */
+class CompileProfiler(sampleNodes: Boolean = false) {
+
+    /**
+     * Time spent in a stage, over every time it was run at the same depth
+     *
+     * @property name
+     * @property depth: number of stages it was run within
+     * @constructor Create empty Stage
+     */
+    class Stage(val name: String, val depth: Int) {
+        var calls = 0
+        var wallNanos = 0L
+
+        /** Bytes allocated by the compiling thread, null if the JVM does not measure them **/
+        var allocatedBytes: Long? = null
+    }
+
+    private val threadBean = (ManagementFactory.getThreadMXBean() as? com.sun.management.ThreadMXBean)
+        ?.takeIf { it.isThreadAllocatedMemorySupported && it.isThreadAllocatedMemoryEnabled }
+
+    /** Stages by their path from the outermost stage, in the order they were first run **/
+    private val stages = LinkedHashMap<String, Stage>()
+    private val openStages = ArrayDeque<String>()
+    private val startNanos = System.nanoTime()
+    private var finishNanos: Long? = null
+
+    /** Number of statements executed by the virtual machine, including those inside function calls and loops **/
+    var statementsExecuted = 0L
+        private set
+
+    /** Number of instructions of each type produced by the virtual machine **/
+    val instructions = sortedMapOf<String, Int>()
+
+    /** Number of play and wait calls in the generated python code **/
+    var playCalls = 0
+
+    /** Sampler of the AST nodes being executed, if sampling **/
+    val nodeSampler: NodeSampler? = if (sampleNodes) NodeSampler() else null
+
+    /**
+     * Runs [block] as the stage [name], within any stage currently running
+     *
+     * @param name
+     * @param block
+     * @return value of [block]
+     */
+    fun <T> stage(name: String, block: () -> T): T {
+        val path = (openStages.lastOrNull()?.let { "$it/" } ?: "") + name
+        val stage = stages.getOrPut(path) { Stage(name, openStages.size) }
+        openStages.addLast(path)
+        val allocatedBefore = allocatedBytes()
+        val before = System.nanoTime()
+        try {
+            return block()
+        } finally {
+            stage.wallNanos += System.nanoTime() - before
+            stage.calls++
+            if (allocatedBefore != null) {
+                stage.allocatedBytes = (stage.allocatedBytes ?: 0L) + allocatedBytes()!! - allocatedBefore
+            }
+            openStages.removeLast()
+        }
+    }
+
+    fun countStatement() {
+        statementsExecuted++
+    }
+
+    fun countInstruction(instr: ManimInstr) {
+        instructions.merge(instr.javaClass.simpleName, 1, Int::plus)
+    }
+
+    private fun allocatedBytes(): Long? = threadBean?.getThreadAllocatedBytes(Thread.currentThread().id)
+
+    /**
+     * Finishes profiling, stopping any sampling
+     *
+     * @return stages run, outermost before those run within them
+     */
+    fun finish(): List<Stage> {
+        if (finishNanos == null) {
+            nodeSampler?.stop()
+            finishNanos = System.nanoTime()
+        }
+        return stages.values.toList()
+    }
+
+    private fun totalMillis(): Double = millis(finishNanos!! - startNanos)
+
+    /**
+     * Profile as JSON
+     *
+     * @return JSON object with the total wall time, every stage and the counts
+     */
+    fun toJson(): String {
+        val stages = finish()
+        val profile = JsonObject()
+        profile.addProperty("wallMillis", totalMillis())
+        profile.add(
+            "stages",
+            JsonArray().apply {
+                stages.forEach { stage ->
+                    add(
+                        JsonObject().apply {
+                            addProperty("name", stage.name)
+                            addProperty("depth", stage.depth)
+                            addProperty("calls", stage.calls)
+                            addProperty("wallMillis", millis(stage.wallNanos))
+                            add("allocatedBytes", stage.allocatedBytes?.let { JsonPrimitive(it) } ?: JsonNull.INSTANCE)
+                        }
+                    )
+                }
+            }
+        )
+        profile.addProperty("statementsExecuted", statementsExecuted)
+        profile.addProperty("playCalls", playCalls)
+        profile.add("instructions", JsonObject().apply { instructions.forEach { (type, count) -> addProperty(type, count) } })
+        nodeSampler?.let { sampler ->
+            profile.add("nodeSamples", JsonObject().apply { sampler.hottest().forEach { (type, count) -> addProperty(type, count) } })
+        }
+        return GsonBuilder().setPrettyPrinting().create().toJson(profile)
+    }
+
+    /**
+     * Profile as a table to print
+     *
+     * @return lines of the table
+     */
+    fun toTable(): List<String> {
+        val stages = finish()
+        val lines = mutableListOf<String>()
+        lines.add(String.format("%-28s %6s %12s %16s", "Stage", "Calls", "Wall (ms)", "Allocated (MB)"))
+        stages.forEach { stage ->
+            lines.add(
+                String.format(
+                    "%-28s %6d %12.1f %16s",
+                    "  ".repeat(stage.depth) + stage.name,
+                    stage.calls,
+                    millis(stage.wallNanos),
+                    stage.allocatedBytes?.let { String.format("%.1f", it / (1024.0 * 1024.0)) } ?: "-"
+                )
+            )
+        }
+        lines.add(String.format("%-28s %6s %12.1f", "total", "", totalMillis()))
+        lines.add("")
+        lines.add("Statements executed: $statementsExecuted")
+        lines.add("Instructions emitted: ${instructions.values.sum()}")
+        instructions.entries.sortedByDescending { it.value }.forEach { (type, count) ->
+            lines.add(String.format("  %-32s %8d", type, count))
+        }
+        lines.add("Play calls generated: $playCalls")
+        nodeSampler?.let { sampler ->
+            val samples = sampler.hottest()
+            val total = samples.values.sum()
+            lines.add("Hottest AST node types ($total samples):")
+            samples.entries.take(HOTTEST_NODE_TYPES).forEach { (type, count) ->
+                lines.add(String.format("  %-32s %7.1f%%", type, 100.0 * count / total))
+            }
+        }
+        return lines
+    }
+
+    /**
+     * Writes the profile as JSON to [file]
+     *
+     * @param file
+     */
+    fun write(file: File) {
+        file.absoluteFile.parentFile?.mkdirs()
+        file.writeText(toJson())
+    }
+
+    private fun millis(nanos: Long): Double = nanos / TimeUnit.MILLISECONDS.toNanos(1).toDouble()
+
+    /**
+     * Sampler of the type of the AST node being executed, in the manner of a sampling profiler such as JFR: the
+     * virtual machine only records the node it is executing, and a separate thread reads it at a fixed interval.
+     * The types seen most often are where execution spends its time, including the time spent on animations.
+     *
+     * @param intervalMicros: time between samples
+     * @constructor Creates a new node sampler and starts sampling
+     */
+    class NodeSampler(private val intervalMicros: Long = 500) {
+
+        /** Node the virtual machine is executing, null outside of execution **/
+        @Volatile
+        var current: ASTNode? = null
+
+        @Volatile
+        private var running = true
+
+        /** Only touched by the sampling thread until it has stopped **/
+        private val samples = HashMap<String, Int>()
+
+        private val sampler = thread(isDaemon = true, name = "valgolang-node-sampler") {
+            while (running) {
+                LockSupport.parkNanos(TimeUnit.MICROSECONDS.toNanos(intervalMicros))
+                current?.let { samples.merge(it.javaClass.simpleName, 1, Int::plus) }
+            }
+        }
+
+        /**
+         * Records that execution is entering [node]
+         *
+         * @param node
+         * @return node previously being executed, to be passed to [exit]
+         */
+        fun enter(node: ASTNode): ASTNode? {
+            val previous = current
+            current = node
+            return previous
+        }
+
+        /**
+         * Records that execution has returned to [previous]
+         *
+         * @param previous
+         */
+        fun exit(previous: ASTNode?) {
+            current = previous
+        }
+
+        fun stop() {
+            running = false
+            sampler.join()
+        }
+
+        /**
+         * Samples taken of each node type, most often seen first. Only read once [stop] has been called.
+         *
+         * @return number of samples by node type
+         */
+        fun hottest(): Map<String, Int> =
+            samples.entries.sortedByDescending { it.value }.associate { it.key to it.value }
+    }
+
+    companion object {
+        private const val HOTTEST_NODE_TYPES = 10
+    }
+}
+
+/**
+ * Runs [block] as the stage [name] of [profiler], or simply runs it when not profiling
+ *
+ * @param profiler
+ * @param name
+ * @param block
+ * @return value of [block]
+ */
+fun <T> profiled(profiler: CompileProfiler?, name: String, block: () -> T): T =
+    if (profiler == null) block() else profiler.stage(name, block)
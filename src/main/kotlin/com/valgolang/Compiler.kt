@@ -1,13 +1,25 @@
 package com.valgolang
 
 import com.valgolang.animation.ManimProjectWriter
+import com.valgolang.animation.ManimStreamWriter
 import com.valgolang.animation.ManimWriter
+import com.valgolang.animation.RenderProfile
+import com.valgolang.animation.SceneSegment
+import com.valgolang.animation.SegmentCache
+import com.valgolang.animation.SegmentedRender
+import com.valgolang.errorhandling.ErrorHandler
+import com.valgolang.optimisation.Optimiser
+import com.valgolang.optimisation.ScheduleAnimations
+import com.valgolang.runtime.ExecutionCheckpoints
 import com.valgolang.runtime.VirtualMachine
+import com.valgolang.runtime.datastructures.LayoutCache
+import com.valgolang.stylesheet.InvalidStylesheetException
 import com.valgolang.stylesheet.Stylesheet
 import picocli.CommandLine
 import picocli.CommandLine.*
 import java.io.File
 import java.util.concurrent.Callable
+import java.util.concurrent.Semaphore
 import kotlin.system.exitProcess
 
 /**
@@ -20,95 +32,247 @@ import kotlin.system.exitProcess
  * @param manimOptions: Options to pass to manim (video quality, whether to show video location in file system, whether to open video once finished)
  * @param stylesheetPath: Path to stylesheet
  * @param boundaries: Whether to print out boundaries of shapes
+ * @param jobs: Number of manim processes to render the animation with
+ * @param cacheDir: Directory to cache rendered segments of the animation in, if any
+ * @param cacheSize: Maximum size of the segment cache in megabytes
+ * @param backend: Form of the generated python code
+ * @param optimise: Whether to run the optimisation passes over the linear representation before code generation
+ * @param renderPermits: Permits shared between concurrent compiles, one of which is held while running manim, if any
+ * @param layoutCacheDir: Directory to cache computed layouts and printed boundaries in, if any
+ * @param incremental: Whether to carry on from the checkpoints of earlier compiles in this process, only executing what changed
+ * @param profiler: Profiler to record each stage of the compile with, if profiling
+ * @param renderProfilePath: File for the generated scene to write the render time of each line of the program to, if any
+ * @return exit code of the compilation
  */
-private fun compile(
+internal fun compile(
     filename: String,
     outputVideoFile: String,
     generatePython: Boolean,
     onlyGenerateManim: Boolean,
     manimOptions: List<String>,
     stylesheetPath: String?,
-    boundaries: Boolean
-) {
+    boundaries: Boolean,
+    jobs: Int,
+    cacheDir: String?,
+    cacheSize: Long,
+    backend: Backend,
+    optimise: Boolean,
+    renderPermits: Semaphore? = null,
+    layoutCacheDir: String? = null,
+    incremental: Boolean = false,
+    profiler: CompileProfiler? = null,
+    renderProfilePath: String? = null
+): Int {
+    /** Messages go to the output of the current compile, which is not stdout when running as a daemon **/
+    val output = ErrorHandler.output
     val file = File(filename)
     /** Check if file path is valid **/
     if (!file.isFile) {
-        println("Please enter a valid file name: $filename not found")
-        exitProcess(1)
+        output.println("Please enter a valid file name: $filename not found")
+        return 1
     }
 
     /** Check if stylesheet path is valid **/
     if (stylesheetPath != null && !File(stylesheetPath).isFile) {
-        println("Please enter a valid stylesheet file: $stylesheetPath not found")
-        exitProcess(1)
+        output.println("Please enter a valid stylesheet file: $stylesheetPath not found")
+        return 1
     }
 
-    println("Compiling...")
+    /** Only python source has a place for the probes of a render profile **/
+    if (renderProfilePath != null && backend != Backend.SOURCE) {
+        output.println("Render profiles can only be generated with the ${Backend.SOURCE} backend")
+        return 1
+    }
+    val renderProfile = renderProfilePath?.let { File(it).absoluteFile }
+
+    output.println("Compiling...")
+
+    /** Boundaries of a program and stylesheet that have not changed are printed again without compiling **/
+    val layoutCache = LayoutCache(layoutCacheDir?.let { File(it) })
+    val programText = file.readText()
+    val stylesheetText = stylesheetPath?.let { File(it).readText() }
+    if (boundaries) {
+        layoutCache.findBoundaries(programText, stylesheetText)?.let {
+            output.println(it)
+            return 0
+        }
+    }
 
     /** Parse file to get ANTLR parse tree **/
     val parser = VAlgoLangASTGenerator(file.inputStream())
-    val (syntaxErrorStatus, program) = parser.parseFile()
+    val (syntaxErrorStatus, program) = profiled(profiler, "parse") { parser.parseFile() }
 
     /** Throw syntax errors and exit if any exist **/
     if (syntaxErrorStatus != ExitStatus.EXIT_SUCCESS) {
-        exitProcess(syntaxErrorStatus.code)
+        return syntaxErrorStatus.code
     }
 
     /** Visit ANTLR parse tree to generate AST **/
-    val (semanticErrorStatus, abstractSyntaxTree, symbolTable, lineNodeMap) = parser.convertToAst(program)
+    val (semanticErrorStatus, abstractSyntaxTree, symbolTable, lineNodeMap) =
+        profiled(profiler, "semantic analysis") { parser.convertToAst(program) }
 
     /** Throw semantic errors and exit if any exist **/
     if (semanticErrorStatus != ExitStatus.EXIT_SUCCESS) {
-        exitProcess(semanticErrorStatus.code)
+        return semanticErrorStatus.code
     }
 
-    val stylesheet = Stylesheet(stylesheetPath, symbolTable)
+    val stylesheet = try {
+        profiled(profiler, "stylesheet") { Stylesheet(stylesheetPath, symbolTable) }
+    } catch (e: InvalidStylesheetException) {
+        output.println(e.message)
+        return 1
+    }
 
-    /** Run virtual machine and execute AST to generate linear representation **/
-    val (runtimeErrorStatus, manimInstructions) = VirtualMachine(
-        abstractSyntaxTree,
-        symbolTable,
-        lineNodeMap,
-        file.readLines(),
-        stylesheet,
-        boundaries
-    ).runProgram()
+    val optimisationPasses = (if (optimise) Optimiser.DEFAULT_PASSES else emptyList()) +
+        (if (stylesheet.getMergeAnimations()) listOf(ScheduleAnimations()) else emptyList())
+    val segmented = jobs > 1 || cacheDir != null
+    /** Unless something needs the whole linear representation, python is written as the virtual machine produces it **/
+    val streamed = backend == Backend.SOURCE && optimisationPasses.isEmpty() && !segmented && !boundaries && !incremental
+    /** Streamed python is written while the virtual machine runs, so the two are profiled as a single stage **/
+    val codeGenerationStage = if (streamed) "execution and code generation" else "code generation"
+
+    var segments: List<SceneSegment> = emptyList()
+    var runtimeLibrary = ""
+    var runtimeErrorStatus = ExitStatus.EXIT_SUCCESS
+    /** Instructions are shared with the checkpoints of other compiles, so those runs are executed and written one at a time **/
+    val checkpointLock = if (incremental) ExecutionCheckpoints.shared.lock else null
+    checkpointLock?.lock()
+    val outputFile = try {
+        val writer = if (streamed) {
+            ManimProjectWriter { out ->
+                val manimWriter = ManimWriter(emptyList(), renderProfile = renderProfile?.path)
+                manimWriter.startStream(out)
+                val virtualMachine = VirtualMachine(
+                    abstractSyntaxTree,
+                    symbolTable,
+                    lineNodeMap,
+                    file.readLines(),
+                    stylesheet,
+                    instructionSink = {
+                        profiler?.countInstruction(it)
+                        manimWriter.streamInstruction(out, it)
+                    },
+                    layoutCache = layoutCache,
+                    profiler = profiler
+                )
+                runtimeErrorStatus = virtualMachine.runProgram().first
+                manimWriter.endStream(out, virtualMachine.lateBoundBoundaries)
+                profiler?.playCalls = manimWriter.playCalls
+            }
+        } else {
+            /** Run virtual machine and execute AST to generate linear representation **/
+            val virtualMachine = VirtualMachine(
+                abstractSyntaxTree,
+                symbolTable,
+                lineNodeMap,
+                file.readLines(),
+                stylesheet,
+                boundaries,
+                layoutCache = layoutCache,
+                checkpoints = checkpointLock?.let { ExecutionCheckpoints.shared },
+                checkpointSeed = stylesheetText ?: "",
+                profiler = profiler
+            )
+            val (exitStatus, linearRepresentation) = profiled(profiler, "execution") { virtualMachine.runProgram() }
+            profiler?.let { linearRepresentation.forEach(it::countInstruction) }
+
+            /** Throw runtime errors and exit if any exist **/
+            if (boundaries || exitStatus != ExitStatus.EXIT_SUCCESS) {
+                val printedBoundaries = virtualMachine.printedBoundaries
+                if (exitStatus == ExitStatus.EXIT_SUCCESS && printedBoundaries != null) {
+                    layoutCache.storeBoundaries(programText, stylesheetText, printedBoundaries)
+                }
+                return exitStatus.code
+            }
+
+            /** Remove redundant instructions from linear representation and merge independent animations if requested **/
+            val manimInstructions = if (optimisationPasses.isNotEmpty()) {
+                val (optimisedInstructions, reports) =
+                    profiled(profiler, "optimisation") { Optimiser(optimisationPasses).optimise(linearRepresentation) }
+                reports.forEach { output.println("Optimisation pass ${it.passName} removed at least ${it.playCallsRemoved} play call(s)") }
+                optimisedInstructions
+            } else {
+                linearRepresentation
+            }
+
+            /** Code generation into python and manim **/
+            when (backend) {
+                Backend.SOURCE -> {
+                    val manimWriter = ManimWriter(manimInstructions, segmented, renderProfile?.path)
+                    segments = manimWriter.segments
+                    runtimeLibrary = manimWriter.runtimeLibrary
+                    ManimProjectWriter { out ->
+                        manimWriter.write(out)
+                        profiler?.playCalls = manimWriter.playCalls
+                    }
+                }
+                Backend.STREAM -> {
+                    val manimWriter = ManimStreamWriter(manimInstructions, segmented)
+                    val (pythonCode, instructionStream) = profiled(profiler, "code generation") { manimWriter.build() }
+                    segments = manimWriter.segments
+                    runtimeLibrary = manimWriter.runtimeLibrary
+                    profiler?.playCalls = manimWriter.playCalls
+                    ManimProjectWriter(pythonCode, instructionStream)
+                }
+            }
+        }
 
-    if (boundaries) {
-        exitProcess(runtimeErrorStatus.code)
+        /** Create python file to be executed **/
+        if (generatePython) {
+            val pythonOutputFile = outputVideoFile.removeSuffix(".mp4") + ".py"
+            output.println("Writing file to $pythonOutputFile")
+            val pythonFile = profiled(profiler, codeGenerationStage) {
+                writer.createPythonFile(pythonOutputFile)
+            }
+            if (runtimeErrorStatus == ExitStatus.EXIT_SUCCESS) {
+                output.println("File written successfully!")
+            }
+            pythonFile
+        } else {
+            profiled(profiler, codeGenerationStage) { writer.createPythonFile() }
+        }
+    } finally {
+        checkpointLock?.unlock()
     }
 
-    /** Throw runtime errors and exit if any exist **/
+    /** Throw runtime errors found while streaming and exit, leaving no partially generated file behind **/
     if (runtimeErrorStatus != ExitStatus.EXIT_SUCCESS) {
-        exitProcess(runtimeErrorStatus.code)
-    }
-
-    /** Code generation into python and manim **/
-    val writer = ManimProjectWriter(ManimWriter(manimInstructions).build())
-
-    /** Create python file to be executed **/
-    val outputFile = if (generatePython) {
-        val pythonOutputFile = outputVideoFile.removeSuffix(".mp4") + ".py"
-        println("Writing file to $pythonOutputFile")
-        val output = writer.createPythonFile(if (generatePython) pythonOutputFile else null)
-        println("File written successfully!")
-        output
-    } else {
-        writer.createPythonFile()
+        File(outputFile).delete()
+        return runtimeErrorStatus.code
     }
 
     /** Run manim on python file to produce MP4 video **/
     if (!onlyGenerateManim) {
-        println("Generating animation...")
-        val exitCode = writer.generateAnimation(outputFile, manimOptions, outputVideoFile)
+        output.println("Generating animation...")
+        val segmentedRender = if (segmented) {
+            SegmentedRender(
+                segments,
+                jobs,
+                cacheDir?.let { SegmentCache(File(it), cacheSize * 1024 * 1024) },
+                runtimeLibrary
+            )
+        } else null
+        renderPermits?.acquire()
+        val exitCode = try {
+            profiled(profiler, "render") { writer.generateAnimation(outputFile, manimOptions, outputVideoFile, segmentedRender) }
+        } finally {
+            renderPermits?.release()
+        }
 
         if (exitCode != 0) {
-            println("Animation could not be generated")
-            exitProcess(1)
+            output.println("Animation could not be generated")
+            return 1
         }
 
-        println("Animation saved to $outputVideoFile")
+        output.println("Animation saved to $outputVideoFile")
+        if (renderProfile != null) {
+            val fileLines = file.readLines()
+            val entries = RenderProfile.collect(renderProfile, fileLines)
+            output.println("Render profile written to $renderProfilePath")
+            RenderProfile.summary(entries, fileLines).forEach(output::println)
+        }
     }
+    return 0
 }
 
 /**
@@ -116,10 +280,27 @@ private fun compile(
  *
  * @constructor Create empty Animation quality
  */
-enum class AnimationQuality {
-    LOW,
-    MEDIUM,
-    HIGH;
+enum class AnimationQuality(val manimArgument: String) {
+    LOW("-l"),
+    MEDIUM("-m"),
+    HIGH("--high_quality");
+
+    override fun toString(): String {
+        return this.name.toLowerCase()
+    }
+}
+
+/**
+ * Form of the generated python code
+ *
+ * @constructor Create empty Backend
+ */
+enum class Backend {
+    /** Every instruction is written out as python source in the scene's construct method **/
+    SOURCE,
+
+    /** Instructions are serialised into a compressed stream run by a fixed python interpreter **/
+    STREAM;
 
     override fun toString(): String {
         return this.name.toLowerCase()
@@ -133,14 +314,19 @@ enum class AnimationQuality {
     name = "valgolang",
     mixinStandardHelpOptions = true,
     version = ["valgolang 1.0"],
-    description = ["VAlgoLang interpreter to produce manim animations."]
+    description = ["VAlgoLang interpreter to produce manim animations."],
+    subcommands = [DaemonCommand::class, BatchCommand::class]
 )
 open class DSLCommandLineArguments : Callable<Int> {
 
     val manimArguments = mutableListOf<String>()
 
-    @Parameters(index = "0", description = ["The .val file to compile and animate."])
-    lateinit var file: String
+    @Spec
+    lateinit var spec: Model.CommandSpec
+
+    // Optional so that subcommands can be run without a file
+    @Parameters(index = "0", arity = "0..1", description = ["The .val file to compile and animate."])
+    var file: String? = null
 
     @Option(names = ["-o", "--output"], description = ["The animated mp4 file location (default: \${DEFAULT-VALUE})."])
     var output: String = "out.mp4"
@@ -157,6 +343,39 @@ open class DSLCommandLineArguments : Callable<Int> {
     @Option(names = ["-b", "--boundaries"], description = ["Print out boundaries of shapes"], hidden = true)
     var boundaries: Boolean = false
 
+    @Option(names = ["-j", "--jobs"], description = ["Number of manim processes to render segments of the animation in parallel (default: \${DEFAULT-VALUE})."])
+    var jobs: Int = 1
+
+    @Option(names = ["--cache_dir"], description = ["Directory to cache rendered segments of the animation in, so recompiles only render what changed (optional)."])
+    var cacheDir: String? = null
+
+    @Option(names = ["--cache_size"], description = ["Maximum size of the segment cache in megabytes (default: \${DEFAULT-VALUE})."])
+    var cacheSize: Long = 1024
+
+    @Option(names = ["--layout_cache"], description = ["Directory to cache computed layouts of data structures in, shared between compiles (optional)."])
+    var layoutCache: String? = null
+
+    @Option(names = ["--incremental"], description = ["Only execute the statements after the first change since the last compile of the program in this process, such as the daemon (optional)."])
+    var incremental: Boolean = false
+
+    @Option(
+        names = ["--backend"],
+        description = ["Form of the generated python code. [\${COMPLETION-CANDIDATES}] (default: \${DEFAULT-VALUE})."]
+    )
+    var backend: Backend = Backend.SOURCE
+
+    @Option(names = ["-O", "--optimise"], description = ["Remove redundant animations, collapsing sped up regions, before generating code (optional)."])
+    var optimise: Boolean = false
+
+    @Option(names = ["--profile"], description = ["File to write the time, allocations and counts of each stage of the compile to as JSON, also printed as a table (optional)."])
+    var profile: String? = null
+
+    @Option(names = ["--profile_nodes"], description = ["Sample the types of AST node executed while profiling (optional)."])
+    var profileNodes: Boolean = false
+
+    @Option(names = ["--render_profile"], description = ["File for the animation to write the time taken to render each line of the program to as JSON (optional)."])
+    var renderProfile: String? = null
+
     @Option(names = ["--progress_bars"], description = ["Print out and leave progress bars from manim"])
     fun progressBars(progressBars: Boolean = false) {
         if (progressBars) {
@@ -170,11 +389,7 @@ open class DSLCommandLineArguments : Callable<Int> {
         description = ["Quality of animation. [\${COMPLETION-CANDIDATES}] (default: \${DEFAULT-VALUE})."]
     )
     fun quality(quality: AnimationQuality = AnimationQuality.LOW) {
-        when (quality) {
-            AnimationQuality.LOW -> manimArguments.add("-l")
-            AnimationQuality.HIGH -> manimArguments.add("--high_quality")
-            AnimationQuality.MEDIUM -> manimArguments.add("-m")
-        }
+        manimArguments.add(quality.manimArgument)
     }
 
     @Option(names = ["-f", "--open_file"], description = ["Show the output file in file manager (optional)."])
@@ -188,8 +403,14 @@ open class DSLCommandLineArguments : Callable<Int> {
     }
 
     override fun call(): Int {
-        compile(file, output, python, manim, manimArguments, stylesheet, boundaries)
-        return 0
+        val programFile = file ?: throw ParameterException(spec.commandLine(), "Missing required parameter: '<file>'")
+        val profiler = profile?.let { CompileProfiler(profileNodes) }
+        val exitCode = compile(programFile, output, python, manim, manimArguments, stylesheet, boundaries, jobs, cacheDir, cacheSize, backend, optimise, layoutCacheDir = layoutCache, incremental = incremental, profiler = profiler, renderProfilePath = renderProfile)
+        if (profiler != null) {
+            profiler.write(File(profile!!))
+            profiler.toTable().forEach(ErrorHandler.output::println)
+        }
+        return exitCode
     }
 }
 
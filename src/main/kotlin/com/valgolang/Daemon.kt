@@ -0,0 +1,130 @@
+package com.valgolang
+
+import com.google.gson.Gson
+import com.google.gson.JsonElement
+import com.google.gson.JsonParseException
+import com.valgolang.errorhandling.ErrorHandler
+import picocli.CommandLine
+import picocli.CommandLine.Command
+import picocli.CommandLine.Option
+import java.io.ByteArrayOutputStream
+import java.io.File
+import java.io.InputStream
+import java.io.OutputStream
+import java.io.PrintStream
+import java.io.PrintWriter
+import java.net.InetAddress
+import java.net.ServerSocket
+import java.util.concurrent.Callable
+import java.util.concurrent.ExecutorService
+import java.util.concurrent.Executors
+import kotlin.concurrent.thread
+
+/**
+ * Compile request sent to the daemon
+ *
+ * @property id: identifier echoed back in the response, as responses may arrive out of order
+ * @property args: command line arguments, exactly as passed to valgolang
+ * @property source: program to compile instead of the file named in [args], if any
+ * @constructor Create empty Daemon request
+ */
+data class DaemonRequest(val id: JsonElement? = null, val args: List<String> = emptyList(), val source: String? = null)
+
+/**
+ * Response to a [DaemonRequest]
+ *
+ * @property id
+ * @property exitCode: exit code the compile would have exited valgolang with
+ * @property output: everything the compile printed
+ * @constructor Create empty Daemon response
+ */
+data class DaemonResponse(val id: JsonElement?, val exitCode: Int, val output: String)
+
+/**
+ * Compile daemon, keeping the JVM, the parser's DFA cache and the loaded python resources warm between compiles.
+ *
+ * Requests are [DaemonRequest]s in JSON, one per line, read from stdin or from connections to a port on the loopback
+ * interface. Each request runs on a worker thread with its own error state and is answered with a [DaemonResponse]
+ * line as soon as it finishes.
+ *
+ * Requests passing --incremental carry on from the checkpoints left by earlier requests for the same program, so an
+ * edited program only executes the statements after its first change.
+ */
+@Command(
+    name = "daemon",
+    mixinStandardHelpOptions = true,
+    description = ["Serve compile requests, one JSON object per line, from stdin or a local port."]
+)
+class DaemonCommand : Callable<Int> {
+
+    @Option(names = ["--port"], description = ["Loopback port to accept requests on, or 0 to read them from stdin (default: \${DEFAULT-VALUE})."])
+    var port: Int = 0
+
+    @Option(names = ["--threads"], description = ["Number of requests to compile at once (default: number of processors)."])
+    var threads: Int = Runtime.getRuntime().availableProcessors()
+
+    private val gson = Gson()
+
+    override fun call(): Int {
+        val executor = Executors.newFixedThreadPool(maxOf(threads, 1))
+        try {
+            if (port == 0) {
+                serve(System.`in`, System.out, executor)
+            } else {
+                ServerSocket(port, 0, InetAddress.getLoopbackAddress()).use { server ->
+                    while (true) {
+                        val socket = server.accept()
+                        thread { socket.use { serve(it.getInputStream(), it.getOutputStream(), executor) } }
+                    }
+                }
+            }
+        } finally {
+            executor.shutdown()
+        }
+        return 0
+    }
+
+    // Answers every request read from input, returning once all of them have been answered
+    internal fun serve(input: InputStream, output: OutputStream, executor: ExecutorService) {
+        val writer = PrintWriter(output.bufferedWriter())
+        val pending = input.bufferedReader().lineSequence().filter { it.isNotBlank() }.map { line ->
+            executor.submit(
+                Runnable {
+                    val response = gson.toJson(handle(line))
+                    synchronized(writer) {
+                        writer.println(response)
+                        writer.flush()
+                    }
+                }
+            )
+        }.toList()
+        pending.forEach { it.get() }
+    }
+
+    private fun handle(line: String): DaemonResponse {
+        val request: DaemonRequest = try {
+            gson.fromJson(line, DaemonRequest::class.java)
+        } catch (e: JsonParseException) {
+            null
+        } ?: return DaemonResponse(null, 1, "Invalid request: $line")
+
+        val captured = ByteArrayOutputStream()
+        val exitCode = PrintStream(captured, true, "UTF-8").use { stream ->
+            ErrorHandler.withOutput(stream) { compileRequest(request, stream) }
+        }
+        return DaemonResponse(request.id, exitCode, captured.toString("UTF-8"))
+    }
+
+    private fun compileRequest(request: DaemonRequest, output: PrintStream): Int {
+        val sourceFile = request.source?.let { source ->
+            File.createTempFile("valgolang", ".val").apply { writeText(source) }
+        }
+        try {
+            val args = listOfNotNull(sourceFile?.path) + request.args
+            val writer = PrintWriter(output, true)
+            return CommandLine(DSLCommandLineArguments()).setOut(writer).setErr(writer).execute(*args.toTypedArray())
+        } finally {
+            sourceFile?.delete()
+        }
+    }
+}
@@ -1,6 +1,7 @@
 package com.valgolang.animation
 
 import java.io.File
+import java.io.Writer
 import java.nio.file.Files
 import java.nio.file.Paths
 import java.util.*
@@ -8,28 +9,39 @@ import java.util.*
 /**
  * Writer that produces the output animation video and/or the python file
  *
- * @property pythonCode: string containing all the python code that generates the animation
+ * @property writePython: writes all the python code that generates the animation, which need not be held in memory at once
+ * @property instructionStream: instruction stream read by the python code, null if it does not use one
  * @constructor Creates a new Manim project writer
  */
-class ManimProjectWriter(private val pythonCode: String) {
+class ManimProjectWriter(private val writePython: (Writer) -> Unit, private val instructionStream: ByteArray? = null) {
+
+    /**
+     * Creates a Manim project writer for python code already generated
+     *
+     * @param pythonCode: string containing all the python code that generates the animation
+     * @param instructionStream: instruction stream read by the python code, null if it does not use one
+     */
+    constructor(pythonCode: String, instructionStream: ByteArray? = null) : this({ out -> out.write(pythonCode) }, instructionStream)
 
     /**
      * Creates and writes the python code generated to a python file if input fileName is provided,
-     * otherwise creates and writes to a temporary file
+     * otherwise creates and writes to a temporary file. Any instruction stream is written next to it.
      *
      * @param fileName
      * @return name of output file or the path to the temporary file
      */
     fun createPythonFile(fileName: String? = null): String {
-        return if (fileName !== null) {
-            Files.createDirectories(Paths.get(fileName.split("/").dropLast(1).joinToString("")))
-            File(fileName).writeText(pythonCode)
+        val path = if (fileName !== null) {
+            Files.createDirectories(Paths.get(fileName.split("/").dropLast(1).joinToString("/")))
             fileName
         } else {
-            val tempFile = File.createTempFile("tmp", ".py")
-            tempFile.writeText(pythonCode)
-            tempFile.path
+            File.createTempFile("tmp", ".py").path
+        }
+        File(path).bufferedWriter().use(writePython)
+        if (instructionStream != null) {
+            File(path.removeSuffix(".py") + ManimStreamWriter.STREAM_EXTENSION).writeBytes(instructionStream)
         }
+        return path
     }
 
     /**
@@ -38,19 +50,131 @@ class ManimProjectWriter(private val pythonCode: String) {
      * @param fileName: name of python file to be executed
      * @param options: CLI options for generating manim animation, such as quality
      * @param outputFile: name of output mp4 file
+     * @param segmentedRender: how to render the checkpointed segments of the python file, null to render it in one go
      * @return exit code from generating animation and writing it to output mp4
      */
-    fun generateAnimation(fileName: String, options: List<String>, outputFile: String): Int {
-        Files.createDirectories(Paths.get(outputFile.split("/").dropLast(1).joinToString("")))
+    fun generateAnimation(fileName: String, options: List<String>, outputFile: String, segmentedRender: SegmentedRender? = null): Int {
+        Files.createDirectories(Paths.get(outputFile.split("/").dropLast(1).joinToString("/")))
         val uid = UUID.randomUUID().toString()
-        val commandOptions = options.joinToString(" ")
-        val manimExitCode = ProcessBuilder("manim $fileName Main $commandOptions --media_dir $uid --video_output_dir $uid".split(" "))
-            .redirectError(ProcessBuilder.Redirect.INHERIT)
-            .start().waitFor()
+        val manimExitCode = if (segmentedRender != null && (segmentedRender.jobs > 1 || segmentedRender.cache != null)) {
+            renderSegments(fileName, options, uid, segmentedRender)
+        } else {
+            startManim(fileName, options, uid).waitFor()
+        }
         val copyExitCode = ProcessBuilder("cp -f $uid/Main.mp4 $outputFile".split(" "))
             .start().waitFor()
         val removeTempExitCode = ProcessBuilder("rm -rf $uid".split(" "))
             .start().waitFor()
         return copyExitCode + manimExitCode + removeTempExitCode
     }
+
+    private fun startManim(fileName: String, options: List<String>, outputDir: String, segment: Pair<Int, Int>? = null): Process {
+        val commandOptions = options.joinToString(" ")
+        val processBuilder = ProcessBuilder("manim $fileName Main $commandOptions --media_dir $outputDir --video_output_dir $outputDir".split(" "))
+            .redirectError(ProcessBuilder.Redirect.INHERIT)
+        if (segment != null) {
+            processBuilder.environment()["VALGOLANG_SEGMENT"] = "${segment.first}:${segment.second}"
+        }
+        return processBuilder.start()
+    }
+
+    /**
+     * Renders ranges of segments in separate manim processes, reusing cached ones where possible,
+     * and losslessly joins the partial videos into $outputDir/Main.mp4 in scene order.
+     */
+    private fun renderSegments(fileName: String, options: List<String>, outputDir: String, segmentedRender: SegmentedRender): Int {
+        val (segments, jobs, cache, cacheSeed) = segmentedRender
+        val runtimes = segments.map { it.runtime }
+        val ranges = if (cache == null) partitionSegments(runtimes, jobs) else coarsenSegments(runtimes, MIN_CACHED_SEGMENT_RUNTIME)
+        // Preview options apply to the joined video only
+        val segmentOptions = options.filterNot { it == "-p" || it == "-f" }
+        val keys = cache?.keys(
+            cacheSeed + segmentOptions.joinToString(" "),
+            ranges.map { (start, end) -> segments.subList(start, end).joinToString("\n") { it.code } }
+        )
+        val videos = ranges.indices.map { File("$outputDir/part$it/Main.mp4") }
+        val toRender = ranges.indices.filter { keys == null || cache?.restore(keys[it], videos[it]) != true }
+
+        val renderExitCode = toRender.chunked(maxOf(jobs, 1)).sumBy { batch ->
+            batch.map { startManim(fileName, segmentOptions, videos[it].parent, ranges[it]) }.sumBy { it.waitFor() }
+        }
+        if (renderExitCode != 0) {
+            return renderExitCode
+        }
+        if (cache != null && keys != null) {
+            toRender.forEach { cache.store(keys[it], videos[it]) }
+        }
+
+        val concatList = File("$outputDir/segments.txt")
+        concatList.writeText(videos.joinToString("\n") { "file '${it.absolutePath}'" })
+        return ProcessBuilder("ffmpeg -y -loglevel error -f concat -safe 0 -i ${concatList.path} -c copy $outputDir/Main.mp4".split(" "))
+            .redirectError(ProcessBuilder.Redirect.INHERIT)
+            .start().waitFor()
+    }
+
+    /**
+     * Splits segments into at most [jobs] contiguous ranges of roughly equal runtime.
+     *
+     * @param segmentRuntimes: estimated runtime of each segment
+     * @param jobs: maximum number of ranges
+     * @return list of [start, end) segment index ranges covering every segment
+     */
+    fun partitionSegments(segmentRuntimes: List<Double>, jobs: Int): List<Pair<Int, Int>> {
+        val target = segmentRuntimes.sum() / jobs
+        val ranges = mutableListOf<Pair<Int, Int>>()
+        var start = 0
+        var accumulated = 0.0
+        segmentRuntimes.forEachIndexed { index, runtime ->
+            accumulated += runtime
+            val isLast = index == segmentRuntimes.lastIndex
+            if (isLast || (ranges.size < jobs - 1 && accumulated >= target * (ranges.size + 1))) {
+                ranges.add(Pair(start, index + 1))
+                start = index + 1
+            }
+        }
+        return ranges
+    }
+
+    /**
+     * Groups segments into contiguous ranges running for at least [minRuntime] each, apart from the last one.
+     * Ranges only depend on the runtimes up to their end, so an edit leaves the ranges before it unchanged.
+     *
+     * @param segmentRuntimes: estimated runtime of each segment
+     * @param minRuntime: minimum runtime of a range
+     * @return list of [start, end) segment index ranges covering every segment
+     */
+    fun coarsenSegments(segmentRuntimes: List<Double>, minRuntime: Double): List<Pair<Int, Int>> {
+        val ranges = mutableListOf<Pair<Int, Int>>()
+        var start = 0
+        var accumulated = 0.0
+        segmentRuntimes.forEachIndexed { index, runtime ->
+            accumulated += runtime
+            if (accumulated >= minRuntime || index == segmentRuntimes.lastIndex) {
+                ranges.add(Pair(start, index + 1))
+                start = index + 1
+                accumulated = 0.0
+            }
+        }
+        return ranges
+    }
+
+    companion object {
+        /** Cached segments are at least this long so that manim start-up does not dominate their render time **/
+        const val MIN_CACHED_SEGMENT_RUNTIME = 10.0
+    }
 }
+
+/**
+ * Settings for rendering a scene split into checkpointed segments
+ *
+ * @property segments: segments of the scene in order
+ * @property jobs: number of manim processes to render segments with at once
+ * @property cache: cache to reuse previously rendered segments from, null to always render every segment
+ * @property cacheSeed: text identifying everything outside the segments that affects rendering
+ */
+data class SegmentedRender(
+    val segments: List<SceneSegment>,
+    val jobs: Int,
+    val cache: SegmentCache? = null,
+    val cacheSeed: String = ""
+)
@@ -0,0 +1,89 @@
+package com.valgolang.animation
+
+import com.google.gson.GsonBuilder
+import com.valgolang.linearrepresentation.ManimInstr
+import com.valgolang.linearrepresentation.MoveToLine
+import com.valgolang.linearrepresentation.Sleep
+import com.valgolang.linearrepresentation.UpdateVariableState
+import java.io.ByteArrayOutputStream
+import java.util.zip.DeflaterOutputStream
+
+/**
+ * Manim writer that serialises the linear representation into a compact instruction stream instead of
+ * Python source. The generated Python file is the same fixed interpreter regardless of program length:
+ * it reads the stream from a file next to it and dispatches on opcodes.
+ *
+ * The most frequent instructions get dedicated opcodes. Every other instruction is stored as a snippet
+ * of Python code, deduplicated across the stream and compiled at most once when first executed.
+ *
+ * @property linearRepresentation: list of all the instructions to be serialised
+ * @property segmented: whether to emit checkpoints splitting the scene into independently renderable segments
+ * @constructor Creates a new Manim stream writer
+ */
+class ManimStreamWriter(private val linearRepresentation: List<ManimInstr>, private val segmented: Boolean = false) {
+
+    private val writer = ManimWriter(linearRepresentation, segmented)
+
+    /** Segments of the scene recorded by the last call to [build] **/
+    val segments: List<SceneSegment>
+        get() = writer.segments
+
+    /** Everything in the generated Python file that affects rendering apart from the stream, recorded by the last call to [build] **/
+    val runtimeLibrary: String
+        get() = writer.runtimeLibrary
+
+    /** Number of play and wait calls the stream makes, recorded by the last call to [build] **/
+    val playCalls: Int
+        get() = writer.playCalls
+
+    /**
+     * Serialises the linear representation.
+     *
+     * @return Python interpreter code and the zlib compressed instruction stream it reads
+     */
+    fun build(): Pair<String, ByteArray> {
+        val snippets = LinkedHashMap<String, Int>()
+        val instructions = mutableListOf<List<Any?>>()
+        writer.visitInstructions(
+            { instr, python ->
+                instructions.add(
+                    when (instr) {
+                        is MoveToLine -> listOf(MOVE_TO_LINE, instr.lineNumber, instr.pointerName, instr.codeBlockName, instr.codeTextVariable)
+                        is Sleep -> listOf(WAIT, instr.length)
+                        is UpdateVariableState -> listOf(
+                            UPDATE_VARIABLES,
+                            instr.ident,
+                            instr.variables.joinToString(", ", "[", "]") { "'$it'" },
+                            instr.runtime,
+                            instr.changedSlots
+                        )
+                        else -> {
+                            val code = python.filterNot { it.trimStart().startsWith("#") }.joinToString("\n")
+                            listOf(EXEC, snippets.getOrPut(code) { snippets.size })
+                        }
+                    }
+                )
+            },
+            { checkpoint -> instructions.add(listOf(CHECKPOINT, checkpoint)) }
+        )
+
+        val stream = ByteArrayOutputStream()
+        DeflaterOutputStream(stream).use {
+            it.write(GsonBuilder().disableHtmlEscaping().create().toJson(mapOf("version" to VERSION, "snippets" to snippets.keys.toList(), "instructions" to instructions)).toByteArray())
+        }
+        val construct = listOf("        self.run_instruction_stream(os.path.splitext(__file__)[0] + \"$STREAM_EXTENSION\")")
+        return Pair(writer.pythonFile(construct, listOf("python/interpreter.py")), stream.toByteArray())
+    }
+
+    companion object {
+        /** Extension of the stream file written next to the generated Python file **/
+        const val STREAM_EXTENSION = ".valstream"
+
+        private const val VERSION = 1
+        private const val EXEC = "x"
+        private const val MOVE_TO_LINE = "m"
+        private const val WAIT = "w"
+        private const val UPDATE_VARIABLES = "v"
+        private const val CHECKPOINT = "c"
+    }
+}
@@ -2,14 +2,41 @@ package com.valgolang.animation
 
 import com.valgolang.linearrepresentation.*
 import com.valgolang.linearrepresentation.datastructures.binarytree.NodeStructure
+import java.io.StringWriter
+import java.io.Writer
+import java.util.concurrent.ConcurrentHashMap
 
 /**
  * Manim writer that generates the Python code written using the manim library
  *
  * @property linearRepresentation: list of all the instructions to be converted to Python code
+ * @property segmented: whether to emit checkpoints splitting the scene into independently renderable segments
+ * @property renderProfile: file for the scene to write the render time of each instruction to, probing every
+ *                          instruction with the line of the statement it came from, if given
  * @constructor Creates a new Manim writer
  */
-class ManimWriter(private val linearRepresentation: List<ManimInstr>) {
+class ManimWriter(
+    private val linearRepresentation: List<ManimInstr>,
+    private val segmented: Boolean = false,
+    private val renderProfile: String? = null
+) {
+
+    /** Segments of the construct body recorded by the last call to [build] **/
+    var segments: List<SceneSegment> = emptyList()
+        private set
+
+    /** Everything in the generated Python file outside the construct body, recorded by the last call to [build] **/
+    var runtimeLibrary: String = ""
+        private set
+
+    /** Number of play and wait calls in the construct body written by the last call to [build], or streamed since [startStream] **/
+    var playCalls: Int = 0
+        private set
+
+    private val shapeClassPaths = mutableSetOf<String>()
+
+    /** Line probed last, for instructions without a line of their own such as those merged by optimisation passes **/
+    private var probedLine = 0
 
     /**
      * Converts linear representation to Python code written in the format compatible with manim.
@@ -17,50 +44,184 @@ class ManimWriter(private val linearRepresentation: List<ManimInstr>) {
      *
      * @return string containing all the well-formatted Python code
      */
-    fun build(): String {
-        var pythonCode = initialPythonSetup()
+    fun build(): String = StringWriter().also { write(it) }.toString()
+
+    /**
+     * Writes the Python code for the linear representation to [out] one instruction at a time,
+     * rather than building it up in memory first.
+     *
+     * @param out: writer to write the Python code to
+     */
+    fun write(out: Writer) {
+        out.write(initialPythonSetup())
+        startRenderProfile(out)
+        visitInstructions(
+            { _, python -> writeConstructLines(out, python) },
+            { checkpoint -> writeConstructLines(out, listOf("self.checkpoint($checkpoint)")) }
+        )
+        out.write(library())
+    }
 
-        val constructCodeBlock = mutableListOf<String>()
+    /**
+     * Starts writing Python code for instructions passed to [streamInstruction] as they are produced,
+     * for when the linear representation is never held in full. Finished by [endStream].
+     *
+     * @param out: writer to write the Python code to
+     */
+    fun startStream(out: Writer) {
+        shapeClassPaths.clear()
+        playCalls = 0
+        probedLine = 0
+        out.write(initialPythonSetup())
+        startRenderProfile(out)
+    }
 
-        val shapeClassPaths = mutableSetOf<String>()
-        linearRepresentation.forEach {
-            when (it) {
-                is NodeStructure -> {
-                    shapeClassPaths.addAll(listOf("python/data_structure.py", "python/rectangle.py", it.classPath))
-                }
-                is DataStructureMObject -> {
-                    shapeClassPaths.addAll(listOf("python/data_structure.py", "python/rectangle.py", it.classPath))
+    /**
+     * Writes the Python code for the next instruction of a stream started by [startStream]
+     *
+     * @param out: writer the stream was started on
+     * @param instr: next instruction
+     */
+    fun streamInstruction(out: Writer, instr: ManimInstr) {
+        recordClassPaths(instr)
+        val python = probed(instr, instr.toPython())
+        playCalls += countPlayCalls(python)
+        writeConstructLines(out, python)
+    }
+
+    /**
+     * Finishes a stream started by [startStream], defining the late bound boundaries its instructions look up
+     *
+     * @param out: writer the stream was started on
+     * @param boundaries: corners of the boundary of each shape with a late bound boundary, by uid
+     */
+    fun endStream(out: Writer, boundaries: Map<String, List<Pair<Double, Double>>>) {
+        out.write(library())
+        // Only read once the scene is constructed, by which time the whole module has been run
+        out.write("\n\nBOUNDARIES = {\n")
+        boundaries.forEach { (uid, corners) -> out.write("    \"$uid\": $corners,\n") }
+        out.write("}\n")
+    }
+
+    private fun startRenderProfile(out: Writer) {
+        if (renderProfile != null) {
+            val path = renderProfile.replace("\\", "\\\\").replace("\"", "\\\"")
+            writeConstructLines(out, listOf("self.start_render_profile(\"$path\")"))
+        }
+    }
+
+    // Wraps the code of an instruction that does something in probes timing it, when profiling the render
+    private fun probed(instr: ManimInstr, python: List<String>): List<String> {
+        if (renderProfile == null || python.all { it.isBlank() || it.trimStart().startsWith("#") }) {
+            return python
+        }
+        val line = instr.sourceLine ?: probedLine
+        probedLine = line
+        return listOf("self.begin_probe($line, \"${instr.javaClass.simpleName}\")") + python + "self.end_probe()"
+    }
+
+    private fun writeConstructLines(out: Writer, python: List<String>) {
+        out.write(printWithIndent(2, python))
+        out.write("\n")
+    }
+
+    private fun recordClassPaths(instr: ManimInstr) {
+        when (instr) {
+            is NodeStructure -> {
+                shapeClassPaths.addAll(listOf("python/data_structure.py", "python/rectangle.py", instr.classPath))
+            }
+            is DataStructureMObject -> {
+                shapeClassPaths.addAll(listOf("python/data_structure.py", "python/rectangle.py", instr.classPath))
+            }
+            is MObject -> {
+                if (instr is ShapeWithBoundary) {
+                    shapeClassPaths.add(instr.classPath)
                 }
-                is MObject -> {
-                    if (it is ShapeWithBoundary) {
-                        shapeClassPaths.add(it.classPath)
-                    }
+            }
+        }
+    }
+
+    /**
+     * Visits the linear representation in order, recording [segments] and the Python classes it needs.
+     *
+     * @param onInstruction: called with every instruction and its Python code
+     * @param onCheckpoint: called with the index of every checkpoint if [segmented] is set
+     */
+    internal fun visitInstructions(onInstruction: (ManimInstr, List<String>) -> Unit, onCheckpoint: (Int) -> Unit) {
+        shapeClassPaths.clear()
+        playCalls = 0
+        probedLine = 0
+        val sceneSegments = mutableListOf<SceneSegment>()
+        var segmentCode = mutableListOf<String>()
+        var segmentRuntime = 0.0
+        linearRepresentation.forEachIndexed { index, instr ->
+            recordClassPaths(instr)
+            val python = probed(instr, instr.toPython())
+            playCalls += countPlayCalls(python)
+            onInstruction(instr, python)
+            // Segment code is only needed to cache rendered segments, so is not kept otherwise
+            if (segmented) {
+                segmentCode.addAll(python)
+            }
+            segmentRuntime += instr.runtime
+            if (isSegmentBoundary(index)) {
+                sceneSegments.add(SceneSegment(segmentCode.joinToString("\n"), segmentRuntime))
+                segmentCode = mutableListOf()
+                segmentRuntime = 0.0
+                if (segmented) {
+                    onCheckpoint(sceneSegments.size)
                 }
             }
-            constructCodeBlock.add(printWithIndent(2, it.toPython()))
         }
-        pythonCode += constructCodeBlock.joinToString("\n") + "\n"
+        sceneSegments.add(SceneSegment(segmentCode.joinToString("\n"), segmentRuntime))
+        segments = sceneSegments
+    }
 
-        pythonCode += "\n" + printWithIndent(1, addUtilityFunctions())
+    /**
+     * Assembles the Python file around the given construct body, recording [runtimeLibrary].
+     * Must be called after [visitInstructions] so that the Python classes used are known.
+     *
+     * @param constructBody: indented lines of the construct method
+     * @param extraUtilities: resource paths of additional methods to add to the scene
+     * @return string containing all the well-formatted Python code
+     */
+    internal fun pythonFile(constructBody: List<String>, extraUtilities: List<String> = emptyList()): String {
+        return initialPythonSetup() + constructBody.joinToString("\n") + "\n" + library(extraUtilities)
+    }
 
-        pythonCode += "\n" + printWithIndent(
+    // Everything after the construct body, recording [runtimeLibrary]
+    private fun library(extraUtilities: List<String> = emptyList()): String {
+        val profileUtilities = if (renderProfile != null) listOf("python/render_profile.py") else emptyList()
+        val utilities = (listOf("python/util.py") + extraUtilities + profileUtilities).flatMap { getResourceAsText(it).split("\n") }
+        // Every class building Text goes through the shared text cache, so it is always included
+        val library = "\n" + printWithIndent(1, utilities) + "\n" + printWithIndent(
             0,
-            shapeClassPaths.map { "\n" + getResourceAsText(it) }
+            (listOf("python/text_cache.py") + shapeClassPaths).map { "\n" + getResourceAsText(it) }
         )
-
-        return pythonCode
+        runtimeLibrary = initialPythonSetup() + library
+        return library
     }
 
-    private fun addUtilityFunctions(): List<String> {
-        return getResourceAsText("python/util.py").split("\n")
+    /**
+     * Scene state is fully known after a line move or a pause, so these are safe points to split the scene.
+     * The last instruction never starts a new segment to avoid rendering an empty one.
+     */
+    private fun isSegmentBoundary(index: Int): Boolean {
+        val instr = linearRepresentation[index]
+        val movesLine = instr is MoveToLine || (instr is PlayTogether && instr.instructions.any { it is MoveToLine })
+        return index < linearRepresentation.lastIndex && (movesLine || instr is Sleep)
     }
 
+    private fun countPlayCalls(python: List<String>): Int =
+        python.count { line -> PLAY_CALLS.any { line.contains(it) } }
+
     private fun getResourceAsText(path: String): String {
-        return ClassLoader.getSystemResource(path).readText()
+        return resources.computeIfAbsent(path) { ClassLoader.getSystemResource(it).readText() }
     }
 
     private fun initialPythonSetup(): String {
         return """
+            import os
             import tempfile
             from abc import ABC, abstractmethod
             from manimlib.imports import *
@@ -70,6 +231,8 @@ class ManimWriter(private val linearRepresentation: List<ManimInstr>) {
                 code_end = 10
                 line_spacing = 0.1
                 time_objects = []
+                scene_time = 0
+                checkpoint_index = 0
 
                 def construct(self):
 
@@ -79,4 +242,20 @@ class ManimWriter(private val linearRepresentation: List<ManimInstr>) {
     private fun printWithIndent(identSize: Int, lines: List<String>): String {
         return lines.map { line -> "${"    ".repeat(identSize)}$line" }.joinToString("\n")
     }
+
+    companion object {
+        /** Python resources loaded so far, kept for the lifetime of the JVM as they never change **/
+        private val resources = ConcurrentHashMap<String, String>()
+
+        /** Calls in the construct body that each render part of the animation **/
+        private val PLAY_CALLS = listOf("self.play(", "self.play_animation(", "self.wait(")
+    }
 }
+
+/**
+ * Part of the construct body between two checkpoints
+ *
+ * @property code: Python code of the instructions in the segment
+ * @property runtime: estimated runtime of the segment, summed from the runtimes of its instructions
+ */
+data class SceneSegment(val code: String, val runtime: Double)
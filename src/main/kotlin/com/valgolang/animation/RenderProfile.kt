@@ -0,0 +1,107 @@
+package com.valgolang.animation
+
+import com.google.gson.GsonBuilder
+import com.google.gson.JsonArray
+import com.google.gson.JsonObject
+import com.google.gson.JsonParser
+import java.io.File
+
+/**
+ * Render time of the instructions of one type produced by one line, as recorded by the probes of a scene generated
+ * with a render profile
+ *
+ * @property line: line of the VAlgoLang statement the instructions came from, 0 for setting up the scene
+ * @property instruction: type of the instructions
+ * @property calls: number of instructions rendered
+ * @property seconds: wall time spent on the instructions, building their mobjects and animating them
+ * @property playSeconds: part of [seconds] spent in play and wait calls
+ * @constructor Create empty Render profile entry
+ */
+data class RenderProfileEntry(val line: Int, val instruction: String, val calls: Int, val seconds: Double, val playSeconds: Double)
+
+/**
+ * Render profile written by a scene generated by [ManimWriter] with a render profile, mapping the time manim spent
+ * rendering back to the lines of the program.
+ */
+object RenderProfile {
+    private const val MOST_EXPENSIVE_LINES = 10
+    private val segmentSuffix = Regex("\\.\\d+-\\d+")
+
+    /**
+     * Reads the profile written to [file], along with those written for each segment when rendered separately,
+     * and writes it back with the render time of each line of the program added
+     *
+     * @param file: file the scene was generated to write its render profile to
+     * @param fileLines: lines of the program
+     * @return entries of the profile, by line and instruction type
+     */
+    fun collect(file: File, fileLines: List<String>): List<RenderProfileEntry> {
+        val segmentFiles = file.absoluteFile.parentFile.listFiles { candidate ->
+            candidate.name.startsWith(file.name) && candidate.name.removePrefix(file.name).matches(segmentSuffix)
+        }.orEmpty().toList()
+        val entries = (segmentFiles + listOf(file).filter { it.isFile }).flatMap { read(it) }
+            .groupBy { Pair(it.line, it.instruction) }
+            .map { (key, sameKey) ->
+                RenderProfileEntry(key.first, key.second, sameKey.sumBy { it.calls }, sameKey.sumByDouble { it.seconds }, sameKey.sumByDouble { it.playSeconds })
+            }
+            .sortedWith(compareBy({ it.line }, { it.instruction }))
+        file.writeText(toJson(entries, fileLines))
+        segmentFiles.forEach { it.delete() }
+        return entries
+    }
+
+    /**
+     * Lines of the program taking the most time to render, to print
+     *
+     * @param entries
+     * @param fileLines: lines of the program
+     * @return lines of the table
+     */
+    fun summary(entries: List<RenderProfileEntry>, fileLines: List<String>): List<String> {
+        val lines = mutableListOf(String.format("%6s %10s %10s  %s", "Line", "Render (s)", "Play (s)", "Source"))
+        byLine(entries).sortedByDescending { it.seconds }.take(MOST_EXPENSIVE_LINES).forEach {
+            lines.add(String.format("%6d %10.2f %10.2f  %s", it.line, it.seconds, it.playSeconds, source(it.line, fileLines)))
+        }
+        return lines
+    }
+
+    // Entries of every instruction type added up for each line
+    private fun byLine(entries: List<RenderProfileEntry>): List<RenderProfileEntry> =
+        entries.groupBy { it.line }.map { (line, lineEntries) ->
+            RenderProfileEntry(line, "", lineEntries.sumBy { it.calls }, lineEntries.sumByDouble { it.seconds }, lineEntries.sumByDouble { it.playSeconds })
+        }
+
+    private fun source(line: Int, fileLines: List<String>): String =
+        if (line == 0) "(scene setup)" else fileLines.getOrNull(line - 1)?.trim() ?: ""
+
+    private fun read(file: File): List<RenderProfileEntry> =
+        JsonParser.parseString(file.readText()).asJsonObject.getAsJsonArray("instructions").map {
+            val entry = it.asJsonObject
+            RenderProfileEntry(
+                entry.get("line").asInt,
+                entry.get("instruction").asString,
+                entry.get("calls").asInt,
+                entry.get("seconds").asDouble,
+                entry.get("playSeconds").asDouble
+            )
+        }
+
+    private fun toJson(entries: List<RenderProfileEntry>, fileLines: List<String>): String {
+        val profile = JsonObject()
+        profile.add("lines", JsonArray().apply { byLine(entries).forEach { add(toJson(it, source(it.line, fileLines))) } })
+        profile.add("instructions", JsonArray().apply { entries.forEach { add(toJson(it, null)) } })
+        return GsonBuilder().setPrettyPrinting().disableHtmlEscaping().create().toJson(profile)
+    }
+
+    private fun toJson(entry: RenderProfileEntry, source: String?): JsonObject = JsonObject().apply {
+        addProperty("line", entry.line)
+        if (source == null) {
+            addProperty("instruction", entry.instruction)
+        } else {
+            addProperty("source", source)
+        }
+        addProperty("calls", entry.calls)
+        addProperty("seconds", entry.seconds)
+        addProperty("playSeconds", entry.playSeconds)
+    }
+}
@@ -0,0 +1,93 @@
+package com.valgolang.animation
+
+import java.io.File
+import java.nio.file.Files
+import java.nio.file.StandardCopyOption
+import java.security.MessageDigest
+
+/**
+ * Persistent cache of rendered scene segments, shared between compiles.
+ *
+ * A segment's video depends on the scene state it starts from, so keys are chained: the key of a segment hashes
+ * the key of the segment before it together with its own code. Editing a program therefore only invalidates the
+ * segments from the first changed one onwards. Entries are evicted least recently used first once the cache grows
+ * beyond [maxSizeBytes].
+ *
+ * @property directory: directory the rendered segments are stored in
+ * @property maxSizeBytes: maximum total size of the stored segments
+ * @constructor Creates a new segment cache, creating [directory] if needed
+ */
+class SegmentCache(private val directory: File, private val maxSizeBytes: Long) {
+
+    init {
+        directory.mkdirs()
+    }
+
+    /**
+     * Computes the chained cache key of every segment.
+     *
+     * @param seed: text identifying everything outside the segments that affects rendering, such as the runtime library and manim options
+     * @param segmentCode: Python code of each segment in scene order
+     * @return key of each segment
+     */
+    fun keys(seed: String, segmentCode: List<String>): List<String> {
+        var previousKey = hash(VERSION + seed)
+        return segmentCode.map {
+            previousKey = hash(previousKey + it)
+            previousKey
+        }
+    }
+
+    /**
+     * Copies the segment stored under [key] to [destination], marking it as recently used.
+     *
+     * @param key
+     * @param destination
+     * @return whether the segment was in the cache
+     */
+    fun restore(key: String, destination: File): Boolean {
+        val entry = entryFile(key)
+        if (!entry.isFile) {
+            return false
+        }
+        entry.setLastModified(System.currentTimeMillis())
+        destination.parentFile?.mkdirs()
+        Files.copy(entry.toPath(), destination.toPath(), StandardCopyOption.REPLACE_EXISTING)
+        return true
+    }
+
+    /**
+     * Stores a rendered segment under [key], evicting least recently used segments if the cache is too large.
+     *
+     * @param key
+     * @param video: rendered segment
+     */
+    fun store(key: String, video: File) {
+        val temporary = File(directory, "$key.mp4.tmp")
+        Files.copy(video.toPath(), temporary.toPath(), StandardCopyOption.REPLACE_EXISTING)
+        Files.move(temporary.toPath(), entryFile(key).toPath(), StandardCopyOption.REPLACE_EXISTING, StandardCopyOption.ATOMIC_MOVE)
+        evict()
+    }
+
+    private fun evict() {
+        val entries = directory.listFiles { file -> file.isFile && file.name.endsWith(".mp4") }?.sortedBy { it.lastModified() } ?: return
+        var size = entries.map { it.length() }.sum()
+        for (entry in entries) {
+            if (size <= maxSizeBytes) {
+                break
+            }
+            size -= entry.length()
+            entry.delete()
+        }
+    }
+
+    private fun entryFile(key: String): File = File(directory, "$key.mp4")
+
+    companion object {
+        /** Bumped whenever the rendering of existing segments changes, invalidating everything cached before **/
+        private const val VERSION = "1"
+
+        private fun hash(text: String): String =
+            MessageDigest.getInstance("SHA-256").digest(text.toByteArray()).joinToString("") { "%02x".format(it) }
+    }
+}
@@ -1,18 +1,56 @@
 package com.valgolang.errorhandling
 
 import com.valgolang.ExitStatus
+import java.io.PrintStream
 
 /**
  * Error handler object which stores errors
  *
+ * Errors are stored per thread, so that several programs can be compiled at once in the same JVM.
+ *
  * @constructor Create empty Error handler
  */
 object ErrorHandler {
-    private val syntaxErrors = arrayListOf<String>()
+    // A null output prints to whatever System.out currently is
+    private class ErrorState(val output: PrintStream?) {
+        val syntaxErrors = arrayListOf<String>()
+
+        val semanticErrors = arrayListOf<String>()
+
+        val warnings = arrayListOf<String>()
+    }
+
+    private val state = ThreadLocal.withInitial { ErrorState(null) }
+
+    private val syntaxErrors
+        get() = state.get().syntaxErrors
+
+    private val semanticErrors
+        get() = state.get().semanticErrors
 
-    private val semanticErrors = arrayListOf<String>()
+    private val warnings
+        get() = state.get().warnings
 
-    private val warnings = arrayListOf<String>()
+    /** Stream that errors and messages of the compile running on the current thread are printed to **/
+    val output: PrintStream
+        get() = state.get().output ?: System.out
+
+    /**
+     * Runs [block] with fresh error state, printing its errors and messages to [output]
+     *
+     * @param output
+     * @param block
+     * @return result of [block]
+     */
+    fun <T> withOutput(output: PrintStream, block: () -> T): T {
+        val previous = state.get()
+        state.set(ErrorState(output))
+        try {
+            return block()
+        } finally {
+            state.set(previous)
+        }
+    }
 
     /**
      * Add syntax error
@@ -41,9 +79,9 @@ object ErrorHandler {
      * @param lineNumber
      */
     fun addRuntimeError(errorEvent: String, lineNumber: Int) {
-        println("Error detected during program execution. Animation could not be generated")
-        println("Exit code: ${ExitStatus.RUNTIME_ERROR.code}")
-        println("Your program failed at line $lineNumber: $errorEvent")
+        output.println("Error detected during program execution. Animation could not be generated")
+        output.println("Exit code: ${ExitStatus.RUNTIME_ERROR.code}")
+        output.println("Your program failed at line $lineNumber: $errorEvent")
     }
 
     /**
@@ -51,8 +89,8 @@ object ErrorHandler {
      *
      */
     fun addTooManyDatastructuresError() {
-        println("Too many data structures attempted to be created. Animation could not be generated")
-        println("Exit code: ${ExitStatus.RUNTIME_ERROR.code}")
+        output.println("Too many data structures attempted to be created. Animation could not be generated")
+        output.println("Exit code: ${ExitStatus.RUNTIME_ERROR.code}")
     }
 
     /**
@@ -71,21 +109,21 @@ object ErrorHandler {
      */
     fun checkErrorsAndWarnings(): ExitStatus {
         if (syntaxErrors.isNotEmpty()) {
-            println(
+            output.println(
                 "Errors detected during compilation \n" +
                     "Exit code: ${ExitStatus.SYNTAX_ERROR.code}"
             )
-            syntaxErrors.forEach { println(it) }
+            syntaxErrors.forEach { output.println(it) }
             syntaxErrors.clear()
             return ExitStatus.SYNTAX_ERROR
         }
 
         if (semanticErrors.isNotEmpty()) {
-            println(
+            output.println(
                 "Errors detected during compilation \n" +
                     "Exit code: ${ExitStatus.SEMANTIC_ERROR.code}"
             )
-            semanticErrors.forEach { println(it) }
+            semanticErrors.forEach { output.println(it) }
             semanticErrors.clear()
             return ExitStatus.SEMANTIC_ERROR
         }
@@ -100,7 +138,7 @@ object ErrorHandler {
      *
      */
     fun checkWarnings() {
-        warnings.forEach { println(it) }
+        warnings.forEach { output.println(it) }
         warnings.clear()
     }
 }
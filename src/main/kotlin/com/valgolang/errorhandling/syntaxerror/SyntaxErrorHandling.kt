@@ -28,6 +28,6 @@ fun extraneousInputError(token: String, line: Int, char: Int, underlinedError: S
  * @param underlinedError: Underline
  */
 fun otherError(msg: String, token: String, line: Int, char: Int, underlinedError: String) {
-    println(token)
+    ErrorHandler.output.println(token)
     ErrorHandler.addSyntaxError("$msg\n$underlinedError", "$line:$char")
 }
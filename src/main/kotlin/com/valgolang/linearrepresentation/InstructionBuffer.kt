@@ -0,0 +1,134 @@
+package com.valgolang.linearrepresentation
+
+import com.valgolang.linearrepresentation.datastructures.array.Array2DSwap
+import com.valgolang.linearrepresentation.datastructures.array.ArrayElemAssignObject
+import com.valgolang.linearrepresentation.datastructures.array.ArrayElemRestyle
+import com.valgolang.linearrepresentation.datastructures.array.ArrayLongSwap
+import com.valgolang.linearrepresentation.datastructures.array.ArrayReplaceRow
+import com.valgolang.linearrepresentation.datastructures.array.ArrayShortSwap
+import com.valgolang.linearrepresentation.datastructures.binarytree.NodeAppendObject
+import com.valgolang.linearrepresentation.datastructures.binarytree.TreeAppendObject
+import com.valgolang.linearrepresentation.datastructures.binarytree.TreeDeleteObject
+import com.valgolang.linearrepresentation.datastructures.binarytree.TreeEditValue
+import com.valgolang.linearrepresentation.datastructures.binarytree.TreeNodeRestyle
+import com.valgolang.linearrepresentation.datastructures.list.ListAppend
+import com.valgolang.linearrepresentation.datastructures.list.ListPrepend
+import com.valgolang.linearrepresentation.datastructures.stack.StackPopObject
+import com.valgolang.linearrepresentation.datastructures.stack.StackPushObject
+import com.valgolang.runtime.ExecValue
+
+/**
+ * Linear representation under construction, which can be muted while fast forwarding through execution.
+ *
+ * While muted, instructions whose effect can be recreated from the final execution state are dropped: code tracking,
+ * pauses and in place updates of arrays. Everything else, such as creating or cleaning up data structures, is kept
+ * so that later instructions still find the mobjects they refer to. Pushes and pops of stacks, changes to trees and
+ * arrays growing cannot be recreated from the final state, so they are kept too and counted in [unsyncableUpdates].
+ *
+ * Instructions added are stamped with the line of the statement being executed, see [sourceLine].
+ * Instructions are only ever appended through [add] and [addAll], the buffer being read only as a list.
+ *
+ * @property sink: receives instructions as they are added instead of them being kept in the buffer, if given
+ * @property instructions: instructions kept
+ * @constructor Creates a new empty instruction buffer
+ */
+class InstructionBuffer private constructor(
+    private val sink: ((ManimInstr) -> Unit)?,
+    private val instructions: ArrayList<ManimInstr>
+) : List<ManimInstr> by instructions {
+
+    constructor(sink: ((ManimInstr) -> Unit)? = null) : this(sink, ArrayList())
+
+    /** Whether instructions that can be recreated from the final state are being dropped **/
+    var muted: Boolean = false
+        private set
+
+    /** Line of the statement being executed, stamped on every instruction added that has no line yet **/
+    var sourceLine: Int = 0
+
+    /** Number of updates added that cannot be recreated from the final state, whether muted or not **/
+    var unsyncableUpdates: Int = 0
+        private set
+
+    /** Python identifiers of the arrays updated since the buffer was last muted **/
+    private val skippedArrays = LinkedHashSet<String>()
+
+    /** Arrays not yet cleaned up by python identifier, so those updated while muted are synced whichever frame holds them **/
+    private val arrays = HashMap<String, ExecValue>()
+
+    fun mute() {
+        muted = true
+        skippedArrays.clear()
+    }
+
+    /**
+     * Stops dropping instructions.
+     *
+     * @return arrays by identifier whose updates were dropped while muted, which need syncing to their final state
+     */
+    fun unmute(): Map<String, ExecValue> {
+        muted = false
+        return skippedArrays.mapNotNull { ident -> arrays[ident]?.let { ident to it } }.toMap()
+    }
+
+    /**
+     * Records the value of the array drawn as [ident], to sync it to if its updates are dropped
+     *
+     * @param ident
+     * @param array
+     */
+    fun trackArray(ident: String, array: ExecValue) {
+        arrays[ident] = array
+    }
+
+    /**
+     * Appends [element], unless it is dropped while muted
+     *
+     * @param element
+     * @return whether the instruction was kept
+     */
+    fun add(element: ManimInstr): Boolean {
+        when (element) {
+            is StackPushObject, is StackPopObject,
+            is TreeAppendObject, is NodeAppendObject, is TreeDeleteObject, is TreeEditValue, is TreeNodeRestyle,
+            is ListAppend, is ListPrepend -> unsyncableUpdates++
+            is CleanUpLocalDataStructures -> {
+                arrays.keys.removeAll(element.dataStructures)
+                skippedArrays.removeAll(element.dataStructures)
+            }
+        }
+        if (muted) {
+            val skipped = when (element) {
+                is MoveToLine, is UpdateVariableState, is Sleep -> return false
+                is ArrayElemAssignObject -> element.arrayIdent
+                is ArrayReplaceRow -> element.arrayIdent
+                is Array2DSwap -> element.arrayIdent
+                is ArrayShortSwap -> element.arrayIdent
+                is ArrayLongSwap -> element.arrayIdent
+                is ArrayElemRestyle -> element.arrayIdent
+                else -> null
+            }
+            if (skipped != null) {
+                skippedArrays.add(skipped)
+                return false
+            }
+        }
+        if (element.sourceLine == null) {
+            element.sourceLine = sourceLine
+        }
+        if (sink != null) {
+            sink.invoke(element)
+            return true
+        }
+        return instructions.add(element)
+    }
+
+    /**
+     * Appends every instruction of [elements] in order, as with [add]
+     *
+     * @param elements
+     * @return whether any instruction was kept
+     */
+    fun addAll(elements: Collection<ManimInstr>): Boolean =
+        elements.map { add(it) }.any { it }
+}
@@ -22,6 +22,20 @@ abstract class ManimInstr {
      */
     abstract fun toPython(): List<String>
 
+    /** Line of the VAlgoLang statement whose execution produced the instruction, or null if it is not known **/
+    var sourceLine: Int? = null
+
+    /** Python identifiers of every mobject the instruction animates, or null if they are not known **/
+    open val animatedMobjects: Set<String>? = null
+
+    /**
+     * Python expression evaluating to the list of animations played by the instruction, so that it can share a play
+     * call with other instructions. Instructions that play more than once or do more than animate return null.
+     *
+     * @return animation list expression, or null if the instruction cannot be merged into another play call
+     */
+    open fun toAnimationList(): String? = null
+
     /**
      * Get instruction string to be played using Manim
      *
@@ -74,6 +88,10 @@ data class MoveToLine(
             "self.move_arrow_to_line($lineNumber, $pointerName, $codeBlockName, $codeTextVariable)"
         )
     }
+
+    override val animatedMobjects: Set<String> = setOf(pointerName, codeBlockName)
+
+    override fun toAnimationList(): String = "self.arrow_to_line_animations($lineNumber, $pointerName, $codeBlockName)"
 }
 
 /**
@@ -116,7 +134,7 @@ data class UpdateSubtitle(
     override fun toPython(): List<String> {
         val instr = mutableListOf("# Updates subtitle text", "self.play_animation(${subtitleBlock.ident}.clear())")
         if (!text.isBlank()) {
-            instr.add("self.play_animation(${subtitleBlock.ident}.display('$text', self.get_time() + ${subtitleBlock.duration}))")
+            instr.add("self.play_animation(${subtitleBlock.ident}.display('$text', self.scene_time + ${subtitleBlock.duration}))")
         }
 
         return instr
@@ -130,19 +148,28 @@ data class UpdateSubtitle(
  * @property ident
  * @property textColor
  * @property runtime
+ * @property changedSlots: indices of the lines that differ from the displayed variables, or null to rebuild the whole block
  * @constructor Create empty Update variable state
  */
 data class UpdateVariableState(
     val variables: List<String>,
     val ident: String,
     val textColor: String? = null,
-    override val runtime: Double
+    override val runtime: Double,
+    val changedSlots: List<Int>? = null
 ) : ManimInstr() {
     override fun toPython(): List<String> =
         listOf(
             "# Updates variable block with variables ${variables.map { "\"${it.substringBefore(' ')}\"" }}",
-            "self.play_animation(*$ident.update_variable(${variables.map { "\'${it}\'" }})${getRuntimeString()})"
+            "self.play_animation(*${toAnimationList()}${getRuntimeString()})"
         )
+
+    override val animatedMobjects: Set<String> = setOf(ident)
+
+    override fun toAnimationList(): String {
+        val changed = if (changedSlots == null) "" else ", $changedSlots"
+        return "$ident.update_variable(${variables.map { "\'${it}\'" }}$changed)"
+    }
 }
 
 /**
@@ -163,3 +190,24 @@ data class CleanUpLocalDataStructures(
         )
     }
 }
+
+/**
+ * Plays the animations of [instructions] in a single play call.
+ * The instructions must animate disjoint mobjects and all be expressible as an animation list.
+ *
+ * @property instructions
+ * @property runtime
+ * @constructor Create empty Play together
+ */
+data class PlayTogether(
+    val instructions: List<ManimInstr>,
+    override val runtime: Double
+) : ManimInstr() {
+    override fun toPython(): List<String> =
+        instructions.flatMap { instr -> instr.toPython().filter { it.startsWith("#") } } +
+            "self.play_animation(${instructions.joinToString(", ") { "*${it.toAnimationList()}" }}${getRuntimeString()})"
+
+    override val animatedMobjects: Set<String> = instructions.flatMap { it.animatedMobjects ?: emptySet() }.toSet()
+
+    override fun toAnimationList(): String = "[${instructions.joinToString(", ") { "*${it.toAnimationList()}" }}]"
+}
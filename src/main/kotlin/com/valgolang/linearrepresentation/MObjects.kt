@@ -25,7 +25,44 @@ abstract class MObject : ManimInstr() {
  */
 interface ManimInstrWithBoundary {
     val uid: String
+
+    /** Whether the Python code looks its boundary up in BOUNDARIES, defined once every boundary is known, rather than inlining it **/
+    var lateBoundBoundary: Boolean
+
     fun setNewBoundary(corners: List<Pair<Double, Double>>, newMaxSize: Int)
+
+    /**
+     * Copies the instruction, so that the boundary of the copy can be set without affecting this one
+     *
+     * @return the copy
+     */
+    fun snapshot(): ManimInstr
+
+    /**
+     * Python expression looking up the late bound boundary
+     *
+     * @return expression evaluating to the corners of the boundary as (x, y) tuples
+     */
+    fun boundariesLookup(): String = "BOUNDARIES[\"$uid\"]"
+
+    /**
+     * Python expression looking up the late bound boundary as points
+     *
+     * @return expression evaluating to the corners of the boundary as [x, y, 0] points
+     */
+    fun boundaryPointsLookup(): String = "[[x, y, 0] for x, y in ${boundariesLookup()}]"
+}
+
+/**
+ * Carries over the state not set through the constructor from [original] to this copy of it
+ *
+ * @param original
+ * @return this copy
+ */
+fun <T> T.withStateOf(original: T): T where T : ManimInstr, T : ManimInstrWithBoundary {
+    sourceLine = original.sourceLine
+    lateBoundBoundary = original.lateBoundBoundary
+    return this
 }
 
 /**
@@ -36,6 +73,7 @@ interface ManimInstrWithBoundary {
  */
 abstract class ShapeWithBoundary(override val uid: String) : MObject(), ManimInstrWithBoundary {
     val style = PythonStyle()
+    override var lateBoundBoundary: Boolean = false
 }
 
 /**
@@ -68,6 +106,7 @@ abstract class DataStructureMObject(
  * @property syntaxHighlightingOn
  * @property syntaxHighlightingStyle
  * @property tabSpacing
+ * @property scrollThreshold
  * @property boundaries
  * @constructor Create empty Code block
  */
@@ -81,6 +120,7 @@ data class CodeBlock(
     val syntaxHighlightingOn: Boolean = true,
     val syntaxHighlightingStyle: String = "inkpot",
     val tabSpacing: Int = 2,
+    val scrollThreshold: Int = 5,
     private var boundaries: List<Pair<Double, Double>> = emptyList()
 ) : ShapeWithBoundary(uid = "_code") {
     override val classPath: String = "python/code_block.py"
@@ -91,14 +131,17 @@ data class CodeBlock(
         boundaries = corners
     }
 
+    override fun snapshot(): ManimInstr = copy().withStateOf(this)
+
     init {
         textColor?.let { style.addStyleAttribute(TextColor(it)) }
     }
 
     override fun getConstructor(): String {
-        return "$ident = $className(code_lines, $boundaries, syntax_highlighting=${
+        val boundariesString = if (lateBoundBoundary) boundariesLookup() else boundaries.toString()
+        return "$ident = $className(code_lines, $boundariesString, syntax_highlighting=${
         syntaxHighlightingOn.toString().capitalize()
-        }, syntax_highlighting_style=\"$syntaxHighlightingStyle\", tab_spacing=$tabSpacing)"
+        }, syntax_highlighting_style=\"$syntaxHighlightingStyle\", tab_spacing=$tabSpacing, scroll_threshold=$scrollThreshold)"
     }
 
     override fun toPython(): List<String> {
@@ -157,10 +200,13 @@ data class SubtitleBlock(
     }
 
     override fun getConstructor(): String {
-        val coordinatesString =
-            if (boundary.isEmpty()) "" else "[${boundary.joinToString(", ") { "[${it.first}, ${it.second}, 0]" }}]"
+        val coordinatesString = when {
+            lateBoundBoundary -> boundaryPointsLookup()
+            boundary.isEmpty() -> ""
+            else -> "[${boundary.joinToString(", ") { "[${it.first}, ${it.second}, 0]" }}]"
+        }
 
-        return "$ident = $className(self.get_time() + $duration, $coordinatesString$style)"
+        return "$ident = $className(self.scene_time + $duration, $coordinatesString$style)"
     }
 
     override fun toPython(): List<String> {
@@ -174,6 +220,8 @@ data class SubtitleBlock(
     override fun setNewBoundary(corners: List<Pair<Double, Double>>, newMaxSize: Int) {
         boundary = corners
     }
+
+    override fun snapshot(): ManimInstr = copy().withStateOf(this)
 }
 
 /**
@@ -204,13 +252,16 @@ data class VariableBlock(
     }
 
     override fun getConstructor(): String {
-        return "$ident = $className(${"[\'${variables.joinToString("\',\'")}\']"}, $boundaries$style)"
+        val boundariesString = if (lateBoundBoundary) boundariesLookup() else boundaries.toString()
+        return "$ident = $className(${"[\'${variables.joinToString("\',\'")}\']"}, $boundariesString$style)"
     }
 
     override fun setNewBoundary(corners: List<Pair<Double, Double>>, newMaxSize: Int) {
         boundaries = corners
     }
 
+    override fun snapshot(): ManimInstr = copy().withStateOf(this)
+
     override fun toPython(): List<String> {
         return listOf(
             "# Builds variable visualisation pane",
@@ -29,4 +29,12 @@ class VariableNameGenerator(private val symbolTableVisitor: SymbolTableVisitor)
         prefixCounter[prefix] = count + 1
         return if (count > 0) "$prefix$count" else prefix
     }
+
+    /** Next count tried for each prefix, so that another generator can carry on from the same names **/
+    fun counters(): Map<String, Int> = prefixCounter.toMap()
+
+    fun restoreCounters(counters: Map<String, Int>) {
+        prefixCounter.clear()
+        prefixCounter.putAll(counters)
+    }
 }
@@ -27,19 +27,24 @@ data class ArrayElemAssignObject(
     override val runtime: Double,
     override val render: Boolean
 ) : ManimInstr() {
-    override fun toPython(): List<String> {
+    private fun updateElement(): String {
         val animationString =
             if (animatedStyle?.textColor != null) ", color=${animatedStyle.handleColourValue(animatedStyle.textColor)}" else ""
         val assignIndex2D = if (secondIndex == null) "" else ".rows[$secondIndex]"
+        return "$arrayIdent$assignIndex2D.update_element($index, \"${newElemValue.value}\"$animationString)"
+    }
+
+    override fun toPython(): List<String> {
         val commentIndex2D = if (secondIndex == null) "" else "[$secondIndex]"
         return listOf(
             "# Assigns \"${newElemValue.value}\" to \"$arrayIdent$commentIndex2D[$index]\"",
-            getInstructionString(
-                "$arrayIdent$assignIndex2D.update_element($index, \"${newElemValue.value}\"$animationString)",
-                false
-            )
+            getInstructionString(updateElement(), false)
         )
     }
+
+    override val animatedMobjects: Set<String> = setOf(arrayIdent)
+
+    override fun toAnimationList(): String? = if (render) "[${updateElement()}]" else null
 }
 
 /**
@@ -118,6 +123,10 @@ data class ArrayShortSwap(
             getInstructionString("$arrayIdent.swap_mobjects(${indices.first}, ${indices.second})", true)
         )
     }
+
+    override val animatedMobjects: Set<String> = setOf(arrayIdent)
+
+    override fun toAnimationList(): String? = if (render) "$arrayIdent.swap_mobjects(${indices.first}, ${indices.second})" else null
 }
 
 /**
@@ -181,7 +190,7 @@ data class ArrayElemRestyle(
         return if (secondIndices == null) "" else ".rows[${secondIndices[index]}]"
     }
 
-    override fun toPython(): List<String> {
+    private fun restyleAnimations(): List<String> {
         val instructions = mutableListOf<String>()
         val animationString = animationString ?: "FadeToColor"
 
@@ -229,7 +238,14 @@ data class ArrayElemRestyle(
                 )
             }
         }
+        return instructions
+    }
+
+    private fun animationList(instructions: List<String>): String =
+        "[animation for animation in [${instructions.joinToString(", ")}] if animation]"
 
+    override fun toPython(): List<String> {
+        val instructions = restyleAnimations()
         val commentElements = if (secondIndices == null) {
             indices.map { "\"$arrayIdent[$it]\"" }
         } else {
@@ -241,11 +257,54 @@ data class ArrayElemRestyle(
         } else {
             listOf(
                 "# Restyles ${commentElements.joinToString(", ")} for indication",
-                getInstructionString(
-                    "[animation for animation in [${instructions.joinToString(", ")}] if animation]",
-                    true
-                )
+                getInstructionString(animationList(instructions), true)
             )
         }
     }
+
+    override val animatedMobjects: Set<String> = setOf(arrayIdent)
+
+    override fun toAnimationList(): String? {
+        val instructions = restyleAnimations()
+        return if (render && instructions.isNotEmpty()) animationList(instructions) else null
+    }
+}
+
+/**
+ * Jumps every element of an array straight to its final value and unstyled look, after updates to the array were skipped
+ *
+ * @property arrayIdent
+ * @property rows: values of each row, a single row for a 1D array
+ * @property twoDimensional
+ * @property runtime
+ * @property render
+ * @constructor Create empty Array sync
+ */
+data class ArraySync(
+    val arrayIdent: String,
+    val rows: List<List<String>>,
+    val twoDimensional: Boolean,
+    override val runtime: Double,
+    override val render: Boolean
+) : ManimInstr() {
+    private fun values(): String {
+        val pythonRows = rows.map { row -> row.joinToString(", ", "[", "]") { "\"$it\"" } }
+        return if (twoDimensional) pythonRows.joinToString(", ", "[", "]") else pythonRows.first()
+    }
+
+    // Pointers shown by restyles whose removal was skipped are faded out along with the values being set
+    private fun animationList(): String =
+        "[animation for animation in $arrayIdent.set_values(${values()}) + " +
+            "[self.fade_out_if_needed(pointer) for pointer in $arrayIdent.pointers()] if animation]"
+
+    override fun toPython(): List<String> {
+        return listOf(
+            "# Sets \"$arrayIdent\" to its final values",
+            getInstructionString(animationList(), true)
+        )
+    }
+
+    override val animatedMobjects: Set<String> = setOf(arrayIdent)
+
+    override fun toAnimationList(): String? = if (render) animationList() else null
 }
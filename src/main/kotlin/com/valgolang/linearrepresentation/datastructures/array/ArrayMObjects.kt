@@ -3,7 +3,9 @@ package com.valgolang.linearrepresentation.datastructures.array
 import com.valgolang.frontend.datastructures.DataStructureType
 import com.valgolang.linearrepresentation.Color
 import com.valgolang.linearrepresentation.DataStructureMObject
+import com.valgolang.linearrepresentation.ManimInstr
 import com.valgolang.linearrepresentation.TextColor
+import com.valgolang.linearrepresentation.withStateOf
 import com.valgolang.runtime.ExecValue
 
 /**
@@ -51,11 +53,8 @@ data class ArrayStructure(
 
     override fun getConstructor(): String {
         val arrayTitle = if (showLabel == null || showLabel) text else ""
-        return "$ident = $className([${values.joinToString(",") { "\"${it}\"" }}], \"$arrayTitle\", [${
-        boundaries.joinToString(
-            ","
-        )
-        }]$style).build()"
+        val boundariesString = if (lateBoundBoundary) boundariesLookup() else "[${boundaries.joinToString(",")}]"
+        return "$ident = $className([${values.joinToString(",") { "\"${it}\"" }}], \"$arrayTitle\", $boundariesString$style).build()"
     }
 
     override fun toPython(): List<String> {
@@ -74,6 +73,8 @@ data class ArrayStructure(
         maxSize = newMaxSize
         boundaries = corners
     }
+
+    override fun snapshot(): ManimInstr = copy().withStateOf(this)
 }
 
 /**
@@ -133,10 +134,13 @@ data class Array2DStructure(
         boundaries = corners
     }
 
+    override fun snapshot(): ManimInstr = copy().withStateOf(this)
+
     override fun getConstructor(): String {
         val arrayTitle = if (showLabel == null || showLabel) text else ""
+        val boundariesString = if (lateBoundBoundary) boundariesLookup() else "[${boundaries.joinToString(",")}]"
         return "$ident = $className([${
         values.map { array -> "[ ${array.map { "\"${it}\"" }.joinToString(",")}]" }.joinToString(",")
-        }], \"$arrayTitle\", [${boundaries.joinToString(",")}]$style)"
+        }], \"$arrayTitle\", $boundariesString$style)"
     }
 }
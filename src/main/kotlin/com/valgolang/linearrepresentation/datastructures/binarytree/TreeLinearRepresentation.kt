@@ -4,6 +4,7 @@ import com.valgolang.linearrepresentation.ManimInstr
 import com.valgolang.runtime.PrimitiveValue
 import com.valgolang.runtime.datastructures.binarytree.BinaryTreeNodeValue
 import com.valgolang.runtime.datastructures.binarytree.BinaryTreeValue
+import com.valgolang.runtime.datastructures.binarytree.TreeNodePosition
 import com.valgolang.stylesheet.StylesheetProperty
 
 /**
@@ -13,6 +14,7 @@ import com.valgolang.stylesheet.StylesheetProperty
  * @property childNodeValue
  * @property treeValue
  * @property left
+ * @property layout: Position of every node of the tree once the child is appended
  * @property runtime
  * @property render
  * @constructor Create empty Tree append object
@@ -22,6 +24,7 @@ data class TreeAppendObject(
     val childNodeValue: BinaryTreeNodeValue,
     val treeValue: BinaryTreeValue,
     val left: Boolean,
+    val layout: List<TreeNodePosition>,
     override val runtime: Double,
     override val render: Boolean
 ) : ManimInstr() {
@@ -31,11 +34,7 @@ data class TreeAppendObject(
         val instruction = getInstructionString("animation", false)
         return listOf(
             "# Appends \"${childNodeValue.manimObject.ident}\" to the ${if (left) "left" else "right"} of \"${parentNodeValue.manimObject.ident}\"",
-            "[$instruction for animation in ${treeValue.manimObject.ident}.check_if_child_will_cross_boundary(${parentNodeValue.manimObject.ident}, ${childNodeValue.manimObject.ident},${
-            left.toString()
-                .capitalize()
-            })]",
-            "[$instruction for animation in ${treeValue.manimObject.ident}.$methodName(${parentNodeValue.manimObject.ident}, ${childNodeValue.manimObject.ident})]",
+            "[$instruction for animation in ${treeValue.manimObject.ident}.$methodName(${parentNodeValue.manimObject.ident}, ${childNodeValue.manimObject.ident}, ${layoutToPython(layout)})]",
         )
     }
 }
@@ -133,6 +132,7 @@ data class TreeEditValue(
  * @property parentNodeValue
  * @property treeValue
  * @property left
+ * @property layout: Position of every node of the tree once the child is removed
  * @property runtime
  * @property render
  * @constructor Create empty Tree delete object
@@ -141,6 +141,7 @@ data class TreeDeleteObject(
     val parentNodeValue: BinaryTreeNodeValue,
     val treeValue: BinaryTreeValue,
     val left: Boolean,
+    val layout: List<TreeNodePosition>,
     override val runtime: Double,
     override val render: Boolean,
 ) : ManimInstr() {
@@ -150,9 +151,13 @@ data class TreeDeleteObject(
         return listOf(
             "# Removes ${if (left) "left" else "right"} of \"${parentNodeValue.manimObject.ident}\"",
             getInstructionString(
-                "${treeValue.manimObject.ident}.$methodName(${parentNodeValue.manimObject.ident})",
+                "${treeValue.manimObject.ident}.$methodName(${parentNodeValue.manimObject.ident}, ${layoutToPython(layout)})",
                 true
             ),
         )
     }
 }
+
+// Python dictionary from each node to its column and depth, as taken by Tree.apply_layout
+private fun layoutToPython(layout: List<TreeNodePosition>): String =
+    layout.joinToString(", ", "{", "}") { "${it.ident}: (${it.x}, ${it.depth})" }
@@ -3,6 +3,8 @@ package com.valgolang.linearrepresentation.datastructures.binarytree
 import com.valgolang.frontend.datastructures.DataStructureType
 import com.valgolang.linearrepresentation.DataStructureMObject
 import com.valgolang.linearrepresentation.MObject
+import com.valgolang.linearrepresentation.ManimInstr
+import com.valgolang.linearrepresentation.withStateOf
 import com.valgolang.runtime.datastructures.binarytree.BinaryTreeNodeValue
 
 /**
@@ -66,7 +68,11 @@ data class InitTreeStructure(
     override val pythonVariablePrefix: String = ""
 
     override fun getConstructor(): String {
-        val coordinatesString = boundaries.joinToString(", ") { "[${it.first}, ${it.second}, 0]" }
+        val coordinatesString = if (lateBoundBoundary) {
+            "*${boundaryPointsLookup()}"
+        } else {
+            boundaries.joinToString(", ") { "[${it.first}, ${it.second}, 0]" }
+        }
         return "$ident = $className($coordinatesString, ${root.manimObject.ident}, \"$text\")"
     }
 
@@ -75,6 +81,8 @@ data class InitTreeStructure(
         boundaries = corners
     }
 
+    override fun snapshot(): ManimInstr = copy().withStateOf(this)
+
     override fun toPython(): List<String> {
         return listOf(
             "# Constructs a new $type \"$text\"",
@@ -37,6 +37,7 @@ data class ListPrepend(
 ) :
     ManimInstr(), ManimInstrWithBoundary {
     val style = PythonStyle()
+    override var lateBoundBoundary: Boolean = false
 
     init {
         if (creationString == null) creationString = "FadeIn"
@@ -46,11 +47,10 @@ data class ListPrepend(
 
     override fun toPython(): List<String> {
         val arrayTitle = if (showLabel == null || showLabel) text else ""
+        val boundariesString = if (lateBoundBoundary) boundariesLookup() else "[${boundaries.joinToString(", ")}]"
         return listOf(
             "# Prepends \"${values.first().toInterpolatedString()}\" at the start of \"$arrayIdent\"",
-            "$newArrayIdent = Array([${values.joinToString(", ") { "\"${it}\"" }}], \"$arrayTitle\", [${
-            boundaries.joinToString(", ")
-            }]$style).build()",
+            "$newArrayIdent = Array([${values.joinToString(", ") { "\"${it}\"" }}], \"$arrayTitle\", $boundariesString$style).build()",
             "self.play_animation(ReplacementTransform($arrayIdent.all, $newArrayIdent.all)${getRuntimeString()})",
             "$arrayIdent = $newArrayIdent"
         )
@@ -59,6 +59,8 @@ data class ListPrepend(
     override fun setNewBoundary(corners: List<Pair<Double, Double>>, newMaxSize: Int) {
         boundaries = corners
     }
+
+    override fun snapshot(): ManimInstr = copy().withStateOf(this)
 }
 
 /**
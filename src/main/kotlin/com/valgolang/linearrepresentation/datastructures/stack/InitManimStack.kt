@@ -3,7 +3,9 @@ package com.valgolang.linearrepresentation.datastructures.stack
 import com.valgolang.frontend.datastructures.DataStructureType
 import com.valgolang.linearrepresentation.Color
 import com.valgolang.linearrepresentation.DataStructureMObject
+import com.valgolang.linearrepresentation.ManimInstr
 import com.valgolang.linearrepresentation.TextColor
+import com.valgolang.linearrepresentation.withStateOf
 
 /**
  * Stack initialisation
@@ -48,7 +50,11 @@ data class InitManimStack(
     }
 
     override fun getConstructor(): String {
-        val coordinatesString = boundaries.joinToString(", ") { "[${it.first}, ${it.second}, 0]" }
+        val coordinatesString = if (lateBoundBoundary) {
+            "*${boundaryPointsLookup()}"
+        } else {
+            boundaries.joinToString(", ") { "[${it.first}, ${it.second}, 0]" }
+        }
         return "$ident = $className($coordinatesString, DOWN$style)"
     }
 
@@ -66,4 +72,6 @@ data class InitManimStack(
         maxSize = newMaxSize
         boundaries = corners
     }
+
+    override fun snapshot(): ManimInstr = copy().withStateOf(this)
 }
@@ -0,0 +1,70 @@
+package com.valgolang.optimisation
+
+import com.valgolang.linearrepresentation.ManimInstr
+
+/**
+ * Optimisation pass over the linear representation, run between the virtual machine and code generation
+ *
+ * Implemented by every pass in the [Optimiser] pipeline
+ */
+interface OptimisationPass {
+    /** Name of the pass used when reporting what it removed **/
+    val name: String
+
+    /**
+     * Rewrites the linear representation without changing what the final frame of the animation shows
+     *
+     * @param instructions: linear representation to optimise
+     * @return optimised linear representation
+     */
+    fun optimise(instructions: List<ManimInstr>): List<ManimInstr>
+}
+
+/**
+ * Number of play calls removed by an optimisation pass
+ *
+ * @property passName
+ * @property playCallsRemoved: instructions removed, each of which issued at least one play call
+ * @constructor Create empty Optimisation report
+ */
+data class OptimisationReport(val passName: String, val playCallsRemoved: Int)
+
+/**
+ * Pipeline running optimisation passes over the linear representation in order
+ *
+ * Every instruction the passes remove issues at least one play or wait call in the generated python code, a move
+ * to a line also scrolling the code block when it is off screen, so the number of instructions a pass removed is a
+ * lower bound on the play calls it saved.
+ *
+ * @property passes: passes to run, in order
+ * @constructor Creates a new optimiser
+ */
+class Optimiser(private val passes: List<OptimisationPass> = DEFAULT_PASSES) {
+
+    /**
+     * Runs every pass over [instructions]
+     *
+     * @param instructions: linear representation to optimise
+     * @return optimised linear representation and a report for each pass
+     */
+    fun optimise(instructions: List<ManimInstr>): Pair<List<ManimInstr>, List<OptimisationReport>> {
+        var optimised = instructions
+        val reports = passes.map { pass ->
+            val before = optimised.size
+            optimised = pass.optimise(optimised)
+            OptimisationReport(pass.name, before - optimised.size)
+        }
+        return Pair(optimised, reports)
+    }
+
+    companion object {
+        /** Runtime below which an animation is too quick to follow, as in regions sped up with a speed change **/
+        const val FAST_RUNTIME = 0.5
+
+        val DEFAULT_PASSES: List<OptimisationPass> = listOf(
+            CoalesceMoveToLines(),
+            MergeVariableUpdates(),
+            MergeSleeps()
+        )
+    }
+}
@@ -0,0 +1,145 @@
+package com.valgolang.optimisation
+
+import com.valgolang.linearrepresentation.ManimInstr
+import com.valgolang.linearrepresentation.MoveToLine
+import com.valgolang.linearrepresentation.PlayTogether
+import com.valgolang.linearrepresentation.Sleep
+import com.valgolang.linearrepresentation.UpdateVariableState
+
+/**
+ * Whether [instr] only tracks code execution and is quick enough to be collapsed with its neighbours.
+ * Consecutive such instructions form a fast run, within which only the final pointer position and variable state matter.
+ */
+private fun isFastCodeTracking(instr: ManimInstr, fastRuntime: Double): Boolean =
+    (instr is MoveToLine || instr is UpdateVariableState) && instr.runtime < fastRuntime
+
+/**
+ * Drops every [MoveToLine] in a fast run except the last one for each code block
+ *
+ * @property fastRuntime: runtime below which instructions are collapsed
+ * @constructor Creates a new coalesce move to lines pass
+ */
+class CoalesceMoveToLines(private val fastRuntime: Double = Optimiser.FAST_RUNTIME) : OptimisationPass {
+    override val name: String = "coalesce-move-to-line"
+
+    override fun optimise(instructions: List<ManimInstr>): List<ManimInstr> {
+        val keep = BooleanArray(instructions.size) { true }
+        val movedLaterInRun = mutableSetOf<String>()
+        for (i in instructions.indices.reversed()) {
+            val instr = instructions[i]
+            if (!isFastCodeTracking(instr, fastRuntime)) {
+                movedLaterInRun.clear()
+            } else if (instr is MoveToLine && !movedLaterInRun.add(instr.codeBlockName)) {
+                keep[i] = false
+            }
+        }
+        return instructions.filterIndexed { i, _ -> keep[i] }
+    }
+}
+
+/**
+ * Merges every [UpdateVariableState] in a fast run into the last one for each variable block,
+ * then drops updates that would display the variables already shown
+ *
+ * @property fastRuntime: runtime below which instructions are collapsed
+ * @constructor Creates a new merge variable updates pass
+ */
+class MergeVariableUpdates(private val fastRuntime: Double = Optimiser.FAST_RUNTIME) : OptimisationPass {
+    override val name: String = "merge-variable-updates"
+
+    override fun optimise(instructions: List<ManimInstr>): List<ManimInstr> {
+        val merged = instructions.toMutableList<ManimInstr?>()
+        val laterInRun = mutableMapOf<String, Int>()
+        for (i in instructions.indices.reversed()) {
+            val instr = instructions[i]
+            if (!isFastCodeTracking(instr, fastRuntime)) {
+                laterInRun.clear()
+            } else if (instr is UpdateVariableState) {
+                val later = laterInRun[instr.ident]
+                if (later == null) {
+                    laterInRun[instr.ident] = i
+                } else {
+                    val laterUpdate = merged[later] as UpdateVariableState
+                    merged[later] = laterUpdate.copy(changedSlots = unionOfChangedSlots(instr, laterUpdate))
+                    merged[i] = null
+                }
+            }
+        }
+
+        val displayed = mutableMapOf<String, List<String>>()
+        return merged.filterNotNull().filter {
+            it !is UpdateVariableState || displayed.put(it.ident, it.variables) != it.variables
+        }
+    }
+
+    // Slots are only comparable when neither update changed the number of displayed variables
+    private fun unionOfChangedSlots(earlier: UpdateVariableState, later: UpdateVariableState): List<Int>? {
+        val earlierSlots = earlier.changedSlots ?: return null
+        val laterSlots = later.changedSlots ?: return null
+        return earlierSlots.union(laterSlots).sorted()
+    }
+}
+
+/**
+ * Merges back to back [Sleep]s into a single wait of the same total length
+ *
+ * @constructor Creates a new merge sleeps pass
+ */
+class MergeSleeps : OptimisationPass {
+    override val name: String = "merge-sleeps"
+
+    override fun optimise(instructions: List<ManimInstr>): List<ManimInstr> {
+        val merged = mutableListOf<ManimInstr>()
+        instructions.forEach {
+            val previous = merged.lastOrNull()
+            if (it is Sleep && previous is Sleep) {
+                merged[merged.lastIndex] = previous.copy(length = previous.length + it.length)
+            } else {
+                merged.add(it)
+            }
+        }
+        return merged
+    }
+}
+
+/**
+ * Merges consecutive instructions that animate disjoint mobjects at the same runtime into a single [PlayTogether],
+ * so that for example a pointer move and an array update on the same line play at the same time
+ *
+ * @constructor Creates a new schedule animations pass
+ */
+class ScheduleAnimations : OptimisationPass {
+    override val name: String = "schedule-animations"
+
+    override fun optimise(instructions: List<ManimInstr>): List<ManimInstr> {
+        val scheduled = mutableListOf<ManimInstr>()
+        val group = mutableListOf<ManimInstr>()
+        val groupMobjects = mutableSetOf<String>()
+        instructions.forEach { instr ->
+            val mobjects = if (instr.toAnimationList() == null) null else instr.animatedMobjects
+            val joinsGroup = mobjects != null &&
+                (group.isEmpty() || (instr.runtime == group.first().runtime && mobjects.none { it in groupMobjects }))
+            if (!joinsGroup) {
+                scheduleGroup(scheduled, group)
+                group.clear()
+                groupMobjects.clear()
+            }
+            if (mobjects == null) {
+                scheduled.add(instr)
+            } else {
+                group.add(instr)
+                groupMobjects.addAll(mobjects)
+            }
+        }
+        scheduleGroup(scheduled, group)
+        return scheduled
+    }
+
+    private fun scheduleGroup(scheduled: MutableList<ManimInstr>, group: List<ManimInstr>) {
+        when (group.size) {
+            0 -> return
+            1 -> scheduled.add(group.first())
+            else -> scheduled.add(PlayTogether(group.toList(), group.first().runtime))
+        }
+    }
+}
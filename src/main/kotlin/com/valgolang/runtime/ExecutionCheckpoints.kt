@@ -0,0 +1,260 @@
+package com.valgolang.runtime
+
+import com.valgolang.linearrepresentation.MObject
+import com.valgolang.linearrepresentation.ManimInstr
+import com.valgolang.linearrepresentation.ManimInstrWithBoundary
+import com.valgolang.runtime.datastructures.BoundaryShape
+import com.valgolang.runtime.datastructures.array.Array2DValue
+import com.valgolang.runtime.datastructures.array.ArrayValue
+import com.valgolang.runtime.datastructures.binarytree.BinaryTreeNodeValue
+import com.valgolang.runtime.datastructures.binarytree.BinaryTreeValue
+import com.valgolang.runtime.datastructures.binarytree.ITreeNodeValue
+import com.valgolang.runtime.datastructures.binarytree.NullValue
+import com.valgolang.runtime.datastructures.stack.StackValue
+import java.security.MessageDigest
+import java.util.*
+import java.util.concurrent.locks.ReentrantLock
+
+/**
+ * State of the virtual machine between two top level statements of a program, from which a later run of a program
+ * with the same code up to that point can carry on instead of executing everything before it again.
+ *
+ * The state is copied when the checkpoint is taken and again for every run carrying on from it, so that neither the
+ * run that took it nor those carrying on from it affect the checkpoint. See [CheckpointState] for what is copied.
+ *
+ * @property line: line of the top level statement to carry on from
+ * @property showMoveToLine: whether code stepping was being visualised
+ * @property stepInto: whether code was being stepped into
+ * @property previousStepIntoState: whether code was being stepped into before the current code tracking annotation
+ * @property localDataStructures: data structures local to the top level frame
+ * @property displayedVariableState: lines last displayed in the variable block
+ * @property animationSpeeds: animation speeds, innermost speed change first
+ * @property nameCounters: state of the python variable name generator
+ * @property shownSubtitleLines: lines of subtitles shown only once that have been shown
+ * @constructor Creates a new execution checkpoint, copying the state given
+ *
+ * @param state: instructions added by the top level statements before the checkpoint, and the top level state referring to them
+ * @param dataStructureBoundaries: boundary of every data structure created by uid
+ */
+class ExecutionCheckpoint(
+    val line: Int,
+    state: CheckpointState,
+    dataStructureBoundaries: Map<String, BoundaryShape>,
+    val showMoveToLine: Boolean,
+    val stepInto: Boolean,
+    val previousStepIntoState: Boolean,
+    val localDataStructures: Set<String>,
+    val displayedVariableState: List<String>,
+    val animationSpeeds: List<Double>,
+    val nameCounters: Map<String, Int>,
+    val shownSubtitleLines: Set<Int>
+) {
+    private val state = state.copy()
+    private val dataStructureBoundaries = dataStructureBoundaries.mapValues { it.value.clone() }
+
+    /** Rough number of bytes held by the checkpoint, counting instructions it may share with others in full **/
+    val estimatedBytes: Long = (this.state.instructions.size + this.state.valueCount) * ESTIMATED_BYTES_PER_ITEM
+
+    /** Copies the state for a run carrying on from the checkpoint, leaving the checkpoint as it was **/
+    fun restore(): CheckpointState = state.copy()
+
+    /** Copies of the boundary of every data structure created by uid **/
+    fun restoreBoundaries(): Map<String, BoundaryShape> = dataStructureBoundaries.mapValues { it.value.clone() }
+
+    companion object {
+        /** Rough memory taken by an instruction or execution value along with what it alone references **/
+        private const val ESTIMATED_BYTES_PER_ITEM = 512L
+    }
+}
+
+/**
+ * Instructions added by the top level statements and the top level state referring to them, which are copied together
+ * so that copies of values drawn by an instruction refer to the copy of that instruction.
+ *
+ * Instructions with a boundary are copied, as laying out the program once it has run changes their boundary. Other
+ * instructions are shared, as they are not modified once added.
+ *
+ * @property instructions: instructions added by the top level statements, after the code and variable blocks
+ * @property variables: top level variables by identifier
+ * @property displayedVariables: variables displayed in the variable block
+ * @property subtitleBlock: subtitle block, once one has been created
+ * @property valueCount: number of distinct execution values held, if known
+ * @constructor Creates a new checkpoint state, holding what it is given rather than copies of it
+ */
+class CheckpointState(
+    val instructions: List<ManimInstr>,
+    val variables: MutableMap<String, ExecValue>,
+    val displayedVariables: VariableDisplayTracker,
+    val subtitleBlock: MObject,
+    val valueCount: Int = 0
+) {
+    /** Copies the state, the copy sharing nothing that later runs modify with this one **/
+    fun copy(): CheckpointState {
+        val instructionCopies = IdentityHashMap<ManimInstr, ManimInstr>()
+        val copiedInstructions = instructions.map { instr ->
+            if (instr is ManimInstrWithBoundary) instr.snapshot().also { instructionCopies[instr] = it } else instr
+        }
+        val copier = ExecValueCopier(instructionCopies)
+        val copiedVariables = variables.mapValuesTo(LinkedHashMap()) { copier.copy(it.value) }
+        val copiedDisplayedVariables = displayedVariables.copy(copier::copy)
+        return CheckpointState(
+            copiedInstructions,
+            copiedVariables,
+            copiedDisplayedVariables,
+            instructionCopies[subtitleBlock] as? MObject ?: subtitleBlock,
+            copier.size
+        )
+    }
+}
+
+/**
+ * Checkpoints taken between the top level statements of earlier runs, kept for the lifetime of the process so that
+ * repeated compiles of a program being edited, such as those sent to the daemon, only execute what changed.
+ *
+ * A checkpoint is keyed by a hash of every line before the statement it carries on from, together with everything
+ * else the state there depends on, such as the stylesheet. Top level statements run in order after every function
+ * declaration, so an edit only invalidates the checkpoints after the first changed line.
+ *
+ * The store is bounded by the estimated memory its checkpoints hold rather than by their number, as a checkpoint late
+ * in a long program holds far more than one near its start.
+ *
+ * @property maxBytes: estimated memory the checkpoints kept may hold, least recently used first out
+ * @constructor Creates a new empty store of checkpoints
+ */
+class ExecutionCheckpoints(private val maxBytes: Long = DEFAULT_MAX_BYTES) {
+
+    /** Held while a run using the checkpoints is executed and its code generated, so that such compiles run one at a time **/
+    val lock = ReentrantLock()
+
+    // Iterated least recently used first
+    private val checkpoints = LinkedHashMap<String, ExecutionCheckpoint>(16, 0.75f, true)
+
+    /** Estimated memory held by the checkpoints kept **/
+    var retainedBytes: Long = 0
+        private set
+
+    /**
+     * Finds the latest checkpoint among those keyed by [keys]
+     *
+     * @param keys: key of the checkpoint before each top level statement by line
+     * @return latest checkpoint found, or null if there are none
+     */
+    @Synchronized
+    fun latest(keys: Map<Int, String>): ExecutionCheckpoint? =
+        keys.entries.sortedByDescending { it.key }.asSequence().mapNotNull { checkpoints[it.value] }.firstOrNull()
+
+    /**
+     * Stores a checkpoint, replacing any with the same key
+     *
+     * @param key
+     * @param checkpoint
+     */
+    @Synchronized
+    fun store(key: String, checkpoint: ExecutionCheckpoint) {
+        checkpoints.put(key, checkpoint)?.let { retainedBytes -= it.estimatedBytes }
+        retainedBytes += checkpoint.estimatedBytes
+        val leastRecentlyUsed = checkpoints.values.iterator()
+        while (retainedBytes > maxBytes && leastRecentlyUsed.hasNext()) {
+            retainedBytes -= leastRecentlyUsed.next().estimatedBytes
+            leastRecentlyUsed.remove()
+        }
+    }
+
+    companion object {
+        /** Bumped whenever execution changes, invalidating every checkpoint taken before **/
+        private const val VERSION = "1"
+
+        /** A quarter of the memory the process may use **/
+        private val DEFAULT_MAX_BYTES = Runtime.getRuntime().maxMemory() / 4
+
+        /** Checkpoints shared by every compile in the process **/
+        val shared = ExecutionCheckpoints()
+
+        /**
+         * Computes the key of the checkpoint before each top level statement, hashing the lines before it
+         *
+         * @param seed: text identifying everything else the state at a checkpoint depends on
+         * @param fileLines: lines of the program
+         * @param lines: lines of the top level statements
+         * @return key of the checkpoint before each statement by line
+         */
+        fun prefixKeys(seed: String, fileLines: List<String>, lines: Collection<Int>): Map<Int, String> {
+            val digest = MessageDigest.getInstance("SHA-256")
+            digest.update((VERSION + seed + "\n").toByteArray())
+            var hashedLines = 0
+            return lines.distinct().sorted().associateWith { line ->
+                while (hashedLines < minOf(line - 1, fileLines.size)) {
+                    digest.update((fileLines[hashedLines] + "\n").toByteArray())
+                    hashedLines++
+                }
+                (digest.clone() as MessageDigest).digest().joinToString("") { "%02x".format(it) }
+            }
+        }
+    }
+}
+
+/**
+ * Deep copies execution values, copying a value referenced several times once so that aliasing is preserved.
+ * The manim object of a copy is the copy of the original's given in [manimObjects], if any, or else the same object.
+ *
+ * @property manimObjects: copies of instructions by the instruction copied
+ * @constructor Creates a new copier with nothing copied yet
+ */
+internal class ExecValueCopier(private val manimObjects: Map<ManimInstr, ManimInstr> = emptyMap()) {
+    // Execution values are data classes whose equality would recurse through trees, so copies are found by identity
+    private val copies = IdentityHashMap<ExecValue, ExecValue>()
+
+    /** Number of distinct values copied **/
+    val size: Int
+        get() = copies.size
+
+    fun copy(value: ExecValue): ExecValue = copies[value] ?: when (value) {
+        is DoubleValue -> remember(value, value.copy())
+        is CharValue -> remember(value, value.copy())
+        is BoolValue -> remember(value, value.copy())
+        is StringValue -> remember(value, value.copy())
+        is ArrayValue -> {
+            val array = remember(value, ArrayValue(value.manimObject, value.array.copyOf(), value.style, value.animatedStyle))
+            array.array.indices.forEach { array.array[it] = copy(value.array[it]) }
+            array
+        }
+        is Array2DValue -> {
+            val array = remember(value, Array2DValue(value.manimObject, Array(value.array.size) { value.array[it].copyOf() }, value.style, value.animatedStyle))
+            array.array.forEachIndexed { i, row -> row.indices.forEach { row[it] = copy(value.array[i][it]) } }
+            array
+        }
+        is StackValue -> {
+            val stack = remember(value, StackValue(value.manimObject, Stack(), value.style, value.animatedStyle))
+            value.stack.forEach { stack.stack.push(copy(it)) }
+            stack
+        }
+        is BinaryTreeValue -> {
+            val tree = remember(value, BinaryTreeValue(value.manimObject, value.value, value.style, value.animatedStyle))
+            tree.value = copy(value.value) as BinaryTreeNodeValue
+            tree
+        }
+        is BinaryTreeNodeValue -> {
+            val node = remember(
+                value,
+                BinaryTreeNodeValue(
+                    value = value.value,
+                    manimObject = value.manimObject,
+                    pathFromRoot = value.pathFromRoot,
+                    depth = value.depth
+                )
+            )
+            node.left = copy(value.left) as ITreeNodeValue
+            node.right = copy(value.right) as ITreeNodeValue
+            node.binaryTreeValue = value.binaryTreeValue?.let { copy(it) as BinaryTreeValue }
+            node
+        }
+        is NullValue, is EmptyValue, is VoidValue, is BreakValue, is ContinueValue, is RuntimeError -> value
+        else -> throw IllegalArgumentException("Cannot checkpoint execution value ${value.name}")
+    }
+
+    private fun <T : ExecValue> remember(original: ExecValue, copy: T): T {
+        copies[original] = copy
+        (manimObjects[copy.manimObject] as? MObject)?.let { copy.manimObject = it }
+        return copy
+    }
+}
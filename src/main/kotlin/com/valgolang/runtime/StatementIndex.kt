@@ -0,0 +1,44 @@
+package com.valgolang.runtime
+
+import com.valgolang.frontend.ast.StatementNode
+
+/**
+ * Statements of a program indexed by line number, so that frames read the statement on a line and jump over lines
+ * without one, such as blank lines and closing braces, rather than looking every line up in the line to node map.
+ *
+ * @constructor Creates a new index of the statements given
+ *
+ * @param statements: statements by line number
+ */
+internal class StatementIndex(statements: Map<Int, StatementNode>) {
+    /** Statements indexed by line number, null on lines without one **/
+    private val lineStatements: Array<StatementNode?> =
+        arrayOfNulls<StatementNode>((statements.keys.maxOrNull() ?: 0) + 2).also { lines ->
+            statements.forEach { (line, statement) -> lines[line] = statement }
+        }
+
+    /** For each line, the first line at or after it with a statement **/
+    private val nextStatementLines: IntArray = IntArray(lineStatements.size).also { next ->
+        next[next.lastIndex] = Int.MAX_VALUE
+        for (line in next.lastIndex - 1 downTo 0) {
+            next[line] = if (lineStatements[line] != null) line else next[line + 1]
+        }
+    }
+
+    /**
+     * Finds the statement on a line known to hold one
+     *
+     * @param line
+     * @return statement on the line
+     */
+    operator fun get(line: Int): StatementNode = lineStatements[line]!!
+
+    /**
+     * Finds the first line at or after [line] with a statement
+     *
+     * @param line
+     * @return line of the next statement, or Int.MAX_VALUE if there are none
+     */
+    fun nextStatementLine(line: Int): Int =
+        if (line in nextStatementLines.indices) nextStatementLines[line] else Int.MAX_VALUE
+}
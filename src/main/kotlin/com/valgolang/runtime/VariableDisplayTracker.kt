@@ -0,0 +1,102 @@
+package com.valgolang.runtime
+
+import java.util.PriorityQueue
+
+/**
+ * Tracks which variables are shown in the variable block and in which of its slots.
+ *
+ * When every slot is taken, displaying another variable evicts the least recently updated one and takes its slot.
+ * Updating and evicting a variable take constant time, apart from reusing the lowest free slot, which along with
+ * removing a variable takes O(log n) time in the number of slots emptied.
+ *
+ * @property capacity: maximum number of variables displayed at once
+ * @constructor Creates a new tracker with no variables displayed
+ */
+class VariableDisplayTracker(private val capacity: Int) {
+
+    private class DisplayedVariable(val identifier: String, val slot: Int, var value: ExecValue)
+
+    /** Displayed variables by identifier, from least to most recently updated **/
+    private val displayed = LinkedHashMap<String, DisplayedVariable>(16, 0.75f, true)
+
+    /** Displayed variables by slot **/
+    private val slots = arrayOfNulls<DisplayedVariable>(maxOf(capacity, 0))
+
+    /** Slots emptied by removed variables, filled lowest first so variables keep their order in the block **/
+    private val freeSlots = PriorityQueue<Int>()
+
+    private var nextUnusedSlot = 0
+
+    /**
+     * Displays [value] for [identifier], marking it as the most recently updated variable
+     *
+     * @param identifier
+     * @param value
+     */
+    fun update(identifier: String, value: ExecValue) {
+        val existing = displayed[identifier]
+        if (existing != null) {
+            existing.value = value
+            return
+        }
+
+        val slot = when {
+            freeSlots.isNotEmpty() -> freeSlots.poll()
+            nextUnusedSlot < slots.size -> nextUnusedSlot++
+            displayed.isNotEmpty() -> {
+                val leastRecentlyUpdated = displayed.values.iterator().next()
+                displayed.remove(leastRecentlyUpdated.identifier)
+                leastRecentlyUpdated.slot
+            }
+            else -> return
+        }
+        val variable = DisplayedVariable(identifier, slot, value)
+        displayed[identifier] = variable
+        slots[slot] = variable
+    }
+
+    /**
+     * Stops displaying [identifier], if it is displayed
+     *
+     * @param identifier
+     */
+    fun remove(identifier: String) {
+        val variable = displayed.remove(identifier) ?: return
+        slots[variable.slot] = null
+        freeSlots.add(variable.slot)
+    }
+
+    /** Stops displaying every variable **/
+    fun clear() {
+        displayed.clear()
+        slots.fill(null)
+        freeSlots.clear()
+        nextUnusedSlot = 0
+    }
+
+    /**
+     * Displayed variables in slot order
+     *
+     * @return identifier and value of each displayed variable
+     */
+    fun displayedVariables(): List<Pair<String, ExecValue>> =
+        slots.mapNotNull { variable -> variable?.let { Pair(it.identifier, it.value) } }
+
+    /**
+     * Copies the tracker, keeping which variables are displayed, in which slots and how recently they were updated
+     *
+     * @param copyValue: copies the value of each displayed variable
+     * @return the copy
+     */
+    fun copy(copyValue: (ExecValue) -> ExecValue): VariableDisplayTracker {
+        val copy = VariableDisplayTracker(capacity)
+        displayed.values.forEach {
+            val variable = DisplayedVariable(it.identifier, it.slot, copyValue(it.value))
+            copy.displayed[it.identifier] = variable
+            copy.slots[it.slot] = variable
+        }
+        copy.freeSlots.addAll(freeSlots)
+        copy.nextUnusedSlot = nextUnusedSlot
+        return copy
+    }
+}
@@ -1,9 +1,10 @@
 package com.valgolang.runtime
 
 import com.google.gson.Gson
+import com.valgolang.CompileProfiler
 import com.valgolang.ExitStatus
+import com.valgolang.errorhandling.ErrorHandler
 import com.valgolang.errorhandling.ErrorHandler.addRuntimeError
-import com.valgolang.frontend.FunctionData
 import com.valgolang.frontend.SymbolTableVisitor
 import com.valgolang.frontend.ast.*
 import com.valgolang.frontend.datastructures.ConstructorNode
@@ -14,9 +15,11 @@ import com.valgolang.frontend.datastructures.array.InternalArrayMethodCallNode
 import com.valgolang.frontend.datastructures.binarytree.*
 import com.valgolang.frontend.datastructures.stack.StackType
 import com.valgolang.linearrepresentation.*
+import com.valgolang.linearrepresentation.datastructures.array.ArraySync
 import com.valgolang.linearrepresentation.datastructures.binarytree.TreeNodeRestyle
+import com.valgolang.profiled
 import com.valgolang.runtime.datastructures.BoundaryShape
-import com.valgolang.runtime.datastructures.Scene
+import com.valgolang.runtime.datastructures.LayoutCache
 import com.valgolang.runtime.datastructures.WideBoundary
 import com.valgolang.runtime.datastructures.array.Array2DValue
 import com.valgolang.runtime.datastructures.array.ArrayExecutor
@@ -46,6 +49,13 @@ import java.util.*
  * @property fileLines: Array of source code lines.
  * @property stylesheet: Stylesheet object with animation properties.
  * @property returnBoundaries: Optional CLI argument for whether to return the boundaries of the shapes. Used in Web UI.
+ * @property instructionSink: Receives instructions as they are produced instead of them being kept and returned, if given.
+ *                            Boundaries only known once the program has run are then late bound, see [lateBoundBoundaries].
+ * @property layoutCache: Memo of the layouts of the shapes, found again when the shapes created are unchanged.
+ * @property checkpoints: Store of checkpoints between top level statements to carry on from and add to, if given.
+ *                        Checkpoints are not kept while instructions are streamed to [instructionSink].
+ * @property checkpointSeed: Text identifying everything outside the program that execution depends on, such as the stylesheet.
+ * @property profiler: Profiler counting the statements executed, timing the layout and sampling the nodes executed, if profiling.
  * @constructor Creates a new virtual machine
  *
  */
@@ -56,10 +66,25 @@ class VirtualMachine(
     private val statements: MutableMap<Int, StatementNode>,
     private val fileLines: List<String>,
     private val stylesheet: Stylesheet,
-    private val returnBoundaries: Boolean = false
+    private val returnBoundaries: Boolean = false,
+    private val instructionSink: ((ManimInstr) -> Unit)? = null,
+    private val layoutCache: LayoutCache = LayoutCache(),
+    checkpoints: ExecutionCheckpoints? = null,
+    checkpointSeed: String = "",
+    private val profiler: CompileProfiler? = null
 ) {
 
-    private val linearRepresentation = mutableListOf<ManimInstr>()
+    private val linearRepresentation = InstructionBuffer(instructionSink?.let { this::streamInstruction })
+    private val autoBoundaries = returnBoundaries || !stylesheet.userDefinedPositions()
+    private val lateBoundUids = mutableSetOf<String>()
+
+    /** Boundaries of the shapes streamed with late bound boundaries by uid, set once [runProgram] has succeeded **/
+    var lateBoundBoundaries: Map<String, List<Pair<Double, Double>>> = emptyMap()
+        private set
+
+    /** Boundaries printed when returning boundaries, set once [runProgram] has computed them **/
+    var printedBoundaries: String? = null
+        private set
     private val variableNameGenerator = VariableNameGenerator(symbolTableVisitor)
     private val codeBlockVariable: String = variableNameGenerator.generateNameFromPrefix("code_block")
     private val codeTextVariable: String = variableNameGenerator.generateNameFromPrefix("code_text")
@@ -68,16 +93,37 @@ class VirtualMachine(
     private val displayLine: MutableList<Int> = mutableListOf()
     private val displayCode: MutableList<String> = mutableListOf()
     private val dataStructureBoundaries = mutableMapOf<String, BoundaryShape>()
+    private var displayedVariableState: List<String> = listOf()
     private var acceptableNonStatements = setOf("}", "{")
-    private val MAX_DISPLAYED_VARIABLES = 4
+    private val MAX_DISPLAYED_VARIABLES = stylesheet.getMaxDisplayedVariables()
     private val ALLOCATED_STACKS = Runtime.getRuntime().freeMemory() / 1000000
     private val STEP_INTO_DEFAULT = stylesheet.getStepIntoIsDefault()
     private val MAX_NUMBER_OF_LOOPS = 10000
+    private val FAST_FORWARD_LOOPS_AFTER = stylesheet.getFastForwardLoopsAfter()
     private val SUBTITLE_DEFAULT_DURATION = 5
     private val hideCode = stylesheet.getHideCode()
     private val hideVariables = stylesheet.getHideVariables()
+    private val nodeSampler = profiler?.nodeSampler
+
+    /** Checkpoints are taken between top level statements so later runs of an edited program can carry on from them **/
+    private val checkpoints = checkpoints.takeIf { instructionSink == null }
+    private val checkpointKeys: Map<Int, String> = if (this.checkpoints == null) emptyMap() else ExecutionCheckpoints.prefixKeys(
+        checkpointSeed + "\u0000" + symbolTableVisitor.getVariableNames().sorted().joinToString(","),
+        fileLines,
+        program.statements.map { it.lineNumber }
+    )
+    private var preambleSize = 0
+    private val shownSubtitleLines = mutableSetOf<Int>()
+
+    /** Functions by identifier, resolved once rather than searched for on every call **/
+    private val functionTable: Map<String, ResolvedFunction> = program.functions.associate {
+        it.identifier to ResolvedFunction(it, it.parameters.map { parameter -> parameter.identifier }, it.statements.last().lineNumber)
+    }
     private var animationSpeeds = ArrayDeque(listOf(1.0))
 
+    /** Statements indexed by line, so frames jump straight between them **/
+    private val statementIndex = StatementIndex(statements)
+
     init {
         setupFileLines()
     }
@@ -103,28 +149,37 @@ class VirtualMachine(
                     runtime = animationSpeeds.first(),
                     syntaxHighlightingOn = stylesheet.getSyntaxHighlighting(),
                     syntaxHighlightingStyle = stylesheet.getSyntaxHighlightingStyle(),
-                    tabSpacing = stylesheet.getTabSpacing()
+                    tabSpacing = stylesheet.getTabSpacing(),
+                    scrollThreshold = stylesheet.getScrollThreshold()
                 )
             )
         }
-        val variables = mutableMapOf<String, ExecValue>()
-        val result = Frame(
-            program.statements.first().lineNumber,
-            fileLines.size,
-            variables,
-            hideCode = hideCode,
-            updateVariableState = !(hideCode || hideVariables)
-        ).runFrame()
+        preambleSize = linearRepresentation.size
+        val checkpoint = checkpoints?.latest(checkpointKeys)
+        val result = if (checkpoint == null) {
+            Frame(
+                program.statements.first().lineNumber,
+                fileLines.size,
+                mutableMapOf(),
+                hideCode = hideCode,
+                updateVariableState = !(hideCode || hideVariables),
+                isProgramFrame = true
+            ).runFrame()
+        } else {
+            resumeFrom(checkpoint)
+        }
         linearRepresentation.add(Sleep(1.0, runtime = animationSpeeds.first()))
         return if (result is RuntimeError) {
             addRuntimeError(result.value, result.lineNumber)
             Pair(ExitStatus.RUNTIME_ERROR, linearRepresentation)
-        } else if (returnBoundaries || !stylesheet.userDefinedPositions()) {
-            val (exitStatus, computedBoundaries) = Scene().compute(
-                dataStructureBoundaries.toList(),
-                hideCode,
-                hideVariables
-            )
+        } else if (autoBoundaries) {
+            val (exitStatus, computedBoundaries) = profiled(profiler, "layout") {
+                layoutCache.compute(
+                    dataStructureBoundaries.toList(),
+                    hideCode,
+                    hideVariables
+                )
+            }
             if (returnBoundaries) {
                 val boundaries = mutableMapOf<String, Map<String, PositionProperties>>()
                 val genericShapeIDs = mutableSetOf<String>()
@@ -136,11 +191,14 @@ class VirtualMachine(
                 boundaries["stylesheet"] = stylesheet.getPositions()
                     .filter { it.key in dataStructureBoundaries.keys || genericShapeIDs.contains(it.key) }
                 val gson = Gson()
-                println(gson.toJson(boundaries))
+                val boundariesJson = gson.toJson(boundaries)
+                printedBoundaries = boundariesJson
+                ErrorHandler.output.println(boundariesJson)
             }
             if (exitStatus != ExitStatus.EXIT_SUCCESS) {
                 return Pair(exitStatus, linearRepresentation)
             }
+            lateBoundBoundaries = lateBoundUids.associateWith { computedBoundaries.getValue(it).corners() }
             val linearRepresentationWithBoundaries = linearRepresentation.map {
                 if (it is ManimInstrWithBoundary) {
                     val boundaryShape = computedBoundaries[it.uid]!!
@@ -162,10 +220,63 @@ class VirtualMachine(
                     }
                 }
             }
+            lateBoundBoundaries = lateBoundUids.associateWith { uid ->
+                val position = stylesheet.getPosition(uid)
+                if (position == null) {
+                    addRuntimeError("Missing positional parameter for $uid", 1)
+                    return Pair(ExitStatus.RUNTIME_ERROR, linearRepresentation)
+                }
+                position.calculateManimCoord()
+            }
             Pair(ExitStatus.EXIT_SUCCESS, linearRepresentation)
         }
     }
 
+    // Restores the state at the checkpoint, along with the instructions added before it, and runs the rest of the program
+    private fun resumeFrom(checkpoint: ExecutionCheckpoint): ExecValue {
+        val state = checkpoint.restore()
+        linearRepresentation.addAll(state.instructions)
+        dataStructureBoundaries.putAll(checkpoint.restoreBoundaries())
+        subtitleBlockVariable = state.subtitleBlock
+        displayedVariableState = checkpoint.displayedVariableState
+        // Executors share the deque of speeds, so it is restored in place
+        animationSpeeds.clear()
+        animationSpeeds.addAll(checkpoint.animationSpeeds)
+        variableNameGenerator.restoreCounters(checkpoint.nameCounters)
+        checkpoint.shownSubtitleLines.forEach { line ->
+            (statements[line] as? SubtitleAnnotationNode)?.condition = BoolNode(line, false)
+        }
+        shownSubtitleLines.addAll(checkpoint.shownSubtitleLines)
+
+        state.variables.values.forEach { value ->
+            val manimObject = value.manimObject
+            if ((value is ArrayValue || value is Array2DValue) && manimObject is DataStructureMObject) {
+                linearRepresentation.trackArray(manimObject.ident, value)
+            }
+        }
+        return Frame(
+            checkpoint.line,
+            fileLines.size,
+            state.variables,
+            showMoveToLine = checkpoint.showMoveToLine,
+            stepInto = checkpoint.stepInto,
+            displayedVariables = state.displayedVariables,
+            hideCode = hideCode,
+            updateVariableState = !(hideCode || hideVariables),
+            localDataStructures = checkpoint.localDataStructures.toMutableSet(),
+            isProgramFrame = true
+        ).resumeFrame(checkpoint.previousStepIntoState)
+    }
+
+    // Boundaries are fixed up once the program has run, so instructions already streamed look theirs up later instead
+    private fun streamInstruction(instr: ManimInstr) {
+        if (instr is ManimInstrWithBoundary && (autoBoundaries || instr is CodeBlock || instr is VariableBlock || instr is SubtitleBlock)) {
+            instr.lateBoundBoundary = true
+            lateBoundUids.add(instr.uid)
+        }
+        instructionSink!!(instr)
+    }
+
     private fun setupFileLines() {
         if (stylesheet.getDisplayNewLinesInCode()) {
             acceptableNonStatements = acceptableNonStatements.plus("")
@@ -195,6 +306,15 @@ class VirtualMachine(
         }
     }
 
+    /**
+     * Function resolved ahead of execution
+     *
+     * @property node: Function declaration.
+     * @property parameterNames: Identifiers of the parameters, in order.
+     * @property finalLine: Line of the last statement in the function body.
+     */
+    private class ResolvedFunction(val node: FunctionNode, val parameterNames: List<String>, val finalLine: Int)
+
     /**
      * Frame
      *
@@ -204,12 +324,12 @@ class VirtualMachine(
      * @property depth: Number of frames top level scope.
      * @property showMoveToLine: Whether to visualise code stepping for the code executed in this frame.
      * @property stepInto: Whether to step into (rather than over) this frame in the code stepping visualisation.
-     * @property mostRecentlyUpdatedQueue: Queue maintaining most recently updated variables.
-     * @property displayedDataMap: Map maintaining the execution value and variable being displayed in variable block.
+     * @property displayedVariables: Variables being displayed in variable block, with their execution values.
      * @property updateVariableState: Whether to not hide variable block.
      * @property hideCode: Whether to hide code block.
      * @property functionNamePrefix: Function name for stylesheet styling assignment disambiguation.
      * @property localDataStructures: Set of local data structures.
+     * @property isProgramFrame: Whether this frame runs the top level statements, between which checkpoints are taken.
      * @constructor Creates a new execution frame.
      *
      */
@@ -221,49 +341,60 @@ class VirtualMachine(
         private val depth: Int = 1,
         private var showMoveToLine: Boolean = true,
         private var stepInto: Boolean = STEP_INTO_DEFAULT,
-        private var mostRecentlyUpdatedQueue: LinkedList<Int> = LinkedList(),
-        private var displayedDataMap: MutableMap<Int, Pair<String, ExecValue>> = mutableMapOf(),
+        private var displayedVariables: VariableDisplayTracker = VariableDisplayTracker(MAX_DISPLAYED_VARIABLES),
         private val updateVariableState: Boolean = true,
         private val hideCode: Boolean = false,
         val functionNamePrefix: String = "",
-        private val localDataStructures: MutableSet<String> = mutableSetOf()
+        private val localDataStructures: MutableSet<String> = mutableSetOf(),
+        private val isProgramFrame: Boolean = false
     ) {
         private var previousStepIntoState = stepInto
 
-        /** Data Structure Executors **/
-        private val btExecutor = BinaryTreeExecutor(
-            variables,
-            linearRepresentation,
-            this,
-            stylesheet,
-            animationSpeeds,
-            dataStructureBoundaries,
-            variableNameGenerator,
-            codeTextVariable,
-            localDataStructures
-        )
-        private val arrExecutor = ArrayExecutor(
-            variables,
-            linearRepresentation,
-            this,
-            stylesheet,
-            animationSpeeds,
-            dataStructureBoundaries,
-            variableNameGenerator,
-            codeTextVariable,
-            localDataStructures
-        )
-        private val stackExecutor = StackExecutor(
-            variables,
-            linearRepresentation,
-            this,
-            stylesheet,
-            animationSpeeds,
-            dataStructureBoundaries,
-            variableNameGenerator,
-            codeTextVariable,
-            localDataStructures
-        )
+        /** Initial state, restored when the frame is run again by [rerunFrame] **/
+        private val startPc = pc
+        private val initialShowMoveToLine = showMoveToLine
+        private val initialStepInto = stepInto
+
+        /** Data Structure Executors, only created once a statement in the frame needs them **/
+        private val btExecutor by lazy(LazyThreadSafetyMode.NONE) {
+            BinaryTreeExecutor(
+                variables,
+                linearRepresentation,
+                this,
+                stylesheet,
+                animationSpeeds,
+                dataStructureBoundaries,
+                variableNameGenerator,
+                codeTextVariable,
+                localDataStructures
+            )
+        }
+        private val arrExecutor by lazy(LazyThreadSafetyMode.NONE) {
+            ArrayExecutor(
+                variables,
+                linearRepresentation,
+                this,
+                stylesheet,
+                animationSpeeds,
+                dataStructureBoundaries,
+                variableNameGenerator,
+                codeTextVariable,
+                localDataStructures
+            )
+        }
+        private val stackExecutor by lazy(LazyThreadSafetyMode.NONE) {
+            StackExecutor(
+                variables,
+                linearRepresentation,
+                this,
+                stylesheet,
+                animationSpeeds,
+                dataStructureBoundaries,
+                variableNameGenerator,
+                codeTextVariable,
+                localDataStructures
+            )
+        }
 
         /** FRAME UTILITIES **/
         fun getShowMoveToLine() = showMoveToLine
@@ -272,26 +403,7 @@ class VirtualMachine(
 
         fun insertVariable(identifier: String, value: ExecValue) {
             if (shouldRenderInVariableState(value, functionNamePrefix + identifier)) {
-                val index = displayedDataMap.filterValues { it.first == identifier }.keys
-                if (index.isEmpty()) {
-                    // not been visualised
-                    // if there is space
-                    if (displayedDataMap.size < MAX_DISPLAYED_VARIABLES) {
-                        val newIndex = displayedDataMap.size
-                        mostRecentlyUpdatedQueue.addLast(newIndex)
-                        displayedDataMap[newIndex] = Pair(identifier, value)
-                    } else {
-                        // if there is no space
-                        val oldest = mostRecentlyUpdatedQueue.removeFirst()
-                        displayedDataMap[oldest] = Pair(identifier, value)
-                        mostRecentlyUpdatedQueue.addLast(oldest)
-                    }
-                } else {
-                    // being visualised
-                    mostRecentlyUpdatedQueue.remove(index.first())
-                    mostRecentlyUpdatedQueue.addLast(index.first())
-                    displayedDataMap[index.first()] = Pair(identifier, value)
-                }
+                displayedVariables.update(identifier, value)
             }
         }
 
@@ -303,7 +415,7 @@ class VirtualMachine(
                 (value is StackValue && !stylesheet.renderDataStructure(identifier))
 
         fun removeVariable(identifier: String) {
-            displayedDataMap = displayedDataMap.filter { (_, v) -> v.first != identifier }.toMutableMap()
+            displayedVariables.remove(identifier)
         }
 
         private fun addSleep(length: Double) {
@@ -324,8 +436,9 @@ class VirtualMachine(
             }
         }
 
+        // Jumps over lines without a statement, such as blank lines and closing braces
         private fun fetchNextStatement() {
-            ++pc
+            pc = statementIndex.nextStatementLine(pc + 1)
         }
 
         // instantiate new Frame and execute on scoping changes e.g. recursion
@@ -339,39 +452,60 @@ class VirtualMachine(
                 updateVariableState()
             }
 
+            pc = statementIndex.nextStatementLine(pc)
+            // Instructions added once the frame returns belong to the statement that ran it
+            val callerLine = linearRepresentation.sourceLine
+            return runStatements().also { linearRepresentation.sourceLine = callerLine }
+        }
+
+        /**
+         * Carries on running the top level statements from a checkpoint, whose variables are already displayed
+         *
+         * @param previousStepIntoState: Whether code was being stepped into before the current code tracking annotation.
+         * @return execution value of the run
+         */
+        fun resumeFrame(previousStepIntoState: Boolean): ExecValue {
+            this.previousStepIntoState = previousStepIntoState
+            return runStatements()
+        }
+
+        private fun runStatements(): ExecValue {
             while (pc <= finalLine) {
-                if (statements.containsKey(pc)) {
-                    val statement = statements[pc]!!
+                val statement = statementIndex[pc]
+                linearRepresentation.sourceLine = pc
 
-                    if (statement is CodeNode) {
-                        moveToLine()
-                    }
+                if (statement is CodeNode) {
+                    moveToLine()
+                }
 
-                    val value = executeStatement(statement)
-                    if (value is RuntimeError) {
-                        return value
+                profiler?.countStatement()
+                val value = executeStatement(statement)
+                if (value is RuntimeError) {
+                    return value
+                }
+                if (statement is ReturnNode || value !is EmptyValue) {
+                    if (statement is ReturnNode && statement.expression is IdentifierNode && value !is PrimitiveValue) {
+                        // Return variable data structure
+                        localDataStructures.remove(functionNamePrefix + statement.expression.identifier)
                     }
-                    if (statement is ReturnNode || value !is EmptyValue) {
-                        if (statement is ReturnNode && statement.expression is IdentifierNode && value !is PrimitiveValue) {
-                            // Return variable data structure
-                            localDataStructures.remove(functionNamePrefix + statement.expression.identifier)
-                        }
-                        if (localDataStructures.isNotEmpty() && value !is RuntimeError) {
-                            linearRepresentation.add(
-                                CleanUpLocalDataStructures(
-                                    convertToIdent(
-                                        localDataStructures,
-                                        variables
-                                    ),
-                                    animationSpeeds.first()
-                                )
+                    if (localDataStructures.isNotEmpty() && value !is RuntimeError) {
+                        linearRepresentation.add(
+                            CleanUpLocalDataStructures(
+                                convertToIdent(
+                                    localDataStructures,
+                                    variables
+                                ),
+                                animationSpeeds.first()
                             )
-                        }
-                        return value
+                        )
                     }
+                    return value
                 }
 
                 fetchNextStatement()
+                if (isProgramFrame) {
+                    saveCheckpoint()
+                }
             }
 
             if (localDataStructures.isNotEmpty() && depth != 1) {
@@ -385,24 +519,98 @@ class VirtualMachine(
             return EmptyValue
         }
 
+        // Copies the state before the statement at pc, unless it is not a top level statement or instructions are being dropped
+        private fun saveCheckpoint() {
+            val key = checkpointKeys[pc]
+            if (checkpoints == null || key == null || linearRepresentation.muted) {
+                return
+            }
+            checkpoints.store(
+                key,
+                ExecutionCheckpoint(
+                    pc,
+                    CheckpointState(
+                        linearRepresentation.subList(preambleSize, linearRepresentation.size),
+                        variables,
+                        displayedVariables,
+                        subtitleBlockVariable
+                    ),
+                    dataStructureBoundaries,
+                    showMoveToLine,
+                    stepInto,
+                    previousStepIntoState,
+                    localDataStructures.toSet(),
+                    displayedVariableState,
+                    animationSpeeds.toList(),
+                    variableNameGenerator.counters(),
+                    shownSubtitleLines.toSet()
+                )
+            )
+        }
+
+        /**
+         * Runs the frame again from its first line, as a loop does for its body on every iteration,
+         * rather than allocating a new frame with the same arguments each time
+         *
+         * @param displayedVariables: Variables displayed in the variable block for this run.
+         * @return execution value of the run
+         */
+        fun rerunFrame(
+            displayedVariables: VariableDisplayTracker
+        ): ExecValue {
+            pc = startPc
+            showMoveToLine = initialShowMoveToLine
+            stepInto = initialStepInto
+            previousStepIntoState = initialStepInto
+            this.displayedVariables = displayedVariables
+            localDataStructures.clear()
+            return runFrame()
+        }
+
         private fun getVariableState(): List<String> {
-            return displayedDataMap.toSortedMap().map { wrapString("${it.value.first} = ${it.value.second}") }
+            return displayedVariables.displayedVariables().map { (identifier, value) -> wrapString("$identifier = $value") }
         }
 
         fun updateVariableState() {
-            if (showMoveToLine && !hideCode && !hideVariables)
+            if (showMoveToLine && !hideCode && !hideVariables && !linearRepresentation.muted) {
+                val variableState = getVariableState()
+                // Only lines that changed need animating, unless the number of lines changed and the block is rearranged
+                val changedSlots = if (variableState.size == displayedVariableState.size) {
+                    variableState.indices.filter { variableState[it] != displayedVariableState[it] }
+                } else {
+                    null
+                }
+                if (changedSlots?.isEmpty() == true) {
+                    return
+                }
+                displayedVariableState = variableState
                 linearRepresentation.add(
                     UpdateVariableState(
-                        getVariableState(),
+                        variableState,
                         "variable_block",
-                        runtime = animationSpeeds.first()
+                        runtime = animationSpeeds.first(),
+                        changedSlots = changedSlots
                     )
                 )
+            }
         }
 
         /** STATEMENTS **/
 
-        private fun executeStatement(statement: StatementNode): ExecValue = when (statement) {
+        private fun executeStatement(statement: StatementNode): ExecValue =
+            if (nodeSampler == null) executeStatementNode(statement) else sampled(nodeSampler, statement) { executeStatementNode(statement) }
+
+        // Records the node being executed for the sampler to read while [execute] runs
+        private inline fun sampled(sampler: CompileProfiler.NodeSampler, node: ASTNode, execute: () -> ExecValue): ExecValue {
+            val previous = sampler.enter(node)
+            try {
+                return execute()
+            } finally {
+                sampler.exit(previous)
+            }
+        }
+
+        private fun executeStatementNode(statement: StatementNode): ExecValue = when (statement) {
             is ReturnNode -> executeExpression(statement.expression)
             is FunctionNode -> {
                 // just go onto next line, this is just a label
@@ -463,7 +671,10 @@ class VirtualMachine(
             is SubtitleAnnotationNode -> {
                 val condition = executeExpression(statement.condition) as BoolValue
                 if (condition.value) {
-                    if (statement.showOnce) statement.condition = BoolNode(statement.lineNumber, false)
+                    if (statement.showOnce) {
+                        statement.condition = BoolNode(statement.lineNumber, false)
+                        shownSubtitleLines.add(statement.lineNumber)
+                    }
 
                     val duration: Double = if (statement.duration != null) {
                         (executeExpression(statement.duration) as DoubleValue).value
@@ -526,17 +737,15 @@ class VirtualMachine(
                 else
                     executedArguments.add(executed)
             }
-            val argumentNames =
-                (symbolTableVisitor.getData(statement.functionIdentifier) as FunctionData).parameters.map { it.identifier }
-            val argumentVariables = (argumentNames zip executedArguments).toMap().toMutableMap()
-            val functionNode = program.functions.find { it.identifier == statement.functionIdentifier }!!
-            val finalStatementLine = functionNode.statements.last().lineNumber
+            val function = functionTable.getValue(statement.functionIdentifier)
+            val functionNode = function.node
+            val argumentVariables = (function.parameterNames zip executedArguments).toMap().toMutableMap()
 
             // program counter will forward in loop, we have popped out of stack
 
             val returnValue = Frame(
                 functionNode.lineNumber,
-                finalStatementLine,
+                function.finalLine,
                 argumentVariables,
                 depth + 1,
                 showMoveToLine = stepInto,
@@ -614,53 +823,68 @@ class VirtualMachine(
 
         private fun executeWhileStatement(whileStatementNode: WhileStatementNode): ExecValue {
             if (showMoveToLine && !hideCode) addSleep(animationSpeeds.first() * 0.5)
-            return executeLoopBranchingStatements(whileStatementNode, whileStatementNode.condition)
+            return executeLoopBranchingStatements(whileStatementNode) { executeExpression(whileStatementNode.condition) }
         }
 
         private fun executeForStatement(forStatementNode: ForStatementNode): ExecValue {
             executeAssignment(forStatementNode.beginStatement)
             val start = executeExpression(forStatementNode.beginStatement.expression) as DoubleAlias
             val end = executeExpression(forStatementNode.endCondition) as DoubleAlias
-            val lineNumber = forStatementNode.lineNumber
-
-            val condition = if (start < end) {
-                LtExpression(
-                    lineNumber,
-                    IdentifierNode(lineNumber, forStatementNode.beginStatement.identifier.identifier),
-                    NumberNode(lineNumber, end.toDouble())
-                )
-            } else {
-                GtExpression(
-                    lineNumber,
-                    IdentifierNode(lineNumber, forStatementNode.beginStatement.identifier.identifier),
-                    NumberNode(lineNumber, end.toDouble())
-                )
+            val counter = forStatementNode.beginStatement.identifier.identifier
+            val endValue = end.toDouble()
+            val ascending = start < end
+
+            // Compare the counter directly rather than evaluating a comparison expression on every iteration
+            return executeLoopBranchingStatements(forStatementNode) {
+                val comparison = (variables[counter] as DoubleAlias).toDouble().compareTo(endValue)
+                BoolValue(if (ascending) comparison < 0 else comparison > 0)
             }
-
-            return executeLoopBranchingStatements(forStatementNode, condition)
         }
 
         private fun removeForLoopCounter(forStatementNode: ForStatementNode) {
             val identifier = forStatementNode.beginStatement.identifier.identifier
-            val index = displayedDataMap.filterValues { it.first == identifier }.keys
-            displayedDataMap.remove(index.first())
+            displayedVariables.remove(identifier)
             variables.remove(identifier)
         }
 
-        private fun executeLoopBranchingStatements(loopNode: LoopNode, condition: ExpressionNode): ExecValue {
+        private fun executeLoopBranchingStatements(loopNode: LoopNode, condition: () -> ExecValue): ExecValue {
             var conditionValue: ExecValue
             var execValue: ExecValue
             var loopCount = 0
             val prevShowMoveToLine = showMoveToLine
+            var fastForwarding = false
+            val unsyncableUpdatesBefore = linearRepresentation.unsyncableUpdates
+            // Created once and rerun for every iteration, with the variables displayed cleared unless the loop has a counter
+            val bodyDisplayedVariables = VariableDisplayTracker(MAX_DISPLAYED_VARIABLES)
+            val body = Frame(
+                loopNode.statements.first().lineNumber,
+                loopNode.statements.last().lineNumber,
+                variables,
+                depth,
+                showMoveToLine = stepInto,
+                stepInto = stepInto && previousStepIntoState,
+                hideCode = hideCode,
+                functionNamePrefix = functionNamePrefix
+            )
 
             while (loopCount < MAX_NUMBER_OF_LOOPS) {
-                conditionValue = executeExpression(condition)
+                // Keep executing without animating once enough iterations have been shown, unless an enclosing loop already is
+                // or the loop has updated data structures that cannot be synced to their final state
+                if (loopCount == FAST_FORWARD_LOOPS_AFTER && !linearRepresentation.muted &&
+                    linearRepresentation.unsyncableUpdates == unsyncableUpdatesBefore
+                ) {
+                    linearRepresentation.mute()
+                    fastForwarding = true
+                }
+
+                conditionValue = condition()
                 if (conditionValue is RuntimeError) {
                     return conditionValue
                 } else if (conditionValue is BoolValue) {
                     if (!conditionValue.value) {
                         showMoveToLine = prevShowMoveToLine
                         if (loopNode is ForStatementNode) removeForLoopCounter(loopNode)
+                        if (fastForwarding) syncFastForwardedState()
                         pc = loopNode.endLineNumber
                         moveToLine()
                         return EmptyValue
@@ -670,23 +894,21 @@ class VirtualMachine(
                     }
                 }
 
-                execValue = Frame(
-                    loopNode.statements.first().lineNumber,
-                    loopNode.statements.last().lineNumber,
-                    variables,
-                    depth,
-                    showMoveToLine = stepInto,
-                    stepInto = stepInto && previousStepIntoState,
-                    hideCode = hideCode,
-                    mostRecentlyUpdatedQueue = if (loopNode is ForStatementNode) mostRecentlyUpdatedQueue else LinkedList(),
-                    displayedDataMap = if (loopNode is ForStatementNode) displayedDataMap else mutableMapOf(),
-                    functionNamePrefix = functionNamePrefix
-                ).runFrame()
+                execValue = body.rerunFrame(
+                    if (loopNode is ForStatementNode) displayedVariables else bodyDisplayedVariables.apply { clear() }
+                )
+
+                // Animate the rest of the loop in full once it updates a data structure that cannot be synced
+                if (fastForwarding && linearRepresentation.unsyncableUpdates != unsyncableUpdatesBefore) {
+                    syncFastForwardedState()
+                    fastForwarding = false
+                }
 
                 when (execValue) {
                     is BreakValue -> {
                         showMoveToLine = prevShowMoveToLine
                         if (loopNode is ForStatementNode) removeForLoopCounter(loopNode)
+                        if (fastForwarding) syncFastForwardedState()
                         pc = loopNode.endLineNumber
                         moveToLine()
                         return EmptyValue
@@ -698,6 +920,7 @@ class VirtualMachine(
                         continue
                     }
                     !is EmptyValue -> {
+                        if (fastForwarding) syncFastForwardedState()
                         return execValue
                     }
                 }
@@ -713,6 +936,21 @@ class VirtualMachine(
             return RuntimeError("Max number of loop executions exceeded", lineNumber = loopNode.lineNumber)
         }
 
+        // Jumps the arrays updated while fast forwarding, in any frame, and the variable block straight to their final state
+        private fun syncFastForwardedState() {
+            linearRepresentation.unmute().forEach { (ident, value) ->
+                val rows = when (value) {
+                    is ArrayValue -> listOf(value.array.map { it.value.toString() })
+                    is Array2DValue -> value.array.map { row -> row.map { it.value.toString() } }
+                    else -> return@forEach
+                }
+                linearRepresentation.add(
+                    ArraySync(ident, rows, value is Array2DValue, runtime = animationSpeeds.first(), render = value.manimObject.render)
+                )
+            }
+            updateVariableState()
+        }
+
         private fun executeIfStatement(ifStatementNode: IfStatementNode): ExecValue {
             if (showMoveToLine && !hideCode) addSleep(animationSpeeds.first() * 0.5)
             var conditionValue = executeExpression(ifStatementNode.condition)
@@ -776,6 +1014,17 @@ class VirtualMachine(
             insideMethodCall: Boolean = false,
             identifier: AssignLHS = EmptyLHS,
             subtitleExpression: Boolean = false
+        ): ExecValue = if (nodeSampler == null) {
+            executeExpressionNode(node, insideMethodCall, identifier, subtitleExpression)
+        } else {
+            sampled(nodeSampler, node) { executeExpressionNode(node, insideMethodCall, identifier, subtitleExpression) }
+        }
+
+        private fun executeExpressionNode(
+            node: ExpressionNode,
+            insideMethodCall: Boolean,
+            identifier: AssignLHS,
+            subtitleExpression: Boolean
         ): ExecValue = when (node) {
             is IdentifierNode -> variables[node.identifier]!!
             is NumberNode -> DoubleValue(node.double)
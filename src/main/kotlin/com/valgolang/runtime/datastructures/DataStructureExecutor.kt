@@ -11,7 +11,7 @@ import com.valgolang.frontend.datastructures.array.ArrayType
 import com.valgolang.frontend.datastructures.binarytree.BinaryTreeNodeType
 import com.valgolang.frontend.datastructures.binarytree.BinaryTreeType
 import com.valgolang.linearrepresentation.DataStructureMObject
-import com.valgolang.linearrepresentation.ManimInstr
+import com.valgolang.linearrepresentation.InstructionBuffer
 import com.valgolang.linearrepresentation.VariableNameGenerator
 import com.valgolang.linearrepresentation.datastructures.binarytree.InitTreeStructure
 import com.valgolang.runtime.ExecValue
@@ -40,7 +40,7 @@ import com.valgolang.stylesheet.Stylesheet
 
 interface DataStructureExecutor {
     val variables: MutableMap<String, ExecValue>
-    val linearRepresentation: MutableList<ManimInstr>
+    val linearRepresentation: InstructionBuffer
     val frame: VirtualMachine.Frame
     val stylesheet: Stylesheet
     val animationSpeeds: java.util.ArrayDeque<Double>
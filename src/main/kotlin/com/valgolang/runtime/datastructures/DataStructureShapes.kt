@@ -3,6 +3,8 @@ package com.valgolang.runtime.datastructures
 import com.valgolang.ExitStatus
 import com.valgolang.errorhandling.ErrorHandler
 import com.valgolang.stylesheet.PositionProperties
+import kotlin.math.ceil
+import kotlin.math.floor
 
 /**
  * Abstract Boundary shape
@@ -431,41 +433,88 @@ class Scene {
     }
 
     private fun maximise(boundaryShape: BoundaryShape) {
-        if (boundaryShape.strictRatio) {
-            while (isValidMaximisedShape(boundaryShape.clone().offsetHeight().offsetWidth())) {
-                boundaryShape.offsetHeight().offsetWidth()
-            }
+        // Grows the shape by the given number of units, or shrinks it when negative
+        val grow: (BoundaryShape, Int) -> BoundaryShape = when {
+            boundaryShape.strictRatio -> { shape, offset -> shape.offsetHeight(offset).offsetWidth(offset) }
+            boundaryShape.dynamicWidth -> { shape, offset -> shape.offsetWidth(offset) }
+            boundaryShape.dynamicHeight -> { shape, offset -> shape.offsetHeight(offset) }
+            else -> return
+        }
+        // Growth stays valid until the shape reaches the edge of the scene or another shape, so the number of steps can be
+        // estimated from the nearest of those and then corrected a step at a time on a single clone
+        val candidate = boundaryShape.clone()
+        var steps = if (boundaryShape.strictRatio) 0 else estimateGrowthSteps(boundaryShape)
+        repeat(steps) { grow(candidate, 1) }
+        while (steps > 0 && !isValidMaximisedShape(candidate)) {
+            grow(candidate, -1)
+            steps--
+        }
+        while (isValidMaximisedShape(grow(candidate, 1))) {
+            steps++
+        }
+        repeat(steps) { grow(boundaryShape, 1) }
+    }
+
+    // Whole units a shape can grow rightwards, or downwards when only its height is dynamic, before it leaves the scene or meets another shape
+    private fun estimateGrowthSteps(boundaryShape: BoundaryShape): Int {
+        val others = sceneShapes.filter { it !== boundaryShape }
+        val space = if (boundaryShape.dynamicWidth) {
+            val right = boundaryShape.x1 + boundaryShape.width
+            others.filter { sharesLane(it, boundaryShape, ScanDir.RIGHT) && it.x1 >= right }
+                .fold(sceneShape.x1 + sceneShape.width) { limit, shape -> minOf(limit, shape.x1) } - right
         } else {
-            if (boundaryShape.dynamicWidth) {
-                while (isValidMaximisedShape(boundaryShape.clone().offsetWidth())) {
-                    boundaryShape.offsetWidth()
-                }
-            } else if (boundaryShape.dynamicHeight) {
-                while (isValidMaximisedShape(boundaryShape.clone().offsetHeight())) {
-                    boundaryShape.offsetHeight()
-                }
-            }
+            others.filter { sharesLane(it, boundaryShape, ScanDir.DOWN) && it.y1 + it.height <= boundaryShape.y1 }
+                .fold(sceneShape.y1) { limit, shape -> maxOf(limit, shape.y1 + shape.height) }
+                .let { boundaryShape.y1 - it }
         }
+        return maxOf(floor(space).toInt(), 0)
     }
 
     private fun addOnSide(corner: Corner, boundaryShape: BoundaryShape, secondScan: Boolean): Boolean {
-        if (sceneShapes.any { it.overlapsShape(boundaryShape) }) {
-            return addOnSide(
-                corner,
-                moveShapeInDirection(corner.direction(secondScan), boundaryShape),
-                secondScan
-            )
-        } else if (!withinScene(boundaryShape)) {
+        val scanDir = corner.direction(secondScan)
+        // Scanning only moves the shape along one axis, so only shapes in its lane can ever be in the way
+        val lane = sceneShapes.filter { sharesLane(it, boundaryShape, scanDir) }
+        var obstacles = lane.filter { it.overlapsShape(boundaryShape) }
+        while (obstacles.isNotEmpty()) {
+            // Every position before the shape clears the nearest obstacle still overlaps it, so those are skipped
+            repeat(stepsToClear(obstacles, boundaryShape, scanDir)) { moveShapeInDirection(scanDir, boundaryShape) }
+            obstacles = lane.filter { it.overlapsShape(boundaryShape) }
+        }
+        return if (!withinScene(boundaryShape)) {
             if (secondScan) {
                 // Could not fit on anywhere on the scene
                 ErrorHandler.addTooManyDatastructuresError()
-                return false
+                false
+            } else {
+                addToScene(corner.next(), boundaryShape, true)
             }
-            return addToScene(corner.next(), boundaryShape, true)
         } else {
             sceneShapes.add(boundaryShape)
-            return true
+            true
+        }
+    }
+
+    private fun sharesLane(shape: BoundaryShape, boundaryShape: BoundaryShape, scanDir: ScanDir): Boolean {
+        return when (scanDir) {
+            ScanDir.LEFT, ScanDir.RIGHT ->
+                shape.y1 < boundaryShape.y1 + boundaryShape.height && boundaryShape.y1 < shape.y1 + shape.height
+            ScanDir.UP, ScanDir.DOWN ->
+                shape.x1 < boundaryShape.x1 + boundaryShape.width && boundaryShape.x1 < shape.x1 + shape.width
+        }
+    }
+
+    // Unit steps that can be taken without passing the first position clear of the obstacle nearest to being cleared,
+    // leaving a step to spare so that rounding never skips over it
+    private fun stepsToClear(obstacles: List<BoundaryShape>, boundaryShape: BoundaryShape, scanDir: ScanDir): Int {
+        val distance = obstacles.minOf {
+            when (scanDir) {
+                ScanDir.UP -> it.y1 + it.height - boundaryShape.y1
+                ScanDir.DOWN -> boundaryShape.y1 + boundaryShape.height - it.y1
+                ScanDir.LEFT -> boundaryShape.x1 + boundaryShape.width - it.x1
+                ScanDir.RIGHT -> it.x1 + it.width - boundaryShape.x1
+            }
         }
+        return maxOf(ceil(distance).toInt() - 1, 1)
     }
 
     private fun moveShapeInDirection(scanDir: ScanDir, boundaryShape: BoundaryShape): BoundaryShape {
@@ -0,0 +1,163 @@
+package com.valgolang.runtime.datastructures
+
+import com.google.gson.Gson
+import com.google.gson.JsonParseException
+import com.valgolang.ExitStatus
+import com.valgolang.stylesheet.PositionProperties
+import java.io.File
+import java.nio.file.Files
+import java.nio.file.StandardCopyOption
+import java.security.MessageDigest
+import java.util.*
+
+/**
+ * Layout computed by [Scene.compute], as stored by a [LayoutCache]
+ *
+ * @property positions: position of every shape, including the code and variable blocks, by uid
+ * @property maxSizes: max size of every shape by uid
+ * @constructor Create empty Cached layout
+ */
+data class CachedLayout(val positions: Map<String, PositionProperties>, val maxSizes: Map<String, Int>)
+
+/**
+ * Memo of layouts computed by [Scene.compute], keyed by a signature of everything the layout depends on: the uid,
+ * kind, dimensions and max size of each shape in order, and which of the code and variable blocks are shown.
+ *
+ * Editing code that does not create or resize data structures leaves the signature unchanged, so the layout is found
+ * rather than computed again. Layouts are kept in memory for the lifetime of the process, such as a daemon, and
+ * also on disk in [directory] if given, so that separate compiles share them.
+ *
+ * The cache also keeps the boundaries printed by the -b option by a hash of the program and stylesheet, so that
+ * asking again for the boundaries of an unchanged program skips running it altogether.
+ *
+ * @property directory: directory the layouts are stored in, if any
+ * @constructor Creates a new layout cache, creating [directory] if needed
+ */
+class LayoutCache(private val directory: File? = null) {
+
+    init {
+        directory?.mkdirs()
+    }
+
+    /**
+     * Finds the layout of [shapes], computing and storing it if it has not been seen before.
+     * Layouts that could not be computed are not stored, so that their errors are reported every time.
+     *
+     * @param shapes: all the shapes to calculate coordinates for
+     * @param fullScreen: whether the scene is fully available (no code or variable block)
+     * @param expandCodeBlock: whether or not to expand the code block (when the variable block is hidden)
+     * @return Pair of error and a map from shape ID to BoundaryShape
+     */
+    fun compute(
+        shapes: List<Pair<String, BoundaryShape>>,
+        fullScreen: Boolean,
+        expandCodeBlock: Boolean
+    ): Pair<ExitStatus, Map<String, BoundaryShape>> {
+        val key = hash(signature(shapes, fullScreen, expandCodeBlock))
+        val cached = memo[key] ?: readLayout(key)
+        if (cached != null) {
+            memo[key] = cached
+            return Pair(ExitStatus.EXIT_SUCCESS, restore(cached, shapes.toMap()))
+        }
+
+        val (exitStatus, computedBoundaries) = Scene().compute(shapes, fullScreen, expandCodeBlock)
+        if (exitStatus == ExitStatus.EXIT_SUCCESS) {
+            val layout = CachedLayout(
+                computedBoundaries.mapValues { it.value.positioning() },
+                computedBoundaries.mapValues { it.value.maxSize }
+            )
+            memo[key] = layout
+            writeEntry("$key.json", gson.toJson(layout))
+        }
+        return Pair(exitStatus, computedBoundaries)
+    }
+
+    /**
+     * Finds the boundaries last printed by the -b option for exactly this program and stylesheet
+     *
+     * @param program: source code of the program
+     * @param stylesheet: contents of the stylesheet, if any
+     * @return the printed boundaries, or null if they are not cached
+     */
+    fun findBoundaries(program: String, stylesheet: String?): String? {
+        val key = hash("boundaries\u0000$program\u0000${stylesheet ?: ""}")
+        return printedBoundaries[key] ?: readEntry("$key.boundaries")?.also { printedBoundaries[key] = it }
+    }
+
+    /**
+     * Stores the boundaries printed by the -b option for this program and stylesheet
+     *
+     * @param program: source code of the program
+     * @param stylesheet: contents of the stylesheet, if any
+     * @param boundaries: the printed boundaries
+     */
+    fun storeBoundaries(program: String, stylesheet: String?, boundaries: String) {
+        val key = hash("boundaries\u0000$program\u0000${stylesheet ?: ""}")
+        printedBoundaries[key] = boundaries
+        writeEntry("$key.boundaries", boundaries)
+    }
+
+    private fun signature(shapes: List<Pair<String, BoundaryShape>>, fullScreen: Boolean, expandCodeBlock: Boolean): String {
+        // Shapes are placed in order, so the order they were created in is part of the signature
+        val shapeSignatures = shapes.joinToString(";") { (uid, shape) ->
+            "$uid:${shape.javaClass.simpleName}:${shape.minDimensions}:${shape.width}:${shape.height}:${shape.maxSize}"
+        }
+        return "$shapeSignatures|$fullScreen|$expandCodeBlock"
+    }
+
+    // Shapes are rebuilt for every compile as the virtual machine may modify them
+    private fun restore(layout: CachedLayout, shapes: Map<String, BoundaryShape>): Map<String, BoundaryShape> {
+        return layout.positions.mapValues { (uid, position) ->
+            val shape = shapes[uid]?.clone() ?: TallBoundary(minDimensions = Pair(position.width, position.height))
+            shape.width = position.width
+            shape.height = position.height
+            shape.maxSize = layout.maxSizes.getValue(uid)
+            shape.setCoords(position.x, position.y)
+        }
+    }
+
+    private fun readLayout(key: String): CachedLayout? {
+        val json = readEntry("$key.json") ?: return null
+        return try {
+            gson.fromJson(json, CachedLayout::class.java)
+        } catch (e: JsonParseException) {
+            null
+        }
+    }
+
+    private fun readEntry(name: String): String? {
+        val entry = directory?.let { File(it, name) } ?: return null
+        return if (entry.isFile) entry.readText() else null
+    }
+
+    // Written to a temporary file first so that concurrent compiles never read a partially written entry
+    private fun writeEntry(name: String, contents: String) {
+        if (directory == null) {
+            return
+        }
+        val temporary = File.createTempFile(name, ".tmp", directory)
+        temporary.writeText(contents)
+        Files.move(temporary.toPath(), File(directory, name).toPath(), StandardCopyOption.REPLACE_EXISTING, StandardCopyOption.ATOMIC_MOVE)
+    }
+
+    companion object {
+        /** Bumped whenever the layout algorithm changes, invalidating everything cached before **/
+        private const val VERSION = "1"
+
+        /** Number of entries of each kind kept in memory **/
+        private const val MEMO_SIZE = 256
+
+        private val gson = Gson()
+        private val memo = boundedMemo<CachedLayout>()
+        private val printedBoundaries = boundedMemo<String>()
+
+        private fun <T> boundedMemo(): MutableMap<String, T> = Collections.synchronizedMap(
+            object : LinkedHashMap<String, T>(MEMO_SIZE, 0.75f, true) {
+                override fun removeEldestEntry(eldest: MutableMap.MutableEntry<String, T>): Boolean = size > MEMO_SIZE
+            }
+        )
+
+        private fun hash(text: String): String =
+            MessageDigest.getInstance("SHA-256").digest((VERSION + text).toByteArray()).joinToString("") { "%02x".format(it) }
+    }
+}
@@ -10,6 +10,7 @@ import com.valgolang.frontend.datastructures.array.ArrayType
 import com.valgolang.frontend.datastructures.array.InternalArrayMethodCallNode
 import com.valgolang.frontend.datastructures.list.ListType
 import com.valgolang.linearrepresentation.EmptyMObject
+import com.valgolang.linearrepresentation.InstructionBuffer
 import com.valgolang.linearrepresentation.ManimInstr
 import com.valgolang.linearrepresentation.VariableNameGenerator
 import com.valgolang.linearrepresentation.datastructures.array.*
@@ -41,7 +42,7 @@ import java.util.*
 
 class ArrayExecutor(
     override val variables: MutableMap<String, ExecValue>,
-    override val linearRepresentation: MutableList<ManimInstr>,
+    override val linearRepresentation: InstructionBuffer,
     override val frame: VirtualMachine.Frame,
     override val stylesheet: Stylesheet,
     override val animationSpeeds: ArrayDeque<Double>,
@@ -120,6 +121,7 @@ class ArrayExecutor(
                 )
                 linearRepresentation.add(arrayStructure)
                 arrayValue.manimObject = arrayStructure
+                linearRepresentation.trackArray(ident, arrayValue)
             }
         }
         return arrayValue
@@ -192,6 +194,7 @@ class ArrayExecutor(
             )
             linearRepresentation.add(arrayStructure)
             arrayValue.manimObject = arrayStructure
+            linearRepresentation.trackArray(ident, arrayValue)
         }
 
         return arrayValue
@@ -450,6 +453,7 @@ class ArrayExecutor(
                 )
                 linearRepresentation.add(arrayStructure)
                 arrayValue2.manimObject = arrayStructure
+                linearRepresentation.trackArray(ident, arrayValue2)
                 arrayValue2
             }
         }
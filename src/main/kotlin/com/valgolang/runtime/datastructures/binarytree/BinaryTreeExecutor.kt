@@ -4,6 +4,7 @@ import com.valgolang.frontend.ast.AssignLHS
 import com.valgolang.frontend.datastructures.ConstructorNode
 import com.valgolang.frontend.datastructures.binarytree.*
 import com.valgolang.linearrepresentation.EmptyMObject
+import com.valgolang.linearrepresentation.InstructionBuffer
 import com.valgolang.linearrepresentation.ManimInstr
 import com.valgolang.linearrepresentation.VariableNameGenerator
 import com.valgolang.linearrepresentation.datastructures.binarytree.*
@@ -32,7 +33,7 @@ import java.util.*
 
 class BinaryTreeExecutor(
     override val variables: MutableMap<String, ExecValue>,
-    override val linearRepresentation: MutableList<ManimInstr>,
+    override val linearRepresentation: InstructionBuffer,
     override val frame: VirtualMachine.Frame,
     override val stylesheet: Stylesheet,
     override val animationSpeeds: ArrayDeque<Double>,
@@ -239,6 +240,7 @@ class BinaryTreeExecutor(
                         childValue,
                         parent.binaryTreeValue!!,
                         isLeft,
+                        TreeLayout.compute(parent.binaryTreeValue!!.value),
                         runtime = animationSpeeds.first(),
                         render = stylesheet.renderDataStructure(frame.functionNamePrefix + binaryTreeElemNode.identifier)
                     )
@@ -359,6 +361,7 @@ class BinaryTreeExecutor(
                                 parent,
                                 parent.binaryTreeValue!!,
                                 true,
+                                TreeLayout.compute(parent.binaryTreeValue!!.value),
                                 runtime = animationSpeeds.first(),
                                 render = stylesheet.renderDataStructure(frame.functionNamePrefix + binaryTreeElemNode.identifier)
                             )
@@ -373,6 +376,7 @@ class BinaryTreeExecutor(
                                 parent,
                                 parent.binaryTreeValue!!,
                                 false,
+                                TreeLayout.compute(parent.binaryTreeValue!!.value),
                                 runtime = animationSpeeds.first(),
                                 render = stylesheet.renderDataStructure(frame.functionNamePrefix + binaryTreeElemNode.identifier)
                             )
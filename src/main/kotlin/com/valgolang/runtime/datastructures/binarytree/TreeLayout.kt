@@ -0,0 +1,130 @@
+package com.valgolang.runtime.datastructures.binarytree
+
+import java.util.*
+
+/**
+ * Position of a node in a [TreeLayout]
+ *
+ * @property ident: Python identifier of the node
+ * @property x: horizontal offset from the root, in units of the minimum distance between two nodes
+ * @property depth: number of edges from the root
+ * @constructor Creates a new tree node position
+ */
+data class TreeNodePosition(val ident: String, val x: Double, val depth: Int)
+
+/**
+ * Tidy layout of a binary tree, following Reingold and Tilford: every subtree is laid out on its own, then the two
+ * subtrees of a node are pushed apart just enough that they are at least a unit apart at every depth they share,
+ * and their parent is centred above them. A lone child is put half a unit to its side, so left and right are told apart.
+ *
+ * The left and right contours of each subtree are kept as the offset of each depth from the one above, deepest first,
+ * so that a subtree is moved by changing a single offset and a parent only walks the contours of its subtrees down to
+ * the depth of the shallower one. Laying out the whole tree therefore takes time linear in its size.
+ */
+object TreeLayout {
+    private const val SEPARATION = 1.0
+
+    private class Contour(val left: MutableList<Double>, val right: MutableList<Double>) {
+        val height: Int get() = left.size
+    }
+
+    /**
+     * Lays out the tree below [root]
+     *
+     * @param root
+     * @return position of every node, parents before children
+     */
+    fun compute(root: BinaryTreeNodeValue): List<TreeNodePosition> {
+        // Nodes are data classes whose equality would compare whole subtrees, so offsets are found by identity
+        val offsets = IdentityHashMap<BinaryTreeNodeValue, Double>()
+        layout(root, offsets)
+        val positions = mutableListOf<TreeNodePosition>()
+        place(root, 0.0, 0, offsets, positions)
+        return positions
+    }
+
+    private fun layout(node: BinaryTreeNodeValue, offsets: MutableMap<BinaryTreeNodeValue, Double>): Contour {
+        val left = node.left as? BinaryTreeNodeValue
+        val right = node.right as? BinaryTreeNodeValue
+        val contour = when {
+            left != null && right != null -> {
+                val leftContour = layout(left, offsets)
+                val rightContour = layout(right, offsets)
+                val half = separation(leftContour, rightContour) / 2
+                offsets[left] = -half
+                offsets[right] = half
+                Contour(
+                    if (leftContour.height >= rightContour.height) {
+                        shift(leftContour.left, -half)
+                    } else {
+                        splice(leftContour.left, rightContour.left, -half, half)
+                    },
+                    if (rightContour.height >= leftContour.height) {
+                        shift(rightContour.right, half)
+                    } else {
+                        splice(rightContour.right, leftContour.right, half, -half)
+                    }
+                )
+            }
+            left != null || right != null -> {
+                val child = (left ?: right)!!
+                val offset = if (left != null) -SEPARATION / 2 else SEPARATION / 2
+                val childContour = layout(child, offsets)
+                offsets[child] = offset
+                Contour(shift(childContour.left, offset), shift(childContour.right, offset))
+            }
+            else -> Contour(mutableListOf(), mutableListOf())
+        }
+        contour.left.add(0.0)
+        contour.right.add(0.0)
+        return contour
+    }
+
+    // Distance needed between the roots of two subtrees for them to be a unit apart at every depth they share
+    private fun separation(left: Contour, right: Contour): Double {
+        var leftEdge = 0.0
+        var rightEdge = 0.0
+        var distance = SEPARATION
+        for (depth in 0 until minOf(left.height, right.height)) {
+            leftEdge += left.right[left.height - 1 - depth]
+            rightEdge += right.left[right.height - 1 - depth]
+            distance = maxOf(distance, leftEdge - rightEdge + SEPARATION)
+        }
+        return distance
+    }
+
+    private fun shift(contour: MutableList<Double>, offset: Double): MutableList<Double> {
+        contour[contour.lastIndex] = offset
+        return contour
+    }
+
+    // Contour following the shallow contour down to its depth and the deep contour below it, reusing the deep one
+    private fun splice(shallow: MutableList<Double>, deep: MutableList<Double>, shallowOffset: Double, deepOffset: Double): MutableList<Double> {
+        val height = shallow.size
+        var shallowEnd = shallowOffset
+        var deepEnd = deepOffset
+        for (depth in 0 until height) {
+            shallowEnd += shallow[height - 1 - depth]
+            deepEnd += deep[deep.size - 1 - depth]
+        }
+        deepEnd += deep[deep.size - 1 - height]
+        deep[deep.size - 1 - height] = deepEnd - shallowEnd
+        for (depth in 0 until height) {
+            deep[deep.size - 1 - depth] = shallow[height - 1 - depth]
+        }
+        return shift(deep, shallowOffset)
+    }
+
+    private fun place(
+        node: BinaryTreeNodeValue,
+        x: Double,
+        depth: Int,
+        offsets: Map<BinaryTreeNodeValue, Double>,
+        positions: MutableList<TreeNodePosition>
+    ) {
+        positions.add(TreeNodePosition(node.manimObject.ident, x, depth))
+        listOf(node.left, node.right).filterIsInstance<BinaryTreeNodeValue>().forEach {
+            place(it, x + offsets.getValue(it), depth + 1, offsets, positions)
+        }
+    }
+}
@@ -34,7 +34,7 @@ import java.util.*
 
 class StackExecutor(
     override val variables: MutableMap<String, ExecValue>,
-    override val linearRepresentation: MutableList<ManimInstr>,
+    override val linearRepresentation: InstructionBuffer,
     override val frame: VirtualMachine.Frame,
     override val stylesheet: Stylesheet,
     override val animationSpeeds: ArrayDeque<Double>,
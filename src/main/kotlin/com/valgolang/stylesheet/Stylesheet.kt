@@ -2,14 +2,9 @@ package com.valgolang.stylesheet
 
 import com.google.gson.Gson
 import com.google.gson.JsonSyntaxException
-import com.google.gson.reflect.TypeToken
 import com.valgolang.frontend.SymbolTableVisitor
 import com.valgolang.runtime.ExecValue
 import java.io.File
-import java.lang.reflect.Type
-import kotlin.reflect.full.declaredMemberProperties
-import kotlin.reflect.full.primaryConstructor
-import kotlin.system.exitProcess
 
 /**
  * Abstract stylesheet property
@@ -156,6 +151,10 @@ data class PositionProperties(
  * @property syntaxHighlightingStyle: which Pygments style should be applied to the code in the code block
  * @property displayNewLinesInCode: whether new lines \n should be displayed in the code block
  * @property tabSpacing: how many tabs should be used to indent code in the code block
+ * @property scrollThreshold: number of lines beyond which the code block cross-fades to the new window instead of scrolling
+ * @property mergeAnimations: whether consecutive animations of disjoint mobjects should be played at the same time
+ * @property fastForwardLoopsAfter: number of iterations of a loop to animate before jumping to the state after it, if any. Loops pushing to or popping stacks, changing trees or growing arrays are animated in full
+ * @property maxDisplayedVariables: number of variables shown in the variable block at once, beyond which the least recently updated is replaced
  * @property subtitles: style properties for subtitles
  * @property variables: style properties for variables in program
  * @property dataStructures: style properties for data structures in program
@@ -170,29 +169,58 @@ data class StylesheetFromJSON(
     var syntaxHighlightingStyle: String = "inkpot",
     val displayNewLinesInCode: Boolean = true,
     val tabSpacing: Int = 2,
+    val scrollThreshold: Int = 5,
+    val mergeAnimations: Boolean = false,
+    val fastForwardLoopsAfter: Int? = null,
+    val maxDisplayedVariables: Int = 4,
     val subtitles: StyleProperties = StyleProperties(),
     val variables: Map<String, StyleProperties> = emptyMap(),
     val dataStructures: Map<String, StyleProperties> = emptyMap(),
     val positions: Map<String, PositionProperties> = emptyMap()
 )
 
+/**
+ * Thrown when a stylesheet file cannot be read
+ *
+ * @param message: reason the stylesheet is invalid
+ * @constructor Create empty Invalid stylesheet exception
+ */
+class InvalidStylesheetException(message: String) : Exception(message)
+
 class Stylesheet(private val stylesheetPath: String?, private val symbolTableVisitor: SymbolTableVisitor) {
     private val stylesheet: StylesheetFromJSON
 
+    /**
+     * Style and animated style resolved once for a variable or data structure
+     *
+     * @property style
+     * @property animatedStyle
+     */
+    private class ResolvedStyle(val style: StyleProperties, val animatedStyle: AnimationProperties)
+
+    /** Styles of each variable with a style of its own, by identifier and data structure type styled in the stylesheet if any **/
+    private val variableStyles: Map<Pair<String, String?>, ResolvedStyle>
+
+    /** Styles of values of each data structure type styled in the stylesheet, by type **/
+    private val dataStructureStyles: Map<String, ResolvedStyle>
+
+    /** Style of values of data structure types not styled in the stylesheet **/
+    private val defaultStyle: ResolvedStyle
+
     /**
      * Uses Gson to read JSON file into a StylesheetFromJSON
      */
     init {
         stylesheet = if (stylesheetPath != null) {
             val gson = Gson()
-            val type: Type = object : TypeToken<StylesheetFromJSON>() {}.type
             try {
-                val parsedStylesheet: StylesheetFromJSON = gson.fromJson(File(stylesheetPath).readText(), type)
+                // Parsed by class rather than through a TypeToken subclass, so the native image only needs the
+                // stylesheet classes themselves registered for reflection
+                val parsedStylesheet: StylesheetFromJSON = gson.fromJson(File(stylesheetPath).readText(), StylesheetFromJSON::class.java)
                 StylesheetValidator.validateStyleSheet(parsedStylesheet, symbolTableVisitor)
                 parsedStylesheet
             } catch (e: JsonSyntaxException) {
-                print("Invalid JSON stylesheet: ")
-                if (e.message.let {
+                val reason = if (e.message.let {
                     it != null && (
                         it.startsWith("duplicate key") || it.startsWith("Missing field") || it.startsWith(
                                 "Cannot"
@@ -200,59 +228,66 @@ class Stylesheet(private val stylesheetPath: String?, private val symbolTableVis
                         )
                 }
                 ) {
-                    println(e.message)
+                    e.message
                 } else {
-                    println("Could not parse JSON")
+                    "Could not parse JSON"
                 }
-                exitProcess(1)
+                throw InvalidStylesheetException("Invalid JSON stylesheet: $reason")
             }
         } else {
             StylesheetFromJSON()
         }
+
+        // Every style a lookup can return is resolved up front, so executors only look them up
+        val dataStructureTypes = stylesheet.dataStructures.keys + listOf<String?>(null)
+        variableStyles = stylesheet.variables.flatMap { (identifier, style) ->
+            dataStructureTypes.map { type -> Pair(Pair(identifier, type), resolve(style, type?.let { stylesheet.dataStructures[it] })) }
+        }.toMap()
+        dataStructureStyles = stylesheet.dataStructures.mapValues { resolve(null, it.value) }
+        defaultStyle = resolve(null, null)
+    }
+
+    private fun resolve(variableStyle: StyleProperties?, dataStructureStyle: StyleProperties?): ResolvedStyle {
+        val staticDataStructureStyle = dataStructureStyle ?: StyleProperties()
+        val style = (variableStyle ?: staticDataStructureStyle) merge staticDataStructureStyle merge DefaultStyleProperties()
+
+        val animatedDataStructureStyle = staticDataStructureStyle merge StyleProperties(
+            borderColor = "BLUE",
+            textColor = "WHITE",
+            animate = AnimationProperties(),
+        )
+        val animatedVariableStyle = variableStyle ?: animatedDataStructureStyle
+        val animatedStyle = (animatedVariableStyle.animate ?: AnimationProperties()) merge
+            (animatedDataStructureStyle.animate ?: AnimationProperties()) merge
+            DefaultAnimationProperties()
+
+        return ResolvedStyle(style, animatedStyle)
+    }
+
+    private fun resolvedStyle(identifier: String, value: ExecValue): ResolvedStyle {
+        val type = value.name.takeIf { it in stylesheet.dataStructures }
+        return variableStyles[Pair(identifier, type)] ?: type?.let { dataStructureStyles[it] } ?: defaultStyle
     }
 
     /**
-     * Get style, falling back on default style properties where necessary
+     * Get style, falling back on default style properties where necessary.
+     * Styles are resolved when the stylesheet is loaded and shared between lookups, so must not be modified.
      *
      * @param identifier
      * @param value
      * @return style properties for [identifier]
      */
-    fun getStyle(identifier: String, value: ExecValue): StyleProperties {
-
-        val dataStructureStyle =
-            stylesheet.dataStructures.getOrDefault(value.name, StyleProperties())
-        val style = stylesheet.variables.getOrDefault(identifier, dataStructureStyle)
-
-        val styleProperties = style merge dataStructureStyle
-        return styleProperties merge DefaultStyleProperties()
-    }
+    fun getStyle(identifier: String, value: ExecValue): StyleProperties = resolvedStyle(identifier, value).style
 
     /**
-     * Get animated style, falling back on default animation properties where necessary
+     * Get animated style, falling back on default animation properties where necessary.
+     * Styles are resolved when the stylesheet is loaded and shared between lookups, so must not be modified.
      *
      * @param identifier
      * @param value
      * @return animation properties for [identifier]
      */
-    fun getAnimatedStyle(identifier: String, value: ExecValue): AnimationProperties {
-        val dataStructureStyle =
-            stylesheet.dataStructures.getOrDefault(value.name, StyleProperties()) merge StyleProperties(
-                borderColor = "BLUE",
-                textColor = "WHITE",
-                animate = AnimationProperties(),
-            )
-        val style = stylesheet.variables.getOrDefault(identifier, dataStructureStyle)
-        val animationStyle = (
-            style.animate
-                ?: AnimationProperties()
-            ) merge (
-            dataStructureStyle.animate
-                ?: AnimationProperties()
-            )
-
-        return (animationStyle merge DefaultAnimationProperties())
-    }
+    fun getAnimatedStyle(identifier: String, value: ExecValue): AnimationProperties = resolvedStyle(identifier, value).animatedStyle
 
     /** Methods for accessing style attributes **/
 
@@ -278,26 +313,46 @@ class Stylesheet(private val stylesheetPath: String?, private val symbolTableVis
 
     fun getTabSpacing(): Int = stylesheet.tabSpacing
 
+    fun getScrollThreshold(): Int = stylesheet.scrollThreshold
+
+    fun getMergeAnimations(): Boolean = stylesheet.mergeAnimations
+
+    fun getFastForwardLoopsAfter(): Int? = stylesheet.fastForwardLoopsAfter
+
+    fun getMaxDisplayedVariables(): Int = stylesheet.maxDisplayedVariables
+
     fun renderDataStructure(identifier: String) =
         !stylesheet.positions.containsKey(identifier) || stylesheet.positions[identifier]!!.height != 0.0 || stylesheet.positions[identifier]!!.width != 0.0
 }
 
 /**
- * Infix function that merges two instances of a generic class [T]
+ * Merges two sets of style properties
  *
  * @param other
  * @return merged form of [this] and [other], where the properties of [this] take precedence over [other]
+ */
+infix fun StyleProperties.merge(other: StyleProperties): StyleProperties = StyleProperties(
+    borderColor = borderColor ?: other.borderColor,
+    textColor = textColor ?: other.textColor,
+    showLabel = showLabel ?: other.showLabel,
+    creationStyle = creationStyle ?: other.creationStyle,
+    creationTime = creationTime ?: other.creationTime,
+    animate = animate ?: other.animate,
+    duration = duration ?: other.duration
+)
+
+/**
+ * Merges two sets of animation properties
  *
- * Credit to https://stackoverflow.com/questions/44566607/combining-merging-data-classes-in-kotlin/44570679#44570679
+ * @param other
+ * @return merged form of [this] and [other], where the properties of [this] take precedence over [other]
  */
-inline infix fun <reified T : Any> T.merge(other: T): T {
-    val propertiesByName = T::class.declaredMemberProperties.associateBy { it.name }
-    val primaryConstructor = T::class.primaryConstructor ?: T::class.constructors.toList().find { function -> function.parameters.isEmpty() }
-        ?: throw IllegalArgumentException("merge type must have a primary constructor")
-    val args = primaryConstructor.parameters.associateWith { parameter ->
-        val property = propertiesByName[parameter.name]
-            ?: throw IllegalStateException("no declared member property found with name '${parameter.name}'")
-        (property.get(this) ?: property.get(other))
-    }
-    return primaryConstructor.callBy(args)
-}
+infix fun AnimationProperties.merge(other: AnimationProperties): AnimationProperties = AnimationProperties(
+    borderColor = borderColor ?: other.borderColor,
+    textColor = textColor ?: other.textColor,
+    pointer = pointer ?: other.pointer,
+    highlight = highlight ?: other.highlight,
+    animationStyle = animationStyle ?: other.animationStyle,
+    animationTime = animationTime ?: other.animationTime,
+    render = render ?: other.render
+)
@@ -23,7 +23,7 @@ class Array:
         if ((square_dim * len(values)) + title_width) < self.boundary_width:
             offset = (self.boundary_width - ((square_dim * len(values)) + title_width)) / 2
 
-        self.title = VGroup(Text(title).set_width(title_width))
+        self.title = VGroup(cached_text(title).set_width(title_width))
         if title_width != 0 and self.title.get_height() > 0.5 * self.boundary_height:
             self.title.scale(0.5 * self.boundary_height / self.title.get_height())
 
@@ -79,6 +79,15 @@ class Array:
         self.values[idx] = v
         return self.array_elements[idx].replace_text(v, color=color)
 
+    # Jumps to the given values, undoing the colours of any restyling skipped along the way
+    def set_values(self, values):
+        self.values = values
+        return [animation for elem, v in zip(self.array_elements, values)
+                for animation in [elem.replace_text(v), FadeToColor(elem.shape, self.color)]]
+
+    def pointers(self):
+        return [elem.pointer for elem in self.array_elements]
+
     def update_array_elements(self):
         width_per_element = (self.boundary_width - self.title_width - self.padding) / len(self.values)
         square_dim = min((self.boundary_height - self.padding), width_per_element)
@@ -123,13 +132,18 @@ class Array2D:
                               (new_ll[0] + sub_array_width, new_ll[1])]
             self.rows.append(Array(values[len(values) - 1 - i], "", new_boundaries, color=color, text_color=text_color,
                                    padding=False).build())
-        self.title = VGroup(Text(title).set_width(title_width))
+        self.title = VGroup(cached_text(title).set_width(title_width))
         if title_width != 0 and self.title.get_height() > (boundary_height - square_dim * len(values)) / 2:
             self.title.scale((boundary_height - square_dim * len(values)) / 2 / self.title.get_height())
         self.title.move_to(
             np.array([boundaries[0][0] + (boundary_width / 2), (boundaries[0][1] - 0.5), 0]))
         self.color = color
         self.text_color = text_color
+        # Area covered by the elements, dimmed as a whole while swapping so that the cost does not grow with the table
+        elements = VGroup(*[element.all for row in self.rows for element in row.array_elements])
+        self.table_width = elements.get_width()
+        self.table_height = elements.get_height()
+        self.table_center = elements.get_center()
 
     def build(self, creation_style=None):
         if not creation_style:
@@ -140,32 +154,45 @@ class Array2D:
             animations += [creation_transform(array_elem.all) for array_elem in self.rows[i].array_elements]
         return animations
 
+    # The whole row is transformed as one group, rather than with an animation for each element
     def replace_row(self, row_index, new_values):
-        return [self.rows[row_index].array_elements[i].replace_text(str(v)) for i, v in enumerate(new_values)]
+        elements = self.rows[row_index].array_elements
+        old_texts = VGroup(*[element.text for element in elements])
+        new_texts = VGroup(*[element.fitted_text(str(v)) for element, v in zip(elements, new_values)])
+        return [Transform(old_texts, new_texts)]
 
-    def swap_mobjects(self, i1, j1, i2, j2):
-        # Animations for fading to grey and fading back to original color
-        fade_to_grey_animations = []
-        fade_to_original_animations = []
-        for i in range(len(self.rows)):
-            for j in range(len(self.rows[0].array_elements)):
-                if (i != i1 or j != j1) and (i != i2 or j != j2):
-                    fade_to_grey_animations.append(FadeToColor(self.rows[i].array_elements[j].text, GREY))
-                    fade_to_original_animations.append(
-                        FadeToColor(self.rows[i].array_elements[j].text, self.text_color))
-
-        # Swapping elements
-        o1 = self.rows[i1].array_elements[j1].text
-        o2 = self.rows[i2].array_elements[j2].text
-        o1_copy = deepcopy(o1)
-        o2_copy = deepcopy(o2)
-        o1_copy.move_to(o2.get_center())
-        o2_copy.move_to(o1.get_center())
-        self.rows[i1].array_elements[j1].text = o2
-        self.rows[i2].array_elements[j2].text = o1
-        swap_animations = [CounterclockwiseTransform(o1, o1_copy), CounterclockwiseTransform(o2, o2_copy)]
+    def set_values(self, values):
+        self.values = values
+        return [animation for row, row_values in zip(self.rows, values) for animation in row.set_values(row_values)]
+
+    def pointers(self):
+        return [pointer for row in self.rows for pointer in row.pointers()]
 
-        return [fade_to_grey_animations, swap_animations, fade_to_original_animations]
+    # Every other element is dimmed by a single overlay over the table, so the cost does not grow with the table. The
+    # swapped texts are replaced by copies added to the scene after the overlay, keeping them on top of it while they
+    # move. The animations are generated one group at a time, as the copies only join their elements once added.
+    def swap_mobjects(self, i1, j1, i2, j2):
+        e1 = self.rows[i1].array_elements[j1]
+        e2 = self.rows[i2].array_elements[j2]
+        if e1 is e2:
+            return
+        overlay = Rectangle(width=self.table_width, height=self.table_height, stroke_width=0, fill_color=BLACK,
+                            fill_opacity=0.6).move_to(self.table_center)
+        o1 = e1.text.copy()
+        o2 = e2.text.copy()
+        yield [FadeIn(overlay), FadeOut(e1.text), FadeOut(e2.text), Animation(o1), Animation(o2)]
+
+        e1.all.remove(e1.text)
+        e2.all.remove(e2.text)
+        e1.all.add(o2)
+        e2.all.add(o1)
+        e1.text = o2
+        e2.text = o1
+        o1_copy = o1.copy().move_to(o2.get_center())
+        o2_copy = o2.copy().move_to(o1.get_center())
+        yield [CounterclockwiseTransform(o1, o1_copy), CounterclockwiseTransform(o2, o2_copy)]
+
+        yield [FadeOut(overlay)]
 
     def clean_up(self):
         animations = [FadeOut(self.title)]
@@ -3,7 +3,7 @@ class Node:
                  font="Times New Roman", radius=0.6):
         self.circle = Circle(radius=radius, color=color)
         self.radius = radius
-        self.text = Text(text, color=text_color)
+        self.text = cached_text(text, color=text_color)
         self.text_value = text
         self.left = None
         self.right = None
@@ -90,7 +90,7 @@ class Node:
         return animation
 
     def edit_node_value(self, text):
-        new_text_obj = Text(text, color=self.text_color, width=0.6 * self.circle.get_width())
+        new_text_obj = cached_text(text, color=self.text_color, width=0.6 * self.circle.get_width())
         animation = [Transform(self.text, new_text_obj.move_to(self.circle_text.get_center()))]
         return animation
 
@@ -139,16 +139,20 @@ class Tree(DataStructure, ABC):
                          text_weight, font)
         self.identifier = identifier
         self.radius = radius
+        self.base_radius = radius
         self.max_radius = radius * 1.3
         self.text_padding = 0.3
+        self.column_width = 1.5
+        self.level_height = 2
         self.scale = 1
         self.root = root
+        self.name = None
         self.all.add(self.root.all)
 
     def create_init(self, n):
-        name = Text(self.identifier)
-        name.next_to(self.root.circle_text, UP, self.text_padding)
-        self.all.add(name)
+        self.name = cached_text(self.identifier)
+        self.name.next_to(self.root.circle_text, UP, self.text_padding)
+        self.all.add(self.name)
         return ApplyMethod(self.all.move_to, self.aligned_edge)
 
     def update_root(self, node):
@@ -158,212 +162,85 @@ class Tree(DataStructure, ABC):
         self.root = node
         return animations
 
-    # Checks whether adding child will cross boundary
-    def check_if_child_will_cross_boundary(self, parent, child, is_left):
-        child.set_radius(self.radius)
-        x, y, _ = parent.circle_text.get_center()
-        y_child = y - (2 * self.scale)
-        x_child = x - 1.5 if is_left else x + 1.5
-
-        x_prev, y_prev = x_child, y_child
-        curr = child.right
-        right_most_x, right_most_y = x_child, y_child
-        while curr is not None:
-            curr.set_radius(self.radius)
-            right_most_y = y_prev - (2 * self.scale)
-            right_most_x = x_prev + 1.5
-            x_prev, y_prev = right_most_x, right_most_y
-            curr = curr.right
-
-        x_prev, y_prev = x_child, y_child
-        curr = child.left
-        left_most_x, left_most_y = x_child, y_child
-        while curr is not None:
-            curr.set_radius(self.radius)
-            left_most_x = x_prev - 1.5
-            left_most_y = y_prev - (2 * self.scale)
-            x_prev, y_prev = left_most_x, left_most_y
-            curr = curr.left
-
-        animations = []
-
-        is_within_left_or_right_boundary = left_most_x > self.ll[0] and right_most_x < self.lr[0] \
-            and right_most_y > self.ll[1] and left_most_y > self.ll[1]
-
-        if (not is_within_left_or_right_boundary) and (
-                self.will_cross_boundary(abs(x - left_most_x), "LEFT") or self.will_cross_boundary(
-                abs(x - right_most_x), "RIGHT")
-                or self.will_cross_boundary(y - min(right_most_y, left_most_y), "BOTTOM")):
-            group_left_x = self.all.get_left()[0]
-            group_right_x = self.all.get_right()[0]
-            group_top_y = self.all.get_top()[1]
-            group_bottom_y = self.all.get_bottom()[1]
-            width = group_right_x - group_left_x
-            height = group_top_y - group_bottom_y
-            if right_most_x > group_right_x:
-                width += abs((right_most_x - group_right_x))
-            if left_most_x < group_left_x:
-                width += abs(group_left_x - left_most_x)
-            if min(left_most_y, right_most_y) < group_bottom_y:
-                height += abs(min(left_most_y, right_most_y))
-            scale_animation, scale_factor = self.shrink2(width + MED_SMALL_BUFF, height + MED_SMALL_BUFF)
-
-            self.scale = scale_factor
-            self.radius = self.radius * scale_factor
-            if scale_animation:
-                animations.extend(scale_animation)
-                corner_coord = self.ur[0] - (scale_factor * self.all.get_width()) / 2 if is_left else self.ul[0] + (
-                        scale_factor * self.all.get_width()) / 2
-                animations.append(ApplyMethod(self.all.move_to,
-                                              np.array([corner_coord, self.ul[1] - (self.all.get_height() / 2), 0])))
-        return animations
+    # Moves every node to its position in the tidy layout computed at compile time, which maps each node to its
+    # column and depth, scaled to fit the boundary. The whole tree moves in a single animation, with the positions
+    # worked out from the layout alone rather than from the bounding boxes of the mobjects.
+    def apply_layout(self, layout):
+        columns = [column for column, _ in layout.values()]
+        left_column, right_column = min(columns), max(columns)
+        deepest = max(depth for _, depth in layout.values())
+        name_height = self.name.get_height() + self.text_padding if self.name is not None else 0
+        diameter = 2 * self.base_radius
+        scale = min((self.lr[0] - self.ll[0]) / ((right_column - left_column) * self.column_width + diameter),
+                    (self.ul[1] - self.ll[1] - name_height) / (deepest * self.level_height + diameter),
+                    self.max_radius / self.base_radius)
+        radius = self.base_radius * scale
+        root_x = (self.ll[0] + self.lr[0]) / 2 - (left_column + right_column) / 2 * self.column_width * scale
+        root_y = self.ul[1] - name_height - radius
+
+        def centre(node):
+            column, depth = layout[node]
+            return np.array([root_x + column * self.column_width * scale, root_y - depth * self.level_height * scale, 0])
+
+        family = self.all.get_family()
+        index = {id(mobject): i for i, mobject in enumerate(family)}
+        self.all.generate_target()
+        targets = self.all.target.get_family()
+
+        def target(mobject):
+            return targets[index[id(mobject)]]
+
+        for node in layout:
+            circle_text = target(node.circle_text)
+            circle_text.scale(radius / (node.circle.get_width() / 2))
+            circle_text.move_to(centre(node))
+            node.radius = radius
+        for node in layout:
+            if node.lline is not None and node.left in layout:
+                target(node.lline).put_start_and_end_on(centre(node) + radius * np.array([-np.sqrt(0.5), -np.sqrt(0.5), 0]),
+                                                        centre(node.left) + radius * UP)
+            if node.rline is not None and node.right in layout:
+                target(node.rline).put_start_and_end_on(centre(node) + radius * np.array([np.sqrt(0.5), -np.sqrt(0.5), 0]),
+                                                        centre(node.right) + radius * UP)
+        if self.name is not None:
+            target(self.name).move_to(centre(self.root) + (radius + self.text_padding + self.name.get_height() / 2) * UP)
+
+        self.scale = scale
+        self.radius = radius
+        return [MoveToTarget(self.all)]
 
     # Assumes parent is in the tree
-    def set_right(self, parent, child):
+    def set_right(self, parent, child, layout):
         child.set_radius(self.radius)
         animations = parent.set_right(child, self.scale)
-        return self._resize_after_modification(animations)
+        return self.apply_layout(layout) + animations
 
     # Assumes parent is in the tree
-    def set_left(self, parent, child):
+    def set_left(self, parent, child, layout):
         child.set_radius(self.radius)
         animations = parent.set_left(child, self.scale)
-        return self._resize_after_modification(animations)
+        return self.apply_layout(layout) + animations
 
     # Assumes parent is in the tree
-    def delete_left(self, parent):
+    def delete_left(self, parent, layout):
         animations = parent.delete_left()
-        return self._resize_after_modification(animations)
+        return animations + self.apply_layout(layout)
 
     # Assumes parent is in the tree
-    def delete_right(self, parent):
+    def delete_right(self, parent, layout):
         animations = parent.delete_right()
-        return self._resize_after_modification(animations)
+        return animations + self.apply_layout(layout)
 
     def edit_node_value(self, node, text):
         return node.edit_node_value(text)
 
-    def set_reference_right(self, parent, tree):
+    def set_reference_right(self, parent, tree, layout):
         animations = parent.set_reference(tree, self.scale, left=False)
-        return self._resize_after_modification(animations)
+        return animations + self.apply_layout(layout)
 
-    def set_reference_left(self, parent, tree):
+    def set_reference_left(self, parent, tree, layout):
         animations = parent.set_reference(tree, self.scale, left=True)
-        return self._resize_after_modification(animations)
-
-    def _resize_after_modification(self, animations):
-        scale_animations, scale_factor = self.check_positioning()
-        animations.extend(scale_animations)
-
-        if scale_factor != self.scale:
-            target_radius = self.radius * (scale_factor if scale_factor else 1)
-            self.scale = (scale_factor if scale_factor else 1)
-            self.radius = target_radius
-        return animations
-
-    # Assumes node is in the tree
-    def check_positioning(self):
-        animations = []
-        overlapping_children, scale = self.check_overlapping_children(self.root)
-
-        if len(overlapping_children) > 0:
-            animations.extend(overlapping_children)
-        else:
-            shrink, scale_factor = self.shrink_if_cross_boundary()
-            if not shrink:
-                grow, scale = self.grow_if_small()
-                if grow:
-                    animations.extend(grow)
-
-        return animations, scale
-
-    # Assumes node is in the tree
-    def crossing_bottom_border(self):
-        curr_top = self.all.get_top()[1]
-        bottom_bound = self.ll[1]
-        curr_bottom = self.all.get_bottom()[1]
-        target_height = curr_top - bottom_bound
-        overflow_height = curr_top - curr_bottom
-        scale = target_height / overflow_height
-        return scale
-
-    # Assumes node is in the tree
-    def crossing_left_right_border(self, offset_x, scale=10e9):
-        target_width = abs(self.lr[0] - self.ll[0])
-        overflow_width = self.all.get_width() + 2 * offset_x
-        scale = min(scale, target_width / overflow_width)
-        return scale
-
-    def grow_if_small(self):
-        target_width = abs(self.lr[0] - self.ll[0])
-        target_height = abs(self.lr[1] - self.ul[1])
-        curr_width = self.all.get_width()
-        curr_height = self.all.get_height() + self.text_padding + 0.1
-        scale = min(target_width / curr_width, target_height / curr_height)
-        if scale >= 1:
-            # check radius size
-            target_radius = self.radius * scale
-            if target_radius > self.max_radius:
-                scale *= self.max_radius / target_radius
-
-            return [ScaleInPlace(self.all, scale), ApplyMethod(self.all.move_to, np.array(
-                [(self.ul[0] + self.ur[0]) / 2, (self.ll[1] + self.ur[1]) / 2, 0]))], scale
-        else:
-            return 0, self.scale
-
-    def shrink_if_cross_boundary(self, offset_x=0):
-        # Check if crossing bottom
-        if self.all.get_bottom()[1] < self.ll[1]:
-            scale = self.crossing_bottom_border()
-        else:
-            scale = 10e9
-
-        # Check if crossing left and right borders
-        if self.all.get_left()[0] - offset_x < self.ll[0] or self.all.get_right()[0] + offset_x > self.lr[0]:
-            scale = self.crossing_left_right_border(offset_x, scale=scale)
-
-        if scale == 10e9:
-            return 0, self.scale
-        else:
-            return [ScaleInPlace(self.all, scale), ApplyMethod(self.all.move_to, self.aligned_edge)], scale
-
-    def check_overlapping_children(self, node):
-        if node is None:
-            return [], self.scale
-
-        if node.left is not None and node.right is not None:
-            overlap_x = node.left.all.get_right()[0] - node.right.all.get_left()[0] + self.margin[0] * 2
-            if overlap_x > 0:
-                offset_x = overlap_x / 2
-                left_offset = LEFT * offset_x
-                right_offset = RIGHT * offset_x
-                new_rline = Line(node.circle.point_at_angle(np.deg2rad(315)),
-                                 np.add(node.right.circle.point_at_angle(np.deg2rad(90)), right_offset),
-                                 color=node.line_color)
-                new_lline = Line(node.circle.point_at_angle(np.deg2rad(225)),
-                                 np.add(node.left.circle.point_at_angle(np.deg2rad(90)), left_offset),
-                                 color=node.line_color)
-
-                animations = [
-                    ApplyMethod(node.left.all.move_to, np.add(node.left.all.get_center(), left_offset)),
-                    Transform(node.lline, new_lline),
-                    ApplyMethod(node.right.all.move_to, np.add(node.right.all.get_center(), right_offset)),
-                    Transform(node.rline, new_rline),
-                ]
-
-                shrink, scale = self.shrink_if_cross_boundary(offset_x)
-                if shrink:
-                    animations.extend(shrink)
-
-                return animations, scale
-            else:
-                return [], self.scale
-
-        animations, left_scale = self.check_overlapping_children(node.left)
-        right_animations, right_scale = self.check_overlapping_children(node.right)
-        animations.extend(right_animations)
-
-        return animations, min(left_scale, right_scale)
+        return animations + self.apply_layout(layout)
 
     def clean_up(self):
         return [FadeOut(self.all)]
@@ -1,6 +1,6 @@
 class CodeBlock:
     def __init__(self, code, boundaries, syntax_highlighting=True, syntax_highlighting_style="inkpot", text_color=WHITE,
-                 text_weight=NORMAL, font="Times New Roman", tab_spacing=2):
+                 text_weight=NORMAL, font="Times New Roman", tab_spacing=2, scroll_threshold=5):
         group = VGroup()
         self.boundaries = boundaries
 
@@ -11,6 +11,7 @@ class CodeBlock:
         self.boundary_width -= arrow_size
         self.boundary_height = boundaries[0][1] - boundaries[3][1]
         self.code_end = max(math.floor(self.boundary_height * 12.0 / self.boundary_width), 2)
+        self.scroll_threshold = scroll_threshold
 
         if syntax_highlighting:
             fp = tempfile.NamedTemporaryFile(suffix='.re')
@@ -29,11 +30,20 @@ class CodeBlock:
         else:
             for c in code:
                 for sc in c:
-                    text = Text(sc, color=text_color, weight=text_weight, font=font)
+                    text = cached_text(sc, color=text_color, weight=text_weight, font=font)
                     group.add(text)
             self.all = group
         self.code = code
 
+        # line_offsets[n] is the number of wrapped lines before source line n + 1
+        self.line_offsets = [0]
+        for c in code:
+            self.line_offsets.append(self.line_offsets[-1] + len(c))
+
+        # Lines outside the visible window only follow scrolls once they come back into view
+        self.scroll_offset = 0
+        self.line_scroll_offsets = [0] * self.line_offsets[-1]
+
     def build(self):
         self.all.arrange_submobjects(DOWN * 0.1, aligned_edge=LEFT)
         ratio = 4.6 / 5.0
@@ -41,7 +51,14 @@ class CodeBlock:
         return self.all
 
     def get_line_at(self, line_number):
-        idx = 0
-        for i in range(line_number):
-            idx += len(self.code[i])
-        return self.all[idx - 1]
+        return self.all[self.line_offsets[line_number] - 1]
+
+    def get_line_top(self, index):
+        # Top of the wrapped line at index as if it had followed every scroll so far
+        return self.all[index].get_top()[1] + self.scroll_offset - self.line_scroll_offsets[index]
+
+    def catch_up_line(self, index):
+        line = self.all[index]
+        line.shift((self.scroll_offset - self.line_scroll_offsets[index]) * UP)
+        self.line_scroll_offsets[index] = self.scroll_offset
+        return line
@@ -0,0 +1,33 @@
+# Interpreter for instruction streams written by the stream backend. Snippets of Python code are executed in a
+# shared environment, so variables they define stay visible to later snippets just as in a generated construct().
+
+def run_instruction_stream(self, path):
+    import ast
+    import json
+    import zlib
+
+    with open(path, "rb") as stream_file:
+        stream = json.loads(zlib.decompress(stream_file.read()).decode("utf-8"))
+
+    snippets = stream["snippets"]
+    compiled = [None] * len(snippets)
+    env = dict(globals())
+    env["self"] = self
+    for instruction in stream["instructions"]:
+        opcode = instruction[0]
+        if opcode == "x":
+            index = instruction[1]
+            if compiled[index] is None:
+                compiled[index] = compile(snippets[index], "<snippet %d>" % index, "exec")
+            exec(compiled[index], env)
+        elif opcode == "m":
+            self.move_arrow_to_line(instruction[1], env[instruction[2]], env[instruction[3]], env[instruction[4]])
+        elif opcode == "w":
+            self.wait(instruction[1])
+        elif opcode == "v":
+            variables = ast.literal_eval(instruction[2])
+            self.play_animation(*env[instruction[1]].update_variable(variables, instruction[4]), run_time=instruction[3])
+        elif opcode == "c":
+            self.checkpoint(instruction[1])
+        else:
+            raise ValueError("Unknown opcode %s in instruction stream" % opcode)
@@ -1,7 +1,7 @@
 class RectangleBlock:
     def __init__(self, text, target=None, height=0.75, width=1.5, color=BLUE, text_color=WHITE, text_weight=NORMAL,
                  font="Times New Roman"):
-        self.text = Text(text, color=text_color, weight=text_weight, font=font)
+        self.text = cached_text(text, color=text_color, weight=text_weight, font=font)
         self.shape = Rectangle(height=height, width=width, color=color)
         self.all = VGroup(self.text, self.shape)
         self.text.set_width(7 / 10 * width)
@@ -18,14 +18,18 @@ class RectangleBlock:
             self.all.scale(max(target.empty.get_height() / self.shape.get_height(),
                                target.empty.get_width() / self.shape.get_width()))
 
-    def replace_text(self, new_text, color=None):
+    # Text fitted to the centre of the rectangle, for the current text to be transformed into
+    def fitted_text(self, new_text, color=None):
         if not color:
             color = self.text_color
-        new_text_obj = Text(new_text, color=color, font=self.font)
+        new_text_obj = cached_text(new_text, color=color, font=self.font)
         new_text_obj.set_width(self.width * 7 / 10)
         if new_text_obj.get_height() > 0.6 * self.height:
             new_text_obj.scale(0.6 * self.height / new_text_obj.get_height())
-        return Transform(self.text, new_text_obj.move_to(self.all.get_center()))
+        return new_text_obj.move_to(self.all.get_center())
+
+    def replace_text(self, new_text, color=None):
+        return Transform(self.text, self.fitted_text(new_text, color=color))
 
     def clean_up(self):
         return FadeOut(self.all)
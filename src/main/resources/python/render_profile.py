@@ -0,0 +1,54 @@
+# Render profiling: every instruction is wrapped in probes timing it, along with the part of that time spent in play
+# and wait calls, by the VAlgoLang line it came from and its instruction type. The totals are written as JSON when
+# manim exits, to a file of their own for each segment when segments are rendered separately.
+
+def start_render_profile(self, path):
+    import atexit
+    import time
+    self.render_profile = {}
+    self.render_probe = None
+    self.render_clock = time.perf_counter
+    segment = self.get_render_segment()
+    if segment is not None:
+        path = "%s.%d-%d" % (path, segment[0], segment[1])
+    self.time_render_calls("play")
+    self.time_render_calls("wait")
+    atexit.register(self.write_render_profile, path)
+
+# Shadows the scene's method with one adding the time spent in it to the current probe
+def time_render_calls(self, name):
+    call = getattr(self, name)
+
+    def timed(*args, **kwargs):
+        start = self.render_clock()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            if self.render_probe is not None:
+                self.render_probe[3] += self.render_clock() - start
+
+    setattr(self, name, timed)
+
+def begin_probe(self, line, instruction):
+    self.render_probe = [line, instruction, self.render_clock(), 0.0]
+
+def end_probe(self):
+    line, instruction, start, play_seconds = self.render_probe
+    self.render_probe = None
+    # Instructions outside the segment being rendered are only replayed to build up the scene
+    segment = self.get_render_segment()
+    if segment is not None and not segment[0] <= self.checkpoint_index < segment[1]:
+        return
+    totals = self.render_profile.setdefault((line, instruction), [0, 0.0, 0.0])
+    totals[0] += 1
+    totals[1] += self.render_clock() - start
+    totals[2] += play_seconds
+
+def write_render_profile(self, path):
+    import json
+    instructions = [
+        {"line": line, "instruction": instruction, "calls": calls, "seconds": seconds, "playSeconds": play_seconds}
+        for (line, instruction), (calls, seconds, play_seconds) in self.render_profile.items()
+    ]
+    with open(path, "w") as profile_file:
+        json.dump({"instructions": instructions}, profile_file)
@@ -73,7 +73,7 @@ class InitStructure:
         self.shape.set_length(length)
         self.shape.set_angle(angle)
         if text is not None:
-            self.text = Text(text, color=text_color, weight=text_weight, font=font)
+            self.text = cached_text(text, color=text_color, weight=text_weight, font=font)
             self.text.next_to(self.shape, DOWN, SMALL_BUFF)
             self.all = VGroup(self.text, self.shape)
         else:
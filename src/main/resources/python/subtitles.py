@@ -1,6 +1,6 @@
 class SubtitleBlock:
     def __init__(self, end_time, boundaries, text_color=WHITE, text_weight=NORMAL, font="Times New Roman"):
-        self.text = Text("", color=text_color, weight=text_weight, font=font)
+        self.text = cached_text("", color=text_color, weight=text_weight, font=font)
         self.text_color = text_color
         self.text_weight = text_weight
         self.boundaries = boundaries
@@ -14,7 +14,7 @@ class SubtitleBlock:
         self.showing = False
 
     def change_text(self, text):
-        self.text = Text(text, color=self.text_color, weight=self.text_weight, font=self.font)
+        self.text = cached_text(text, color=self.text_color, weight=self.text_weight, font=self.font)
         if self.text.get_height() > self.height:
             self.text.scale(self.height / self.text.get_height())
         if self.text.get_width() > self.width:
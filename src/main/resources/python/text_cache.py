@@ -0,0 +1,29 @@
+from collections import OrderedDict
+
+
+# Building a Text renders it through Pango into an SVG that is then parsed into paths, which is the most expensive
+# step outside of rendering frames. Texts are cached by their string and style, and callers always receive a copy
+# so they are free to transform it. The least recently used texts are dropped once the cache is full.
+class TextCache:
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self.texts = OrderedDict()
+
+    def get(self, text, **kwargs):
+        key = (text, tuple(sorted(kwargs.items())))
+        cached = self.texts.get(key)
+        if cached is None:
+            cached = Text(text, **kwargs)
+            self.texts[key] = cached
+            if len(self.texts) > self.max_size:
+                self.texts.popitem(last=False)
+        else:
+            self.texts.move_to_end(key)
+        return cached.copy()
+
+
+text_cache = TextCache()
+
+
+def cached_text(text, **kwargs):
+    return text_cache.get(text, **kwargs)
@@ -17,47 +17,101 @@ def fade_out_if_needed(self, mobject):
         return None
 
 def play_animation(self, *args, run_time=1.0):
-    time_elapsed = round(self.get_time())
+    time_elapsed = round(self.scene_time)
     for time_object in self.time_objects:
         if time_object.showing and time_object.end_time <= time_elapsed:
             self.play(time_object.action(), run_time=run_time)
     self.play(*args, run_time=run_time)
 
 def move_arrow_to_line(self, line_number, pointer, code_block, code_text):
-    idx = 0
-    for i in range(line_number):
-        idx += len(code_block.code[i])
+    self.play(*self.arrow_to_line_animations(line_number, pointer, code_block))
+
+# Scrolls the code block right away if the line is out of view, returning the pointer animation so it can share
+# a play call with animations of other mobjects
+def arrow_to_line_animations(self, line_number, pointer, code_block):
+    idx = code_block.line_offsets[line_number]
 
     if idx > self.code_end:
         animation = self.fade_out_if_needed(pointer)
         if animation is not None:
             self.play(animation, runtime=0.1)
-        self.scroll_down(code_text, (idx - self.code_end))
+        self.scroll_down(code_block, (idx - self.code_end))
     elif idx - 1 < self.code_start:
         animation = self.fade_out_if_needed(pointer)
         if animation is not None:
             self.play(animation, runtime=0.1)
-        self.scroll_up(code_text, (self.code_start - idx + len(code_block.code[line_number - 1])))
+        self.scroll_up(code_block, (self.code_start - idx + len(code_block.code[line_number - 1])))
 
     line_object = code_block.get_line_at(line_number)
-    self.play(FadeIn(pointer.next_to(line_object, LEFT, MED_SMALL_BUFF)))
+    return [FadeIn(pointer.next_to(line_object, LEFT, MED_SMALL_BUFF))]
 
+# Scrolling jumps straight to the target window in a single animation, however far it is. Short scrolls slide the
+# lines that stay visible, while scrolls beyond the code block's threshold cross-fade the whole window instead.
 # Inspired from https://www.reddit.com/r/manim/comments/bubyj2/scrolling_mobjects/
 
-def scroll_down(self, group, scrolls):
-    shift = group[self.code_start].get_top()[1] - group[self.code_start + 1].get_top()[1]
-    for i in range(1, 1 + scrolls):
-        group[self.code_end + i - 1].next_to(group[self.code_end - 2 + i], DOWN * self.line_spacing, aligned_edge=LEFT)
-        self.play(FadeOut(group[self.code_start + i - 1]), FadeIn(group[self.code_end + i - 1]),
-                  group[(self.code_start + i):(self.code_end + i)].shift, shift * UP, run_time=0.1)
-    self.code_start = self.code_start + scrolls
-    self.code_end = self.code_end + scrolls
-
-def scroll_up(self, group, scrolls):
-    shift = group[self.code_start].get_top()[1] - group[self.code_start + 1].get_top()[1]
-    for i in range(1, 1 + scrolls):
-        group[self.code_start - i].next_to(group[self.code_start - i + 1], UP * self.line_spacing, aligned_edge=LEFT)
-        self.play_animation(FadeOut(group[self.code_end - i]), FadeIn(group[self.code_start - i]),
-                            group[(self.code_start - i):(self.code_end - i)].shift, shift * DOWN, run_time=0.1)
-    self.code_start = self.code_start - scrolls
-    self.code_end = self.code_end - scrolls
+def scroll_down(self, code_block, scrolls):
+    self.scroll_to_window(code_block, self.code_start + scrolls, self.code_end + scrolls)
+
+def scroll_up(self, code_block, scrolls):
+    self.scroll_to_window(code_block, self.code_start - scrolls, self.code_end - scrolls)
+
+def scroll_to_window(self, code_block, start, end):
+    group = code_block.all
+    shift = group[self.code_start].get_top()[1] - code_block.get_line_top(start)
+    code_block.scroll_offset += shift
+
+    if abs(start - self.code_start) > code_block.scroll_threshold:
+        old_window = group[self.code_start:self.code_end]
+        faded_window = old_window.copy()
+        self.remove(*old_window)
+        self.add(faded_window)
+        new_window = [code_block.catch_up_line(i) for i in range(start, end)]
+        self.play(FadeOut(faded_window), *[FadeIn(line) for line in new_window], run_time=0.5)
+    else:
+        leaving = [group[i] for i in range(self.code_start, self.code_end) if not start <= i < end]
+        entering = [code_block.catch_up_line(i) for i in range(start, end) if not self.code_start <= i < self.code_end]
+        staying = range(max(start, self.code_start), min(end, self.code_end))
+
+        animations = [FadeOut(line) for line in leaving] + [FadeIn(line) for line in entering]
+        if len(staying) > 0:
+            animations.append(ApplyMethod(group[staying.start:staying.stop].shift, shift * UP))
+            for i in staying:
+                code_block.line_scroll_offsets[i] = code_block.scroll_offset
+        self.play(*animations, run_time=0.1)
+    self.code_start = start
+    self.code_end = end
+
+# Segmented rendering: construct() is replayed in every worker, but only the plays between
+# checkpoints [start, end) given by VALGOLANG_SEGMENT are written out. The scene time is
+# tracked separately as manim only advances its clock by one frame for skipped animations.
+
+def get_render_segment(self):
+    segment = os.environ.get("VALGOLANG_SEGMENT")
+    if segment is None:
+        return None
+    start, end = segment.split(":")
+    return int(start), int(end)
+
+def checkpoint(self, index):
+    self.checkpoint_index = index
+    segment = self.get_render_segment()
+    if segment is not None and index >= segment[1]:
+        raise EndSceneEarlyException()
+
+def update_segment_skipping(self):
+    segment = self.get_render_segment()
+    if segment is not None:
+        self.skip_animations = not (segment[0] <= self.checkpoint_index < segment[1])
+
+def play(self, *args, **kwargs):
+    if len(args) == 0:
+        return
+    animations = self.compile_play_args_to_animation_list(*args, **kwargs)
+    self.update_segment_skipping()
+    super().play(*animations)
+    self.scene_time += self.get_run_time(animations)
+
+def wait(self, duration=DEFAULT_WAIT_TIME, stop_condition=None):
+    self.update_segment_skipping()
+    super().wait(duration, stop_condition)
+    self.scene_time += duration
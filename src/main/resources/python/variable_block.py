@@ -6,7 +6,7 @@ class VariableBlock:
             [(boundaries[0][0] + boundaries[1][0]) / 2, (boundaries[0][1] + boundaries[3][1]) / 2, 0])
         self.boundary_width = boundaries[1][0] - boundaries[0][0]
         for v in variables:
-            text = Text(v, color=text_color, weight=text_weight, font=font)
+            text = cached_text(v, color=text_color, weight=text_weight, font=font)
             text.set_width(min(0.8 * self.boundary_width, text.get_width()))
             group.add(text)
         self.group = group
@@ -19,7 +19,18 @@ class VariableBlock:
         self.group.arrange(DOWN, aligned_edge=LEFT)
         return self.group.move_to(self.move_position)
 
-    def update_variable(self, variables):
+    def update_variable(self, variables, changed=None):
+        # Only the lines in changed differ from what is displayed, so transform those in place
+        if changed is not None and len(variables) == self.size:
+            animations = []
+            for i in changed:
+                old_text = self.group[i]
+                text = cached_text(variables[i], color=self.text_color, weight=self.text_weight, font=self.font)
+                text.set_width(min(0.8 * self.boundary_width, text.get_width()))
+                text.move_to(old_text.get_left(), aligned_edge=LEFT)
+                animations.append(Transform(old_text, text))
+            return animations
+
         # To avoid awkward replace transform
         if self.size == 0:
             self.group.scale_in_place(0)
@@ -29,7 +40,7 @@ class VariableBlock:
             return [FadeOut(self.group)]
         group = VGroup()
         for v in variables:
-            text = Text(v, color=self.text_color, weight=self.text_weight, font=self.font)
+            text = cached_text(v, color=self.text_color, weight=self.text_weight, font=self.font)
             text.set_width(min(0.8 * self.boundary_width, text.get_width()))
             group.add(text)
 
@@ -47,7 +47,6 @@ class ASTExecutorTests {
                 pointerName = "pointer", runtime = 1.0,
                 boundaries = defaultCodeBlockBoundaries
             ),
-            UpdateVariableState(variables = emptyList(), ident = "variable_block", textColor = null, runtime = 1.0),
             MoveToLine(
                 lineNumber = 4,
                 pointerName = "pointer",
@@ -82,7 +81,8 @@ class ASTExecutorTests {
                 variables = listOf("ans = 9.0"),
                 ident = "variable_block",
                 textColor = null,
-                runtime = 1.0
+                runtime = 1.0,
+                changedSlots = listOf(0)
             ),
             Sleep(length = 1.0, runtime = 1.0)
         )
@@ -130,7 +130,6 @@ class ASTExecutorTests {
                 pointerName = "pointer", runtime = 1.0,
                 boundaries = defaultCodeBlockBoundaries
             ),
-            UpdateVariableState(variables = listOf(), ident = "variable_block", textColor = null, runtime = 1.0),
             MoveToLine(
                 lineNumber = 4,
                 pointerName = "pointer",
@@ -169,7 +168,8 @@ class ASTExecutorTests {
                 variables = listOf("ans = 9.0"),
                 ident = "variable_block",
                 textColor = null,
-                runtime = 1.0
+                runtime = 1.0,
+                changedSlots = listOf(0)
             ),
             Sleep(1.0, runtime = 1.0)
         )
@@ -218,7 +218,6 @@ class ASTExecutorTests {
                 pointerName = "pointer", runtime = 1.0,
                 boundaries = defaultCodeBlockBoundaries
             ),
-            UpdateVariableState(variables = listOf(), ident = "variable_block", textColor = null, runtime = 1.0),
             MoveToLine(
                 lineNumber = 4,
                 pointerName = "pointer",
@@ -283,7 +282,6 @@ class ASTExecutorTests {
                 pointerName = "pointer", runtime = 1.0,
                 boundaries = defaultCodeBlockBoundaries
             ),
-            UpdateVariableState(variables = listOf(), ident = "variable_block", textColor = null, runtime = 1.0),
             MoveToLine(
                 lineNumber = 1,
                 pointerName = "pointer",
@@ -339,7 +337,8 @@ class ASTExecutorTests {
             UpdateVariableState(
                 variables = listOf("shouldBeTrue = true, y = 97.0, z = \\'a\\', a = 97.0"),
                 ident = "variable_block",
-                textColor = null, runtime = 1.0
+                textColor = null, runtime = 1.0,
+                changedSlots = listOf(0)
             ),
             MoveToLine(
                 lineNumber = 6,
@@ -350,7 +349,8 @@ class ASTExecutorTests {
             UpdateVariableState(
                 variables = listOf("shouldBeTrue = true, w = \\\"123\\\", z = \\'a\\', a = 97.0"),
                 ident = "variable_block",
-                textColor = null, runtime = 1.0
+                textColor = null, runtime = 1.0,
+                changedSlots = listOf(1)
             ),
             MoveToLine(
                 lineNumber = 7,
@@ -361,7 +361,8 @@ class ASTExecutorTests {
             UpdateVariableState(
                 variables = listOf("shouldBeTrue = true, w = \\\"123\\\", shouldAlsoBeTrue = true, a = 97.0"),
                 ident = "variable_block",
-                textColor = null, runtime = 1.0
+                textColor = null, runtime = 1.0,
+                changedSlots = listOf(2)
             ),
             Sleep(1.0, runtime = 1.0)
         )
@@ -404,7 +405,6 @@ class ASTExecutorTests {
                 pointerName = "pointer", runtime = 1.0,
                 boundaries = defaultCodeBlockBoundaries
             ),
-            UpdateVariableState(variables = listOf(), ident = "variable_block", textColor = null, runtime = 1.0),
             MoveToLine(
                 lineNumber = 1,
                 pointerName = "pointer",
@@ -472,7 +472,6 @@ class ASTExecutorTests {
                 pointerName = "pointer", runtime = 1.0,
                 boundaries = defaultCodeBlockBoundaries
             ),
-            UpdateVariableState(variables = listOf(), ident = "variable_block", textColor = null, runtime = 1.0),
             MoveToLine(
                 lineNumber = 1,
                 pointerName = "pointer",
@@ -0,0 +1,43 @@
+package com.valgolang
+
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Assertions.assertFalse
+import org.junit.jupiter.api.Assertions.assertTrue
+import org.junit.jupiter.api.Test
+import picocli.CommandLine
+import java.io.File
+import java.nio.file.Files
+
+class BatchTests {
+
+    @Test
+    fun programsAreFoundWithTheirStylesheets() {
+        val programs = discoverPrograms("examples").associate { it.name to it.stylesheet?.name }
+
+        assertEquals("style.json", programs["bt/bt"])
+        assertEquals("bubble_sort.json", programs["bubblesort/bubble_sort"])
+        assertEquals(5, programs.size)
+    }
+
+    @Test
+    fun globsMatchPrograms() {
+        val programs = discoverPrograms("examples/*/b*.val").map { it.name }
+
+        assertEquals(listOf("BinarySearch/binarySearch", "bt/bt", "bubblesort/bubble_sort").sorted(), programs.sorted())
+    }
+
+    @Test
+    fun failingProgramsDoNotAffectOthers() {
+        val directory = Files.createTempDirectory("batch").toFile()
+        File(directory, "programs").mkdir()
+        File(directory, "programs/valid.val").writeText("let x = 1;")
+        File(directory, "programs/invalid.val").writeText("let x = ;")
+        val outputDir = File(directory, "out")
+
+        val exitCode = CommandLine(BatchCommand()).execute("${directory.path}/programs", "-m", "-o", outputDir.path, "--threads", "2")
+
+        assertEquals(1, exitCode)
+        assertTrue(File(outputDir, "valid.py").isFile)
+        assertFalse(File(outputDir, "invalid.py").exists())
+    }
+}
@@ -0,0 +1,64 @@
+package com.valgolang
+
+import com.google.gson.JsonParser
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Assertions.assertTrue
+import org.junit.jupiter.api.Test
+import picocli.CommandLine
+import java.io.File
+import java.nio.file.Files
+
+class CompileProfilerTests {
+
+    @Test
+    fun stagesRunWithinOthersAreNestedUnderThem() {
+        val profiler = CompileProfiler()
+        profiler.stage("execution") {
+            profiler.stage("layout") {}
+            profiler.stage("layout") {}
+        }
+        profiler.stage("render") {}
+
+        val stages = profiler.finish().map { Triple(it.name, it.depth, it.calls) }
+
+        assertEquals(listOf(Triple("execution", 0, 1), Triple("layout", 1, 2), Triple("render", 0, 1)), stages)
+    }
+
+    @Test
+    fun profileCountsWhatTheCompileDid() {
+        val directory = Files.createTempDirectory("profile").toFile()
+        val program = File(directory, "program.val")
+        program.writeText("let x = 1;\nlet y = x + 1;\nsleep(1);\n")
+        val profile = File(directory, "profile.json")
+
+        val exitCode = CommandLine(DSLCommandLineArguments()).execute(
+            program.path, "-m", "-o", File(directory, "out.mp4").path, "--profile", profile.path, "--profile_nodes"
+        )
+
+        assertEquals(0, exitCode)
+        val json = JsonParser.parseString(profile.readText()).asJsonObject
+        val stages = json.getAsJsonArray("stages").map { it.asJsonObject.get("name").asString }
+        assertTrue(stages.containsAll(listOf("parse", "semantic analysis", "stylesheet", "execution and code generation")))
+        assertEquals(3, json.get("statementsExecuted").asInt)
+        assertTrue(json.getAsJsonObject("instructions").has("MoveToLine"))
+        assertTrue(json.get("playCalls").asInt > 0)
+        assertTrue(json.has("nodeSamples"))
+    }
+
+    @Test
+    fun executionAndCodeGenerationAreSeparateStagesWhenNotStreamed() {
+        val directory = Files.createTempDirectory("profile").toFile()
+        val program = File(directory, "program.val")
+        program.writeText("let x = 1;\nsleep(1);\n")
+        val profile = File(directory, "profile.json")
+
+        val exitCode = CommandLine(DSLCommandLineArguments()).execute(
+            program.path, "-m", "-O", "-o", File(directory, "out.mp4").path, "--profile", profile.path
+        )
+
+        assertEquals(0, exitCode)
+        val stages = JsonParser.parseString(profile.readText()).asJsonObject.getAsJsonArray("stages")
+            .map { Pair(it.asJsonObject.get("name").asString, it.asJsonObject.get("depth").asInt) }
+        assertTrue(stages.containsAll(listOf(Pair("execution", 0), Pair("optimisation", 0), Pair("code generation", 0))))
+    }
+}
@@ -0,0 +1,35 @@
+package com.valgolang
+
+import com.google.gson.Gson
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Assertions.assertTrue
+import org.junit.jupiter.api.Test
+import java.io.ByteArrayInputStream
+import java.io.ByteArrayOutputStream
+import java.util.concurrent.Executors
+
+class DaemonTests {
+
+    @Test
+    fun requestsAreCompiledWithSeparateErrorState() {
+        val requests = listOf(
+            """{"id": 1, "args": ["-b"], "source": "let x = 1;"}""",
+            """{"id": 2, "args": ["-b"], "source": "let x = ;"}""",
+            """{"id": 3, "args": ["missing.val"]}"""
+        )
+        val output = ByteArrayOutputStream()
+        val executor = Executors.newFixedThreadPool(3)
+
+        DaemonCommand().serve(ByteArrayInputStream(requests.joinToString("\n").toByteArray()), output, executor)
+        executor.shutdown()
+
+        val responses = output.toString().trim().split("\n")
+            .map { Gson().fromJson(it, DaemonResponse::class.java) }
+            .associateBy { it.id!!.asInt }
+        assertEquals(0, responses.getValue(1).exitCode)
+        assertTrue(responses.getValue(1).output.contains("_code"))
+        assertEquals(ExitStatus.SYNTAX_ERROR.code, responses.getValue(2).exitCode)
+        assertEquals(1, responses.getValue(3).exitCode)
+        assertTrue(responses.getValue(3).output.contains("missing.val not found"))
+    }
+}
@@ -0,0 +1,55 @@
+package com.valgolang.animation
+
+import com.valgolang.linearrepresentation.InstructionBuffer
+import com.valgolang.linearrepresentation.MoveToLine
+import com.valgolang.linearrepresentation.Sleep
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Assertions.assertFalse
+import org.junit.jupiter.api.Assertions.assertTrue
+import org.junit.jupiter.api.Test
+import java.io.File
+import java.nio.file.Files
+
+class RenderProfileTests {
+
+    private val directory: File = Files.createTempDirectory("render_profile").toFile()
+
+    @Test
+    fun instructionsAreProbedWithTheLineTheyCameFrom() {
+        val instructions = InstructionBuffer()
+        instructions.sourceLine = 3
+        instructions.add(MoveToLine(3, "pointer", "code_block", "code_text", runtime = 1.0))
+        instructions.sourceLine = 4
+        instructions.add(Sleep(1.0, runtime = 1.0))
+
+        val python = ManimWriter(instructions, renderProfile = "profile.json").build()
+
+        assertTrue(python.contains("self.start_render_profile(\"profile.json\")"))
+        assertTrue(python.contains("self.begin_probe(3, \"MoveToLine\")"))
+        assertTrue(python.contains("self.begin_probe(4, \"Sleep\")"))
+        assertTrue(python.contains("def end_probe(self):"))
+        assertFalse(ManimWriter(instructions).build().contains("probe"))
+    }
+
+    @Test
+    fun profilesOfSegmentsAreAddedUpByLine() {
+        val profile = File(directory, "profile.json")
+        File(directory, "profile.json.0-2").writeText(
+            """{"instructions": [{"line": 2, "instruction": "Sleep", "calls": 1, "seconds": 1.5, "playSeconds": 1.0}]}"""
+        )
+        File(directory, "profile.json.2-4").writeText(
+            """{"instructions": [{"line": 2, "instruction": "Sleep", "calls": 2, "seconds": 2.5, "playSeconds": 2.0},
+                {"line": 1, "instruction": "MoveToLine", "calls": 1, "seconds": 0.5, "playSeconds": 0.5}]}"""
+        )
+
+        val entries = RenderProfile.collect(profile, listOf("let x = 1;", "sleep(1);"))
+
+        assertEquals(
+            listOf(RenderProfileEntry(1, "MoveToLine", 1, 0.5, 0.5), RenderProfileEntry(2, "Sleep", 3, 4.0, 3.0)),
+            entries
+        )
+        assertTrue(profile.readText().contains("\"source\": \"sleep(1);\""))
+        assertFalse(File(directory, "profile.json.0-2").exists())
+        assertTrue(RenderProfile.summary(entries, listOf("let x = 1;", "sleep(1);"))[1].endsWith("sleep(1);"))
+    }
+}
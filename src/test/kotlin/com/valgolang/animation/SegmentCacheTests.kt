@@ -0,0 +1,56 @@
+package com.valgolang.animation
+
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Assertions.assertFalse
+import org.junit.jupiter.api.Assertions.assertNotEquals
+import org.junit.jupiter.api.Assertions.assertTrue
+import org.junit.jupiter.api.Test
+import java.io.File
+import java.nio.file.Files
+
+class SegmentCacheTests {
+
+    private val directory: File = Files.createTempDirectory("segments").toFile()
+
+    @Test
+    fun editingASegmentOnlyChangesKeysFromThatSegmentOnwards() {
+        val cache = SegmentCache(directory, 1024)
+
+        val original = cache.keys("library", listOf("a", "b", "c"))
+        val edited = cache.keys("library", listOf("a", "x", "c"))
+
+        assertEquals(original[0], edited[0])
+        assertNotEquals(original[1], edited[1])
+        assertNotEquals(original[2], edited[2])
+        assertNotEquals(original[0], cache.keys("other library", listOf("a"))[0])
+    }
+
+    @Test
+    fun storedSegmentsCanBeRestored() {
+        val cache = SegmentCache(directory, 1024)
+        val video = File(directory, "video").apply { writeText("frames") }
+        val restored = File(directory, "restored/Main.mp4")
+
+        assertFalse(cache.restore("key", restored))
+        cache.store("key", video)
+
+        assertTrue(cache.restore("key", restored))
+        assertEquals("frames", restored.readText())
+    }
+
+    @Test
+    fun leastRecentlyUsedSegmentsAreEvictedFirst() {
+        val cache = SegmentCache(directory, 10)
+        val video = File(directory, "video").apply { writeText("12345") }
+
+        cache.store("first", video)
+        cache.store("second", video)
+        File(directory, "first.mp4").setLastModified(0)
+        File(directory, "second.mp4").setLastModified(1000)
+        cache.store("third", video)
+
+        assertFalse(File(directory, "first.mp4").exists())
+        assertTrue(File(directory, "second.mp4").exists())
+        assertTrue(File(directory, "third.mp4").exists())
+    }
+}
@@ -1,6 +1,9 @@
 package com.valgolang.linearrepresentation
 
+import com.google.gson.Gson
+import com.google.gson.JsonObject
 import com.valgolang.animation.ManimProjectWriter
+import com.valgolang.animation.ManimStreamWriter
 import com.valgolang.animation.ManimWriter
 import com.valgolang.frontend.ast.NumberType
 import com.valgolang.frontend.datastructures.stack.StackType
@@ -10,6 +13,8 @@ import com.valgolang.linearrepresentation.datastructures.stack.StackPushObject
 import org.junit.Assert.assertEquals
 import org.junit.jupiter.api.Test
 import java.io.File
+import java.io.StringWriter
+import java.util.zip.InflaterInputStream
 
 class TestLinearRepresentation {
     val defaultCodeBlockBoundaries =
@@ -58,4 +63,75 @@ class TestLinearRepresentation {
             generated.filter { it.trim() != "" }.joinToString("\n")
         )
     }
+
+    @Test
+    fun segmentedWriterEmitsCheckpointsAfterLineMoves() {
+        val codeBlock = CodeBlock(listOf(listOf("sleep(1);"), listOf("sleep(2);")), "code_block", "code_text", "pointer", runtime = 1.0)
+        codeBlock.setNewBoundary(defaultCodeBlockBoundaries, -1)
+        val instructions = listOf(
+            codeBlock,
+            MoveToLine(1, "pointer", "code_block", "code_text", runtime = 1.0),
+            Sleep(1.0, runtime = 0.5),
+            MoveToLine(2, "pointer", "code_block", "code_text", runtime = 1.0),
+            Sleep(2.0, runtime = 0.5)
+        )
+
+        val writer = ManimWriter(instructions, segmented = true)
+        val checkpoints = writer.build().lines().map { it.trim() }.filter { it.startsWith("self.checkpoint(") }
+
+        assertEquals(listOf("self.checkpoint(1)", "self.checkpoint(2)", "self.checkpoint(3)"), checkpoints)
+        assertEquals(listOf(2.0, 0.5, 1.0, 0.5), writer.segments.map { it.runtime })
+        assertEquals(false, ManimWriter(instructions).build().contains("self.checkpoint("))
+    }
+
+    @Test
+    fun segmentsArePartitionedIntoContiguousRangesOfSimilarRuntime() {
+        val writer = ManimProjectWriter("")
+
+        assertEquals(listOf(Pair(0, 2), Pair(2, 4)), writer.partitionSegments(listOf(1.0, 1.0, 1.0, 1.0), 2))
+        assertEquals(listOf(Pair(0, 1), Pair(1, 3)), writer.partitionSegments(listOf(4.0, 1.0, 1.0), 2))
+        assertEquals(listOf(Pair(0, 1), Pair(1, 2)), writer.partitionSegments(listOf(1.0, 1.0), 8))
+        assertEquals(listOf(Pair(0, 2), Pair(2, 3), Pair(3, 4)), writer.coarsenSegments(listOf(5.0, 5.0, 12.0, 1.0), 10.0))
+    }
+
+    @Test
+    fun streamWriterSerialisesInstructionsInsteadOfEmittingSource() {
+        val codeBlock = CodeBlock(listOf(listOf("sleep(1);")), "code_block", "code_text", "pointer", runtime = 1.0)
+        codeBlock.setNewBoundary(defaultCodeBlockBoundaries, -1)
+        val rectangle = Rectangle("rectangle", "2.0", "stack")
+        val instructions = listOf(
+            codeBlock,
+            MoveToLine(1, "pointer", "code_block", "code_text", runtime = 1.0),
+            rectangle,
+            rectangle,
+            Sleep(1.0, runtime = 1.0)
+        )
+
+        val (pythonCode, stream) = ManimStreamWriter(instructions).build()
+        val decoded = Gson().fromJson(InflaterInputStream(stream.inputStream()).reader().readText(), JsonObject::class.java)
+        val opcodes = decoded.getAsJsonArray("instructions").map { it.asJsonArray[0].asString }
+
+        assertEquals(true, pythonCode.contains("self.run_instruction_stream("))
+        assertEquals(false, pythonCode.contains("self.move_arrow_to_line(1"))
+        assertEquals(listOf("x", "m", "x", "x", "w"), opcodes)
+        assertEquals(2, decoded.getAsJsonArray("snippets").size())
+    }
+
+    @Test
+    fun streamedInstructionsLookUpLateBoundBoundaries() {
+        val codeBlock = CodeBlock(listOf(listOf("sleep(1);")), "code_block", "code_text", "pointer", runtime = 1.0)
+        codeBlock.lateBoundBoundary = true
+        val writer = ManimWriter(emptyList())
+        val out = StringWriter()
+
+        writer.startStream(out)
+        writer.streamInstruction(out, codeBlock)
+        writer.streamInstruction(out, Sleep(1.0, runtime = 1.0))
+        writer.endStream(out, mapOf("_code" to defaultCodeBlockBoundaries))
+        val pythonCode = out.toString()
+
+        assertEquals(true, pythonCode.contains("code_block = CodeBlock(code_lines, BOUNDARIES[\"_code\"], "))
+        assertEquals(true, pythonCode.endsWith("BOUNDARIES = {\n    \"_code\": $defaultCodeBlockBoundaries,\n}\n"))
+        assertEquals(true, pythonCode.indexOf("self.wait(1.0)") < pythonCode.indexOf("BOUNDARIES = {"))
+    }
 }
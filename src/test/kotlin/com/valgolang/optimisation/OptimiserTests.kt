@@ -0,0 +1,101 @@
+package com.valgolang.optimisation
+
+import com.valgolang.linearrepresentation.MoveToLine
+import com.valgolang.linearrepresentation.PlayTogether
+import com.valgolang.linearrepresentation.Sleep
+import com.valgolang.linearrepresentation.UpdateVariableState
+import com.valgolang.linearrepresentation.datastructures.array.ArrayElemAssignObject
+import com.valgolang.runtime.DoubleValue
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Test
+
+class OptimiserTests {
+
+    private fun moveToLine(line: Int, runtime: Double) = MoveToLine(line, "pointer", "code_block", "code_text", runtime)
+
+    @Test
+    fun fastRunsKeepOnlyFinalPointerPositionAndVariableState() {
+        val instructions = listOf(
+            moveToLine(1, 0.1),
+            UpdateVariableState(listOf("x = 1.0", "y = 1.0"), "variable_block", runtime = 0.1, changedSlots = listOf(0)),
+            moveToLine(2, 0.1),
+            UpdateVariableState(listOf("x = 1.0", "y = 2.0"), "variable_block", runtime = 0.1, changedSlots = listOf(1)),
+            moveToLine(3, 0.1),
+            moveToLine(4, 1.0)
+        )
+
+        val (optimised, reports) = Optimiser().optimise(instructions)
+
+        assertEquals(
+            listOf(
+                UpdateVariableState(listOf("x = 1.0", "y = 2.0"), "variable_block", runtime = 0.1, changedSlots = listOf(0, 1)),
+                moveToLine(3, 0.1),
+                moveToLine(4, 1.0)
+            ),
+            optimised
+        )
+        assertEquals(
+            listOf(
+                OptimisationReport("coalesce-move-to-line", 2),
+                OptimisationReport("merge-variable-updates", 1),
+                OptimisationReport("merge-sleeps", 0)
+            ),
+            reports
+        )
+    }
+
+    @Test
+    fun normalSpeedMoveToLinesAreKept() {
+        val instructions = listOf(moveToLine(1, 1.0), moveToLine(2, 1.0))
+
+        assertEquals(instructions, CoalesceMoveToLines().optimise(instructions))
+    }
+
+    @Test
+    fun updatesDisplayingUnchangedVariablesAreDropped() {
+        val update = UpdateVariableState(listOf("x = 1.0"), "variable_block", runtime = 1.0)
+        val instructions = listOf(update, moveToLine(1, 1.0), update)
+
+        assertEquals(listOf(update, moveToLine(1, 1.0)), MergeVariableUpdates().optimise(instructions))
+    }
+
+    @Test
+    fun mergingAnUpdateThatResizesTheBlockRebuildsIt() {
+        val instructions = listOf(
+            UpdateVariableState(listOf("x = 1.0"), "variable_block", runtime = 0.1),
+            UpdateVariableState(listOf("x = 2.0"), "variable_block", runtime = 0.1, changedSlots = listOf(0))
+        )
+
+        assertEquals(
+            listOf(UpdateVariableState(listOf("x = 2.0"), "variable_block", runtime = 0.1)),
+            MergeVariableUpdates().optimise(instructions)
+        )
+    }
+
+    @Test
+    fun backToBackSleepsAreMerged() {
+        val instructions = listOf(Sleep(1.0, runtime = 1.0), Sleep(0.5, runtime = 1.0), moveToLine(1, 1.0), Sleep(2.0, runtime = 1.0))
+
+        assertEquals(
+            listOf(Sleep(1.5, runtime = 1.0), moveToLine(1, 1.0), Sleep(2.0, runtime = 1.0)),
+            MergeSleeps().optimise(instructions)
+        )
+    }
+
+    @Test
+    fun animationsOfDisjointMobjectsArePlayedTogether() {
+        val move = moveToLine(2, 1.0)
+        val assign = ArrayElemAssignObject("array", 0, DoubleValue(1.0), null, runtime = 1.0, render = true)
+        val update = UpdateVariableState(listOf("x = 1.0"), "variable_block", runtime = 1.0)
+        val secondAssign = ArrayElemAssignObject("array", 1, DoubleValue(2.0), null, runtime = 1.0, render = true)
+
+        val scheduled = ScheduleAnimations().optimise(listOf(move, assign, update, secondAssign, Sleep(runtime = 1.0)))
+
+        assertEquals(listOf(PlayTogether(listOf(move, assign, update), 1.0), secondAssign, Sleep(runtime = 1.0)), scheduled)
+        assertEquals(
+            "self.play_animation(*self.arrow_to_line_animations(2, pointer, code_block), *[array.update_element(0, \"1.0\")], " +
+                "*variable_block.update_variable(['x = 1.0']), run_time=1.0)",
+            scheduled.first().toPython().last()
+        )
+    }
+}
@@ -0,0 +1,102 @@
+package com.valgolang.runtime
+
+import com.valgolang.ExitStatus
+import com.valgolang.VAlgoLangASTGenerator
+import com.valgolang.animation.ManimWriter
+import com.valgolang.linearrepresentation.ManimInstr
+import com.valgolang.stylesheet.Stylesheet
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Test
+import org.junit.jupiter.params.ParameterizedTest
+import org.junit.jupiter.params.provider.Arguments
+import org.junit.jupiter.params.provider.MethodSource
+import java.io.File
+import java.util.stream.Stream
+import kotlin.streams.asStream
+
+class ExecutionCheckpointsTests {
+    companion object {
+        @JvmStatic
+        fun data(): Stream<Arguments> {
+            return File("src/test/testFiles/valid/").walk().filter { it.isFile }.map { Arguments.of(it.path) }
+                .asStream()
+        }
+    }
+
+    private fun generatePython(lines: List<String>, checkpoints: ExecutionCheckpoints?): String =
+        ManimWriter(run(lines, checkpoints)).build()
+
+    private fun run(lines: List<String>, checkpoints: ExecutionCheckpoints?): List<ManimInstr> {
+        val parser = VAlgoLangASTGenerator(lines.joinToString("\n").byteInputStream())
+        val (_, program) = parser.parseFile()
+        val (_, abstractSyntaxTree, symbolTable, lineNodeMap) = parser.convertToAst(program)
+        val (exitStatus, instructions) = VirtualMachine(
+            abstractSyntaxTree,
+            symbolTable,
+            lineNodeMap,
+            lines,
+            Stylesheet(null, symbolTable),
+            checkpoints = checkpoints
+        ).runProgram()
+        assertEquals(ExitStatus.EXIT_SUCCESS, exitStatus)
+        return instructions
+    }
+
+    @ParameterizedTest(name = "{0}")
+    @MethodSource("data")
+    fun rerunsCarryingOnFromCheckpointsGenerateTheSameCode(fileName: String) {
+        val lines = File(fileName).readLines()
+        val checkpoints = ExecutionCheckpoints()
+
+        val expected = generatePython(lines, null)
+
+        assertEquals(expected, generatePython(lines, checkpoints))
+        assertEquals(expected, generatePython(lines, checkpoints))
+    }
+
+    @Test
+    fun editedProgramsCarryOnFromBeforeTheirFirstChange() {
+        val original = listOf(
+            "let a = Array<number>(3){1,2,3};",
+            "let x = Stack<number>() {3,2,1};",
+            "@subtitleOnce(\"shown\", true)",
+            "a.swap(0,1);",
+            "let y = x.pop();"
+        )
+        val edited = original.dropLast(1) + listOf("a.swap(1,2);", "let y = x.pop() + a[0];")
+        val checkpoints = ExecutionCheckpoints()
+
+        generatePython(original, checkpoints)
+
+        assertEquals(generatePython(edited, null), generatePython(edited, checkpoints))
+    }
+
+    @Test
+    fun laterRunsDoNotChangeTheInstructionsOfEarlierOnes() {
+        val original = listOf(
+            "let a = Array<number>(3){1,2,3};",
+            "a.swap(0,1);"
+        )
+        val edited = original + "let x = Stack<number>() {3,2,1};"
+        val checkpoints = ExecutionCheckpoints()
+
+        val instructions = run(original, checkpoints)
+        val expected = ManimWriter(instructions).build()
+        run(edited, checkpoints)
+
+        assertEquals(expected, ManimWriter(instructions).build())
+    }
+
+    @Test
+    fun checkpointsBeyondTheMemoryBoundAreNotKept() {
+        val lines = listOf(
+            "let x = Stack<number>() {3,2,1};",
+            "x.push(4);",
+            "let y = x.pop();"
+        )
+        val checkpoints = ExecutionCheckpoints(maxBytes = 0)
+
+        assertEquals(generatePython(lines, null), generatePython(lines, checkpoints))
+        assertEquals(0L, checkpoints.retainedBytes)
+    }
+}
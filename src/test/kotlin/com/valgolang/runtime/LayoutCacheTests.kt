@@ -0,0 +1,62 @@
+package com.valgolang.runtime
+
+import com.valgolang.ExitStatus
+import com.valgolang.runtime.datastructures.LayoutCache
+import com.valgolang.runtime.datastructures.Scene
+import com.valgolang.runtime.datastructures.SquareBoundary
+import com.valgolang.runtime.datastructures.TallBoundary
+import com.valgolang.runtime.datastructures.WideBoundary
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Assertions.assertNull
+import org.junit.jupiter.api.Test
+import java.nio.file.Files
+
+class LayoutCacheTests {
+
+    private fun shapes() = listOf(
+        Pair("array", WideBoundary(maxSize = 5)),
+        Pair("tree", SquareBoundary(maxSize = 3)),
+        Pair("stack", TallBoundary())
+    )
+
+    @Test
+    fun cachedLayoutsMatchComputedLayouts() {
+        val directory = Files.createTempDirectory("layout").toFile()
+        val expected = Scene().compute(shapes(), fullScreen = false, expandCodeBlock = false).second
+
+        val computed = LayoutCache(directory).compute(shapes(), fullScreen = false, expandCodeBlock = false)
+        val cached = LayoutCache(directory).compute(shapes(), fullScreen = false, expandCodeBlock = false)
+
+        assertEquals(ExitStatus.EXIT_SUCCESS, cached.first)
+        assertEquals(expected.mapValues { it.value.corners() }, computed.second.mapValues { it.value.corners() })
+        assertEquals(expected.mapValues { it.value.corners() }, cached.second.mapValues { it.value.corners() })
+        assertEquals(expected.mapValues { it.value.maxSize }, cached.second.mapValues { it.value.maxSize })
+        directory.deleteRecursively()
+    }
+
+    @Test
+    fun layoutsOfDifferentShapesAreNotShared() {
+        val cache = LayoutCache()
+        val fullScreen = cache.compute(shapes(), fullScreen = true, expandCodeBlock = false).second
+        val smallerArray = cache.compute(
+            listOf(Pair("array", WideBoundary(maxSize = 1))) + shapes().drop(1),
+            fullScreen = true,
+            expandCodeBlock = false
+        ).second
+
+        assertEquals(setOf("array", "tree", "stack"), fullScreen.keys)
+        assertEquals(1, smallerArray.getValue("array").maxSize)
+        assertEquals(5, fullScreen.getValue("array").maxSize)
+    }
+
+    @Test
+    fun printedBoundariesAreFoundForExactlyTheSameProgramAndStylesheet() {
+        val directory = Files.createTempDirectory("layout").toFile()
+        LayoutCache(directory).storeBoundaries("let x = 1;", "{}", "{\"auto\":{}}")
+
+        assertEquals("{\"auto\":{}}", LayoutCache(directory).findBoundaries("let x = 1;", "{}"))
+        assertNull(LayoutCache(directory).findBoundaries("let x = 2;", "{}"))
+        assertNull(LayoutCache(directory).findBoundaries("let x = 1;", null))
+        directory.deleteRecursively()
+    }
+}
@@ -0,0 +1,39 @@
+package com.valgolang.runtime
+
+import com.valgolang.ExitStatus
+import com.valgolang.runtime.datastructures.Scene
+import com.valgolang.runtime.datastructures.SquareBoundary
+import com.valgolang.runtime.datastructures.TallBoundary
+import com.valgolang.runtime.datastructures.WideBoundary
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Test
+
+class SceneTests {
+
+    @Test
+    fun shapesScanPastEachOtherAndGrowUpToTheirNeighbours() {
+        val (exitStatus, boundaries) = Scene().compute(
+            listOf(
+                Pair("wide", WideBoundary(maxSize = 6)),
+                Pair("first", SquareBoundary(maxSize = 3)),
+                Pair("second", SquareBoundary(maxSize = 2)),
+                Pair("tall", TallBoundary())
+            ),
+            fullScreen = false,
+            expandCodeBlock = false
+        )
+
+        assertEquals(ExitStatus.EXIT_SUCCESS, exitStatus)
+        assertEquals(listOf(Pair(-2.0, -2.0), Pair(5.0, -2.0), Pair(-2.0, -4.0), Pair(5.0, -4.0)), boundaries.getValue("wide").corners())
+        assertEquals(listOf(Pair(-2.0, 4.0), Pair(2.0, 4.0), Pair(-2.0, 0.0), Pair(2.0, 0.0)), boundaries.getValue("first").corners())
+        assertEquals(listOf(Pair(2.0, 4.0), Pair(7.0, 4.0), Pair(2.0, 0.0), Pair(7.0, 0.0)), boundaries.getValue("second").corners())
+        assertEquals(listOf(Pair(5.0, 0.0), Pair(7.0, 0.0), Pair(5.0, -4.0), Pair(7.0, -4.0)), boundaries.getValue("tall").corners())
+    }
+
+    @Test
+    fun shapesThatDoNotFitAreAnError() {
+        val shapes = (1..4).map { Pair("square$it", SquareBoundary(maxSize = it)) } + Pair("wide", WideBoundary())
+
+        assertEquals(ExitStatus.RUNTIME_ERROR, Scene().compute(shapes, fullScreen = false, expandCodeBlock = false).first)
+    }
+}
@@ -0,0 +1,60 @@
+package com.valgolang.runtime
+
+import com.valgolang.linearrepresentation.datastructures.binarytree.NodeStructure
+import com.valgolang.runtime.datastructures.binarytree.BinaryTreeNodeValue
+import com.valgolang.runtime.datastructures.binarytree.ITreeNodeValue
+import com.valgolang.runtime.datastructures.binarytree.NullValue
+import com.valgolang.runtime.datastructures.binarytree.TreeLayout
+import com.valgolang.runtime.datastructures.binarytree.TreeNodePosition
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Assertions.assertTrue
+import org.junit.jupiter.api.Test
+
+class TreeLayoutTests {
+
+    private fun node(ident: String, left: ITreeNodeValue = NullValue, right: ITreeNodeValue = NullValue) =
+        BinaryTreeNodeValue(left, right, DoubleValue(0.0), NodeStructure(ident, "0", 0), depth = 0)
+
+    @Test
+    fun lonelyChildrenAreHalfAUnitToTheirSide() {
+        val layout = TreeLayout.compute(node("root", left = node("left", right = node("leftRight"))))
+
+        assertEquals(
+            listOf(TreeNodePosition("root", 0.0, 0), TreeNodePosition("left", -0.5, 1), TreeNodePosition("leftRight", 0.0, 2)),
+            layout
+        )
+    }
+
+    @Test
+    fun subtreesArePushedApartWhereTheirInnerContoursMeet() {
+        // The inner grandchildren would land on the same spot if the children were only a unit apart
+        val root = node(
+            "root",
+            left = node("left", node("leftLeft"), node("leftRight")),
+            right = node("right", node("rightLeft"), node("rightRight"))
+        )
+        val layout = TreeLayout.compute(root).associate { it.ident to it.x }
+
+        assertEquals(-1.0, layout["left"])
+        assertEquals(1.0, layout["right"])
+        assertEquals(listOf(-1.5, -0.5, 0.5, 1.5), listOf("leftLeft", "leftRight", "rightLeft", "rightRight").map { layout[it] })
+    }
+
+    @Test
+    fun nodesAtTheSameDepthAreAtLeastAUnitApart() {
+        // A long left spine under the right child must clear the right spine under the left child
+        var leftSpine: ITreeNodeValue = NullValue
+        var rightSpine: ITreeNodeValue = NullValue
+        (5 downTo 1).forEach {
+            leftSpine = node("l$it", right = leftSpine)
+            rightSpine = node("r$it", left = rightSpine)
+        }
+        val layout = TreeLayout.compute(node("root", left = leftSpine, right = rightSpine))
+
+        layout.groupBy { it.depth }.values.forEach { level ->
+            val columns = level.map { it.x }.sorted()
+            columns.zipWithNext().forEach { (left, right) -> assertTrue(right - left >= 1.0) }
+        }
+        assertEquals(11, layout.size)
+    }
+}
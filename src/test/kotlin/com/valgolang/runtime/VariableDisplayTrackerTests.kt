@@ -0,0 +1,40 @@
+package com.valgolang.runtime
+
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Test
+
+class VariableDisplayTrackerTests {
+
+    private fun VariableDisplayTracker.identifiers() = displayedVariables().map { it.first }
+
+    @Test
+    fun leastRecentlyUpdatedVariableIsReplaced() {
+        val tracker = VariableDisplayTracker(2)
+        tracker.update("x", DoubleValue(1.0))
+        tracker.update("y", DoubleValue(2.0))
+        tracker.update("x", DoubleValue(3.0))
+        tracker.update("z", DoubleValue(4.0))
+
+        assertEquals(listOf(Pair("x", DoubleValue(3.0)), Pair("z", DoubleValue(4.0))), tracker.displayedVariables())
+    }
+
+    @Test
+    fun removedVariablesFreeTheirSlot() {
+        val tracker = VariableDisplayTracker(3)
+        tracker.update("x", DoubleValue(1.0))
+        tracker.update("i", DoubleValue(0.0))
+        tracker.update("y", DoubleValue(2.0))
+        tracker.remove("i")
+        tracker.update("z", DoubleValue(3.0))
+
+        assertEquals(listOf("x", "z", "y"), tracker.identifiers())
+    }
+
+    @Test
+    fun noVariablesAreDisplayedWithoutSlots() {
+        val tracker = VariableDisplayTracker(0)
+        tracker.update("x", DoubleValue(1.0))
+
+        assertEquals(emptyList<String>(), tracker.identifiers())
+    }
+}
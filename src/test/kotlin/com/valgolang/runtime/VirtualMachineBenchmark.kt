@@ -0,0 +1,135 @@
+package com.valgolang.runtime
+
+import com.valgolang.ExitStatus
+import com.valgolang.VAlgoLangASTGenerator
+import com.valgolang.frontend.ast.ForStatementNode
+import com.valgolang.frontend.ast.IfStatementNode
+import com.valgolang.frontend.ast.StatementNode
+import com.valgolang.stylesheet.Stylesheet
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Tag
+import org.junit.jupiter.api.Test
+
+/**
+ * Times the virtual machine alone, excluding parsing and code generation.
+ * Excluded from the test task, run with gradle benchmark.
+ */
+@Tag("benchmark")
+class VirtualMachineBenchmark {
+
+    private val warmupRuns = 5
+    private val measuredRuns = 20
+
+    @Test
+    fun deepRecursion() {
+        benchmark(
+            "deep recursion",
+            "fun fib(n: number): number {\n" +
+                "    if (n < 2) {\n" +
+                "        return n;\n" +
+                "    }\n" +
+                "    return fib(n - 1) + fib(n - 2);\n" +
+                "}\n" +
+                "let ans = fib(16);\n"
+        )
+    }
+
+    @Test
+    fun nestedLoops() {
+        benchmark(
+            "nested loops",
+            "let total = 0;\n" +
+                "for i in range(0, 60) {\n" +
+                "    for j in range(0, 60) {\n" +
+                "        total = total + i * j;\n" +
+                "    }\n" +
+                "}\n"
+        )
+    }
+
+    /**
+     * Times stepping through the statements of a loop body as frames did before statements were indexed by line,
+     * looking every line up in the line to node map, against the statement index they use now. The whole program is
+     * timed too, for the share of a run spent finding statements.
+     */
+    @Test
+    fun loopStatementDispatch() {
+        val program = "let total = 0;\n" +
+            "for i in range(0, 3600) {\n" +
+            "    if (i < 1800) {\n" +
+            "        total = total + i;\n" +
+            "    } else {\n" +
+            "        total = total - i;\n" +
+            "    }\n" +
+            "\n" +
+            "    total = total + 1;\n" +
+            "}\n"
+        val parser = VAlgoLangASTGenerator(program.byteInputStream())
+        val (_, _, _, lineNodeMap) = parser.convertToAst(parser.parseFile().second)
+        val loop = lineNodeMap.values.filterIsInstance<ForStatementNode>().single()
+        val first = loop.statements.first().lineNumber
+        val last = loop.statements.last().lineNumber
+        val index = StatementIndex(lineNodeMap)
+        val iterations = 3600
+
+        assertEquals(walkLines(lineNodeMap, first, last), walkIndex(index, first, last))
+        time("loop dispatch, walking every line (before)") { (1..iterations).sumBy { walkLines(lineNodeMap, first, last) } }
+        time("loop dispatch, statement index (after)") { (1..iterations).sumBy { walkIndex(index, first, last) } }
+        benchmark("loop with branches and blank lines", program)
+    }
+
+    // Steps through lines first to last as frames did before, going into the first branch of if statements
+    private fun walkLines(statements: Map<Int, StatementNode>, first: Int, last: Int): Int {
+        var visited = 0
+        var pc = first
+        while (pc <= last) {
+            if (statements.containsKey(pc)) {
+                val statement = statements[pc]!!
+                visited++
+                if (statement is IfStatementNode) {
+                    visited += walkLines(statements, statement.statements.first().lineNumber, statement.statements.last().lineNumber)
+                    pc = statement.endLineNumber
+                }
+            }
+            ++pc
+        }
+        return visited
+    }
+
+    // Steps through the same statements as walkLines, jumping between them as frames do now
+    private fun walkIndex(index: StatementIndex, first: Int, last: Int): Int {
+        var visited = 0
+        var pc = index.nextStatementLine(first)
+        while (pc <= last) {
+            val statement = index[pc]
+            visited++
+            if (statement is IfStatementNode) {
+                visited += walkIndex(index, statement.statements.first().lineNumber, statement.statements.last().lineNumber)
+                pc = statement.endLineNumber
+            }
+            pc = index.nextStatementLine(pc + 1)
+        }
+        return visited
+    }
+
+    private fun benchmark(name: String, program: String) {
+        val parser = VAlgoLangASTGenerator(program.byteInputStream())
+        val (_, abstractSyntaxTree, symbolTable, lineNodeMap) = parser.convertToAst(parser.parseFile().second)
+        val run = {
+            VirtualMachine(abstractSyntaxTree, symbolTable, lineNodeMap, program.split("\n"), Stylesheet(null, symbolTable)).runProgram()
+        }
+
+        assertEquals(ExitStatus.EXIT_SUCCESS, run().first)
+        time(name) { run() }
+    }
+
+    private fun time(name: String, run: () -> Any) {
+        repeat(warmupRuns) { run() }
+        val times = (1..measuredRuns).map {
+            val start = System.nanoTime()
+            run()
+            (System.nanoTime() - start) / 1e6
+        }.sorted()
+        println("$name: median ${"%.1f".format(times[times.size / 2])}ms, min ${"%.1f".format(times.first())}ms over $measuredRuns runs")
+    }
+}
@@ -2,6 +2,11 @@ package com.valgolang.stylesheet
 
 import com.valgolang.VAlgoLangASTGenerator
 import com.valgolang.linearrepresentation.EmptyMObject
+import com.valgolang.linearrepresentation.ManimInstr
+import com.valgolang.linearrepresentation.datastructures.array.ArrayElemAssignObject
+import com.valgolang.linearrepresentation.datastructures.array.ArrayStructure
+import com.valgolang.linearrepresentation.datastructures.array.ArraySync
+import com.valgolang.linearrepresentation.datastructures.stack.StackPushObject
 import com.valgolang.runtime.VirtualMachine
 import com.valgolang.runtime.datastructures.stack.StackValue
 import org.hamcrest.CoreMatchers.`is`
@@ -16,14 +21,41 @@ class StylesheetIntegrationTests {
 
     @Test
     fun localVariableAssignedCorrectStyle() {
-        val stylesheet =
+        val (stylesheet, _) =
             runCompiler("stackFunction.val", "variableOverrideStylesheet.json")
         val stack1Style = stylesheet.getStyle("stack1", StackValue(EmptyMObject, Stack()))
         assertThat(stack1Style.borderColor, `is`("ORANGE"))
         assertThat(stack1Style.textColor, `is`("BLUE"))
     }
 
-    private fun runCompiler(fileName: String, stylesheetName: String): Stylesheet {
+    @Test
+    fun loopsAreFastForwardedAfterAnimatedIterations() {
+        val (_, linearRepresentation) = runCompiler("arrays2D.val", "fastForwardStylesheet.json")
+
+        assertThat(linearRepresentation.filterIsInstance<ArrayElemAssignObject>().size, `is`(1))
+        val finalSync = linearRepresentation.filterIsInstance<ArraySync>().last { it.rows.size == 3 }
+        assertThat(finalSync.rows, `is`(listOf(listOf("1.0", "4.0"), listOf("2.0", "5.0"), listOf("3.0", "6.0"))))
+    }
+
+    @Test
+    fun arraysOutsideTheLoopFrameAreSyncedAfterFastForwarding() {
+        val (_, linearRepresentation) = runCompiler("arrayLoopReturned.val", "fastForwardStylesheet.json")
+
+        val created = linearRepresentation.filterIsInstance<ArrayStructure>().map { it.ident }
+        val synced = linearRepresentation.filterIsInstance<ArraySync>().map { it.arrayIdent }
+        assertThat(synced, `is`(created.drop(1)))
+    }
+
+    @Test
+    fun loopsUpdatingStacksAreAnimatedInFull() {
+        val (_, linearRepresentation) = runCompiler("stackLoop.val", "fastForwardStylesheet.json")
+
+        assertThat(linearRepresentation.filterIsInstance<StackPushObject>().size, `is`(3))
+        assertThat(linearRepresentation.filterIsInstance<ArrayElemAssignObject>().size, `is`(3))
+        assertThat(linearRepresentation.filterIsInstance<ArraySync>().size, `is`(0))
+    }
+
+    private fun runCompiler(fileName: String, stylesheetName: String): Pair<Stylesheet, List<ManimInstr>> {
         val inputFile = File("$validTestFilePath/$fileName")
         val parser = VAlgoLangASTGenerator(inputFile.inputStream())
         val program = parser.parseFile().second
@@ -32,13 +64,13 @@ class StylesheetIntegrationTests {
             "$stylesheetPath/$stylesheetName",
             parserResult.symbolTableVisitor
         )
-        VirtualMachine(
+        val linearRepresentation = VirtualMachine(
             parserResult.abstractSyntaxTree,
             parserResult.symbolTableVisitor,
             parserResult.lineNodeMap,
             inputFile.readLines(),
             stylesheet
         ).runProgram().second
-        return stylesheet
+        return Pair(stylesheet, linearRepresentation)
     }
 }
@@ -60,6 +60,27 @@ class StylesheetUnitTests {
         assertThat(stack1AnimationStyle.animationStyle, `is`("ApplyWave"))
     }
 
+    @Test
+    fun stylesAreResolvedOnceForEachVariable() {
+        val symbolTable = SymbolTableVisitor()
+        symbolTable.addVariable("stack1", IdentifierData(StackType(NumberType)))
+        symbolTable.addVariable("stack2", IdentifierData(StackType(NumberType)))
+        val stylesheet = Stylesheet("$stylesheetPath/mixedStylesheet.json", symbolTable)
+
+        val stack1Style = stylesheet.getStyle("stack1", StackValue(EmptyMObject, Stack()))
+        assertTrue(stack1Style === stylesheet.getStyle("stack1", StackValue(EmptyMObject, Stack())))
+        assertTrue(stylesheet.getStyle("stack2", StackValue(EmptyMObject, Stack())) === stylesheet.getStyle("stack3", StackValue(EmptyMObject, Stack())))
+        assertThat(stylesheet.getAnimatedStyle("stack2", StackValue(EmptyMObject, Stack())).highlight, `is`("YELLOW"))
+    }
+
+    @Test
+    fun mergeKeepsPropertiesOfTheFirstStyle() {
+        val merged = StyleProperties(borderColor = "RED", creationTime = 2.0) merge DefaultStyleProperties()
+        assertThat(merged.borderColor, `is`("RED"))
+        assertThat(merged.textColor, `is`("YELLOW"))
+        assertThat(merged.creationTime, `is`(2.0))
+    }
+
     @Test
     fun defaultCodeTrackingIsStepInto() {
         val stylesheet = Stylesheet(null, SymbolTableVisitor())
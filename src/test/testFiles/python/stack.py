@@ -1,3 +1,4 @@
+import os
 import tempfile
 from abc import ABC, abstractmethod
 from manimlib.imports import *
@@ -6,10 +7,12 @@ class Main(Scene):
     code_end = 10
     line_spacing = 0.1
     time_objects = []
+    scene_time = 0
+    checkpoint_index = 0
     def construct(self):
         # Builds code visualisation pane
         code_lines = [['let y = Stack<number>();'], ['y.push(2);'], ['y.push(3);'], ['y.pop();']]
-        code_block = CodeBlock(code_lines, [(-7.0, 1.333333333333333), (-2.0, 1.333333333333333), (-7.0, -4.0), (-2.0, -4.0)], syntax_highlighting=True, syntax_highlighting_style="inkpot", tab_spacing=2)
+        code_block = CodeBlock(code_lines, [(-7.0, 1.333333333333333), (-2.0, 1.333333333333333), (-7.0, -4.0), (-2.0, -4.0)], syntax_highlighting=True, syntax_highlighting_style="inkpot", tab_spacing=2, scroll_threshold=5)
         code_text = code_block.build()
         self.code_end = code_block.code_end
         self.code_end = min(sum([len(elem) for elem in code_lines]), self.code_end)
@@ -53,47 +56,113 @@ class Main(Scene):
         else:
             return None
     def play_animation(self, *args, run_time=1.0):
-        time_elapsed = round(self.get_time())
+        time_elapsed = round(self.scene_time)
         for time_object in self.time_objects:
             if time_object.showing and time_object.end_time <= time_elapsed:
                 self.play(time_object.action(), run_time=run_time)
         self.play(*args, run_time=run_time)
     def move_arrow_to_line(self, line_number, pointer, code_block, code_text):
-        idx = 0
-        for i in range(line_number):
-            idx += len(code_block.code[i])
+        self.play(*self.arrow_to_line_animations(line_number, pointer, code_block))
+    # Scrolls the code block right away if the line is out of view, returning the pointer animation so it can share
+    # a play call with animations of other mobjects
+    def arrow_to_line_animations(self, line_number, pointer, code_block):
+        idx = code_block.line_offsets[line_number]
         if idx > self.code_end:
             animation = self.fade_out_if_needed(pointer)
             if animation is not None:
                 self.play(animation, runtime=0.1)
-            self.scroll_down(code_text, (idx - self.code_end))
+            self.scroll_down(code_block, (idx - self.code_end))
         elif idx - 1 < self.code_start:
             animation = self.fade_out_if_needed(pointer)
             if animation is not None:
                 self.play(animation, runtime=0.1)
-            self.scroll_up(code_text, (self.code_start - idx + len(code_block.code[line_number - 1])))
+            self.scroll_up(code_block, (self.code_start - idx + len(code_block.code[line_number - 1])))
         line_object = code_block.get_line_at(line_number)
-        self.play(FadeIn(pointer.next_to(line_object, LEFT, MED_SMALL_BUFF)))
+        return [FadeIn(pointer.next_to(line_object, LEFT, MED_SMALL_BUFF))]
+    # Scrolling jumps straight to the target window in a single animation, however far it is. Short scrolls slide the
+    # lines that stay visible, while scrolls beyond the code block's threshold cross-fade the whole window instead.
     # Inspired from https://www.reddit.com/r/manim/comments/bubyj2/scrolling_mobjects/
-    def scroll_down(self, group, scrolls):
-        shift = group[self.code_start].get_top()[1] - group[self.code_start + 1].get_top()[1]
-        for i in range(1, 1 + scrolls):
-            group[self.code_end + i - 1].next_to(group[self.code_end - 2 + i], DOWN * self.line_spacing, aligned_edge=LEFT)
-            self.play(FadeOut(group[self.code_start + i - 1]), FadeIn(group[self.code_end + i - 1]),
-                      group[(self.code_start + i):(self.code_end + i)].shift, shift * UP, run_time=0.1)
-        self.code_start = self.code_start + scrolls
-        self.code_end = self.code_end + scrolls
-    def scroll_up(self, group, scrolls):
-        shift = group[self.code_start].get_top()[1] - group[self.code_start + 1].get_top()[1]
-        for i in range(1, 1 + scrolls):
-            group[self.code_start - i].next_to(group[self.code_start - i + 1], UP * self.line_spacing, aligned_edge=LEFT)
-            self.play_animation(FadeOut(group[self.code_end - i]), FadeIn(group[self.code_start - i]),
-                                group[(self.code_start - i):(self.code_end - i)].shift, shift * DOWN, run_time=0.1)
-        self.code_start = self.code_start - scrolls
-        self.code_end = self.code_end - scrolls
+    def scroll_down(self, code_block, scrolls):
+        self.scroll_to_window(code_block, self.code_start + scrolls, self.code_end + scrolls)
+    def scroll_up(self, code_block, scrolls):
+        self.scroll_to_window(code_block, self.code_start - scrolls, self.code_end - scrolls)
+    def scroll_to_window(self, code_block, start, end):
+        group = code_block.all
+        shift = group[self.code_start].get_top()[1] - code_block.get_line_top(start)
+        code_block.scroll_offset += shift
+        if abs(start - self.code_start) > code_block.scroll_threshold:
+            old_window = group[self.code_start:self.code_end]
+            faded_window = old_window.copy()
+            self.remove(*old_window)
+            self.add(faded_window)
+            new_window = [code_block.catch_up_line(i) for i in range(start, end)]
+            self.play(FadeOut(faded_window), *[FadeIn(line) for line in new_window], run_time=0.5)
+        else:
+            leaving = [group[i] for i in range(self.code_start, self.code_end) if not start <= i < end]
+            entering = [code_block.catch_up_line(i) for i in range(start, end) if not self.code_start <= i < self.code_end]
+            staying = range(max(start, self.code_start), min(end, self.code_end))
+            animations = [FadeOut(line) for line in leaving] + [FadeIn(line) for line in entering]
+            if len(staying) > 0:
+                animations.append(ApplyMethod(group[staying.start:staying.stop].shift, shift * UP))
+                for i in staying:
+                    code_block.line_scroll_offsets[i] = code_block.scroll_offset
+            self.play(*animations, run_time=0.1)
+        self.code_start = start
+        self.code_end = end
+    # Segmented rendering: construct() is replayed in every worker, but only the plays between
+    # checkpoints [start, end) given by VALGOLANG_SEGMENT are written out. The scene time is
+    # tracked separately as manim only advances its clock by one frame for skipped animations.
+    def get_render_segment(self):
+        segment = os.environ.get("VALGOLANG_SEGMENT")
+        if segment is None:
+            return None
+        start, end = segment.split(":")
+        return int(start), int(end)
+    def checkpoint(self, index):
+        self.checkpoint_index = index
+        segment = self.get_render_segment()
+        if segment is not None and index >= segment[1]:
+            raise EndSceneEarlyException()
+    def update_segment_skipping(self):
+        segment = self.get_render_segment()
+        if segment is not None:
+            self.skip_animations = not (segment[0] <= self.checkpoint_index < segment[1])
+    def play(self, *args, **kwargs):
+        if len(args) == 0:
+            return
+        animations = self.compile_play_args_to_animation_list(*args, **kwargs)
+        self.update_segment_skipping()
+        super().play(*animations)
+        self.scene_time += self.get_run_time(animations)
+    def wait(self, duration=DEFAULT_WAIT_TIME, stop_condition=None):
+        self.update_segment_skipping()
+        super().wait(duration, stop_condition)
+        self.scene_time += duration
+from collections import OrderedDict
+# Building a Text renders it through Pango into an SVG that is then parsed into paths, which is the most expensive
+# step outside of rendering frames. Texts are cached by their string and style, and callers always receive a copy
+# so they are free to transform it. The least recently used texts are dropped once the cache is full.
+class TextCache:
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self.texts = OrderedDict()
+    def get(self, text, **kwargs):
+        key = (text, tuple(sorted(kwargs.items())))
+        cached = self.texts.get(key)
+        if cached is None:
+            cached = Text(text, **kwargs)
+            self.texts[key] = cached
+            if len(self.texts) > self.max_size:
+                self.texts.popitem(last=False)
+        else:
+            self.texts.move_to_end(key)
+        return cached.copy()
+text_cache = TextCache()
+def cached_text(text, **kwargs):
+    return text_cache.get(text, **kwargs)
 class CodeBlock:
     def __init__(self, code, boundaries, syntax_highlighting=True, syntax_highlighting_style="inkpot", text_color=WHITE,
-                 text_weight=NORMAL, font="Times New Roman", tab_spacing=2):
+                 text_weight=NORMAL, font="Times New Roman", tab_spacing=2, scroll_threshold=5):
         group = VGroup()
         self.boundaries = boundaries
         self.move_position = np.array(
@@ -103,6 +172,7 @@ class CodeBlock:
         self.boundary_width -= arrow_size
         self.boundary_height = boundaries[0][1] - boundaries[3][1]
         self.code_end = max(math.floor(self.boundary_height * 12.0 / self.boundary_width), 2)
+        self.scroll_threshold = scroll_threshold
         if syntax_highlighting:
             fp = tempfile.NamedTemporaryFile(suffix='.re')
             for c in code:
@@ -117,20 +187,32 @@ class CodeBlock:
         else:
             for c in code:
                 for sc in c:
-                    text = Text(sc, color=text_color, weight=text_weight, font=font)
+                    text = cached_text(sc, color=text_color, weight=text_weight, font=font)
                     group.add(text)
             self.all = group
         self.code = code
+        # line_offsets[n] is the number of wrapped lines before source line n + 1
+        self.line_offsets = [0]
+        for c in code:
+            self.line_offsets.append(self.line_offsets[-1] + len(c))
+        # Lines outside the visible window only follow scrolls once they come back into view
+        self.scroll_offset = 0
+        self.line_scroll_offsets = [0] * self.line_offsets[-1]
     def build(self):
         self.all.arrange_submobjects(DOWN * 0.1, aligned_edge=LEFT)
         ratio = 4.6 / 5.0
         self.all.set_width(self.boundary_width * ratio)
         return self.all
     def get_line_at(self, line_number):
-        idx = 0
-        for i in range(line_number):
-            idx += len(self.code[i])
-        return self.all[idx - 1]
+        return self.all[self.line_offsets[line_number] - 1]
+    def get_line_top(self, index):
+        # Top of the wrapped line at index as if it had followed every scroll so far
+        return self.all[index].get_top()[1] + self.scroll_offset - self.line_scroll_offsets[index]
+    def catch_up_line(self, index):
+        line = self.all[index]
+        line.shift((self.scroll_offset - self.line_scroll_offsets[index]) * UP)
+        self.line_scroll_offsets[index] = self.scroll_offset
+        return line
 class DataStructure(ABC):
     def __init__(self, ul, ur, ll, lr, aligned_edge, color=WHITE, text_color=WHITE, text_weight=NORMAL,
                  font="Times New Roman"):
@@ -200,7 +282,7 @@ class DataStructure(ABC):
 class RectangleBlock:
     def __init__(self, text, target=None, height=0.75, width=1.5, color=BLUE, text_color=WHITE, text_weight=NORMAL,
                  font="Times New Roman"):
-        self.text = Text(text, color=text_color, weight=text_weight, font=font)
+        self.text = cached_text(text, color=text_color, weight=text_weight, font=font)
         self.shape = Rectangle(height=height, width=width, color=color)
         self.all = VGroup(self.text, self.shape)
         self.text.set_width(7 / 10 * width)
@@ -216,18 +298,20 @@ class RectangleBlock:
             self.owner = target
             self.all.scale(max(target.empty.get_height() / self.shape.get_height(),
                                target.empty.get_width() / self.shape.get_width()))
-    def replace_text(self, new_text, color=None):
+    # Text fitted to the centre of the rectangle, for the current text to be transformed into
+    def fitted_text(self, new_text, color=None):
         if not color:
             color = self.text_color
-        new_text_obj = Text(new_text, color=color, font=self.font)
+        new_text_obj = cached_text(new_text, color=color, font=self.font)
         new_text_obj.set_width(self.width * 7 / 10)
         if new_text_obj.get_height() > 0.6 * self.height:
             new_text_obj.scale(0.6 * self.height / new_text_obj.get_height())
-        return Transform(self.text, new_text_obj.move_to(self.all.get_center()))
+        return new_text_obj.move_to(self.all.get_center())
+    def replace_text(self, new_text, color=None):
+        return Transform(self.text, self.fitted_text(new_text, color=color))
     def clean_up(self):
         return FadeOut(self.all)
 class Stack(DataStructure, ABC):
-
     def __init__(self, ul, ur, ll, lr, aligned_edge, color=WHITE, text_color=WHITE, text_weight=NORMAL,
                  font="Times New Roman"):
         super().__init__(ul, ur, ll, lr, aligned_edge, color, text_color, text_weight, font)
@@ -294,7 +378,7 @@ class InitStructure:
         self.shape.set_length(length)
         self.shape.set_angle(angle)
         if text is not None:
-            self.text = Text(text, color=text_color, weight=text_weight, font=font)
+            self.text = cached_text(text, color=text_color, weight=text_weight, font=font)
             self.text.next_to(self.shape, DOWN, SMALL_BUFF)
             self.all = VGroup(self.text, self.shape)
         else: